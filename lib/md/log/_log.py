@@ -1,12 +1,36 @@
 import json
 import os
 import datetime
+import decimal
+import enum
+import pathlib
+import uuid
+import weakref
 import collections
+import collections.abc
+import abc
+import string
+import struct
 import threading
+import queue
+import atexit
+import signal
+import gzip
+import mmap
+import shutil
+import time
+import random
+import traceback
+import types
 import typing
+import zlib
 
 import psr.log
 
+if typing.TYPE_CHECKING:  # imported lazily, as `asyncio` and `multiprocessing` are slow to import
+    import asyncio
+    import multiprocessing
+
 
 # Metadata
 __version__ = '3.2.1'
@@ -15,35 +39,282 @@ __all__ = (
     # Metadata
     '__version__',
     '__author__',
+    # Constant
+    'LEVEL_RANK',
+    'OVERFLOW_BLOCK',
+    'OVERFLOW_DROP_NEWEST',
+    'OVERFLOW_DROP_OLDEST',
+    'OVERFLOW_SAMPLE',
+    'DURABILITY_RECORD',
+    'DURABILITY_BATCH',
+    'DURABILITY_FSYNC',
+    # Record
+    'Record',
     # Contract
     'PatchInterface',
     'FormatExceptionPatch',
+    'LazyTraceback',
     'FormatInterface',
     'KeepInterface',
     # Implementation
     'PidPatch',
     'ThreadPidPatch',
+    'StaticExtraPatch',
     'KeepStream',
+    'KeepQueue',
+    'KeepRotatingFile',
+    'KeepCompressedFile',
+    'KeepCollector',
+    'KeepMappedFile',
+    'MappedFileReader',
+    'KeepAsync',
+    'KeepRateLimit',
+    'KeepSample',
+    'KeepAggregate',
+    'KeepRingBuffer',
     'Format',
+    'JsonDefault',
+    'JsonSerializer',
     'SerializationFormat',
+    'BinaryFormat',
+    'BinaryReader',
+    'IndexedReader',
+    'Metrics',
     'Logger',
+    'AsyncLogger',
 )
 
 
+# Constant
+OVERFLOW_BLOCK = 'block'  # caller waits until queue has free slot
+OVERFLOW_DROP_NEWEST = 'drop-newest'  # incoming record is dropped
+OVERFLOW_DROP_OLDEST = 'drop-oldest'  # the oldest queued record is dropped to free a slot
+OVERFLOW_SAMPLE = 'sample'  # every n-th overflowing record replaces the oldest one, others are dropped
+
+LEVEL_RANK = {  # severity rank by RFC 5424, lower is more severe
+    psr.log.LEVEL_EMERGENCY: 0,
+    psr.log.LEVEL_ALERT: 1,
+    psr.log.LEVEL_CRITICAL: 2,
+    psr.log.LEVEL_ERROR: 3,
+    psr.log.LEVEL_WARNING: 4,
+    psr.log.LEVEL_NOTICE: 5,
+    psr.log.LEVEL_INFO: 6,
+    psr.log.LEVEL_DEBUG: 7,
+}
+
+DURABILITY_RECORD = 'record'  # each record is written and flushed immediately
+DURABILITY_BATCH = 'batch'  # records are buffered, then written and flushed per batch
+DURABILITY_FSYNC = 'fsync'  # as batch, but also synced to disk per batch
+
+
+def _resolve_level(
+    channel: str,
+    level: typing.Optional[str],
+    level_map: typing.Dict[str, typing.Optional[str]],
+) -> typing.Optional[str]:
+    """ Resolves minimal level of channel by the longest matching channel prefix (e.g. `app.db` for `app.db.pool`) """
+    name = channel
+    while True:
+        if name in level_map:
+            return level_map[name]
+        if '.' not in name:
+            return level
+        name = name.rsplit('.', 1)[0]
+
+
+def _disabled_level_set(level: typing.Optional[str]) -> typing.FrozenSet[str]:
+    """ Resolves set of standard levels less severe than provided minimal one (custom levels are never disabled) """
+    if level is None:
+        return frozenset()
+    assert level in LEVEL_RANK, f'Unknown level {level!r}'
+    return frozenset(level_ for level_, rank in LEVEL_RANK.items() if rank > LEVEL_RANK[level])
+
+
+_fork_generation = [0]  # incremented in child process after fork, so per-process caches are rebuilt
+
+
+def _increment_fork_generation() -> None:
+    _fork_generation[0] += 1
+
+
+if hasattr(os, 'register_at_fork'):  # not available on windows, where processes are never forked
+    os.register_at_fork(after_in_child=_increment_fork_generation)
+
+
+def _weak_method(method: typing.Callable[[], typing.Any]) -> typing.Callable[[], bool]:
+    """
+    Wraps bound method into function, that doesn't keep its instance alive (e.g. to register it with `atexit`
+    or to call it by background thread), function returns `False`, when instance is already collected
+    """
+    method_ref = weakref.WeakMethod(method)
+
+    def call() -> bool:
+        method_ = method_ref()
+        if method_ is None:
+            return False
+        method_()
+        return True
+
+    return call
+
+
+def _register_at_fork(method: typing.Callable[[], typing.Any]) -> None:
+    """ Registers bound method to be called in child process after fork (e.g. to restart thread), weakly """
+    if hasattr(os, 'register_at_fork'):  # not available on windows, where processes are never forked
+        os.register_at_fork(after_in_child=_weak_method(method))
+
+
+def _call_periodically(
+    function: typing.Callable[[], bool],
+    interval: float,
+    stopped: threading.Event,
+    name: str,
+) -> None:
+    """
+    Calls function by daemon thread each interval, until stop event is set or function returns `False`,
+    thread is restarted in child process after fork (threads don't survive fork)
+    """
+    is_finished = [False]
+
+    def run() -> None:
+        while not stopped.wait(timeout=interval):
+            try:
+                if not function():
+                    is_finished[0] = True
+                    return
+            except Exception:  # thread must survive e.g. faulty keep
+                traceback.print_exc()
+
+    def start() -> None:
+        if not is_finished[0] and not stopped.is_set():
+            threading.Thread(target=run, name=name, daemon=True).start()
+
+    start()
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=start)
+
+
+# Record
+class Record(collections.abc.MutableMapping):
+    """
+    Log record with fixed set of fields (`date`, `channel`, `level`, `message`, `context`, `extra`),
+    provides `dict` compatible mapping interface, `context` and `extra` are created on first access
+    """
+    __slots__ = ('date', 'channel', 'level', 'message', '_context', '_extra', '_custom', '_formatted')
+    _KEY_TUPLE = ('date', 'channel', 'level', 'message', 'context', 'extra')
+    _KEY_SET = frozenset(_KEY_TUPLE)
+
+    def __init__(
+        self,
+        date: datetime.datetime,
+        channel: str,
+        level: str,
+        message: str,
+        context: typing.Optional[dict] = None,
+        extra: typing.Optional[dict] = None,
+    ) -> None:
+        self.date = date
+        self.channel = channel
+        self.level = level
+        self.message = message
+        self._context = context
+        self._extra = extra
+        self._custom: typing.Optional[dict] = None  # keys added by third-party patches
+        self._formatted: typing.Optional[dict] = None  # format cache key -> formatted record, see `_format_cached`
+
+    @property
+    def context(self) -> dict:
+        if self._context is None:
+            self._context = collections.OrderedDict()
+        return self._context
+
+    @context.setter
+    def context(self, context: dict) -> None:
+        self._context = context
+        self._formatted = None
+
+    @property
+    def extra(self) -> dict:
+        if self._extra is None:
+            self._extra = collections.OrderedDict()
+        return self._extra
+
+    @extra.setter
+    def extra(self, extra: dict) -> None:
+        self._extra = extra
+        self._formatted = None
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if key in self._KEY_SET:
+            return getattr(self, key)
+        if self._custom is None:
+            raise KeyError(key)
+        return self._custom[key]
+
+    def __setitem__(self, key: str, value: typing.Any) -> None:
+        self._formatted = None  # record is changed, e.g. redacted by keep wrapper
+        if key in self._KEY_SET:
+            setattr(self, key, value)
+            return
+        if self._custom is None:
+            self._custom = {}
+        self._custom[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._KEY_SET:
+            raise KeyError(f'Record field {key!r} could not be deleted')
+        if self._custom is None:
+            raise KeyError(key)
+        del self._custom[key]
+        self._formatted = None
+
+    def __iter__(self) -> typing.Iterator[str]:
+        yield from self._KEY_TUPLE
+        if self._custom:
+            yield from self._custom
+
+    def __len__(self) -> int:
+        return len(self._KEY_TUPLE) + (len(self._custom) if self._custom else 0)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._KEY_SET or (self._custom is not None and key in self._custom)
+
+    def copy(self) -> 'Record':
+        """ Creates shallow copy, as `dict.copy` does """
+        record = Record(
+            date=self.date,
+            channel=self.channel,
+            level=self.level,
+            message=self.message,
+            context=self._context,
+            extra=self._extra,
+        )
+        if self._custom:
+            record._custom = self._custom.copy()
+        return record
+
+    def __repr__(self) -> str:
+        return f'Record({", ".join(f"{key!s}={value!r}" for key, value in self.items())})'
+
+
 # Contract
 class PatchInterface:
-    def patch(self, record: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    def patch(self, record: typing.MutableMapping[str, typing.Any]) -> typing.MutableMapping[str, typing.Any]:
         """ Modifies log record before handle """
         raise NotImplementedError
 
 
 class FormatInterface:
-    def format(self, record: typing.Dict[str, typing.Any]) -> str:
+    # formats with equal cache key produce equal output, so record is formatted once for all keeps,
+    # see `_format_cached`, `None` disables caching (e.g. for stateful format)
+    cache_key: typing.Optional[typing.Hashable] = None
+
+    def format(self, record: typing.MutableMapping[str, typing.Any]) -> str:
         raise NotImplementedError
 
 
 class KeepInterface:
-    def keep(self, record: typing.Dict[str, typing.Any]) -> None:
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
         """ Writes a log message """
         raise NotImplementedError
 
@@ -51,7 +322,7 @@ class KeepInterface:
 # Implementation
 class PidPatch(PatchInterface):
     """ Adds process identifier to log record """
-    def patch(self, record: typing.Dict[str, typing.Any]) -> dict:
+    def patch(self, record: typing.MutableMapping[str, typing.Any]) -> typing.MutableMapping[str, typing.Any]:
         record['extra']['pid'] = os.getpid()
         return record
 
@@ -66,7 +337,7 @@ class ThreadPidPatch(PatchInterface):
         import threading
         self.threading = threading
 
-    def patch(self, record: typing.Dict[str, typing.Any]) -> dict:
+    def patch(self, record: typing.MutableMapping[str, typing.Any]) -> typing.MutableMapping[str, typing.Any]:
         record['extra']['thread'] = threading.get_native_id()
         return record
 
@@ -74,8 +345,58 @@ class ThreadPidPatch(PatchInterface):
         return 'ThreadPidPatch()'
 
 
+class StaticExtraPatch(PatchInterface):
+    """
+    Adds static process and thread attributes to log record extra,
+    process attributes are computed once per process (again after fork), thread attributes once per thread,
+    then prebuilt extra is merged into each record in one step
+    """
+    def __init__(
+        self,
+        process_map: typing.Optional[typing.Dict[str, typing.Callable[[], typing.Any]]] = None,
+        thread_map: typing.Optional[typing.Dict[str, typing.Callable[[], typing.Any]]] = None,
+    ) -> None:
+        self._process_map = {'pid': os.getpid} if process_map is None else process_map
+        self._thread_map = {'thread': threading.get_native_id} if thread_map is None else thread_map
+        self._process_extra: typing.Optional[typing.Tuple[int, typing.Dict[str, typing.Any]]] = None
+        self._local = threading.local()
+
+    def patch(self, record: typing.MutableMapping[str, typing.Any]) -> typing.MutableMapping[str, typing.Any]:
+        state = getattr(self._local, 'state', None)
+        if state is None or state[0] != _fork_generation[0]:
+            state = self._build()
+        extra = record['extra']
+        for key, value in state[1]:  # faster than `OrderedDict.update`
+            extra[key] = value
+        return record
+
+    def _build(self) -> typing.Tuple[int, typing.Tuple[typing.Tuple[str, typing.Any], ...]]:
+        """ Builds extra of current thread (and current process, when it's not built yet) """
+        generation = _fork_generation[0]
+        process_extra = self._process_extra
+        if process_extra is None or process_extra[0] != generation:
+            process_extra = generation, {key: compute() for key, compute in self._process_map.items()}
+            self._process_extra = process_extra
+        extra = dict(process_extra[1])
+        extra.update((key, compute()) for key, compute in self._thread_map.items())
+        state = generation, tuple(extra.items())
+        self._local.state = state
+        return state
+
+    def __repr__(self) -> str:
+        return f'StaticExtraPatch(process_map={self._process_map!r}, thread_map={self._thread_map!r})'
+
+
 class FormatExceptionPatch(PatchInterface):
-    def __init__(self, level_set: typing.Optional[set] = None) -> None:
+    _RENDERED_ATTRIBUTE = '__md_log_rendered__'
+
+    def __init__(
+        self,
+        level_set: typing.Optional[set] = None,
+        lazy: bool = False,
+        cache: bool = False,
+        limit: typing.Optional[int] = None,
+    ) -> None:
         import traceback
         self._traceback = traceback
         self._level_set = level_set or {
@@ -88,8 +409,11 @@ class FormatExceptionPatch(PatchInterface):
             psr.log.LEVEL_INFO,
             psr.log.LEVEL_DEBUG,
         }
+        self._lazy = lazy  # traceback is rendered on format, see `LazyTraceback`
+        self._cache = cache  # extracted stack is stored on exception itself, see `format_exception`
+        self._limit = limit  # maximal amount of stack entries to render
 
-    def patch(self, record: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    def patch(self, record: typing.MutableMapping[str, typing.Any]) -> typing.MutableMapping[str, typing.Any]:
         if 'exception' not in record['context']:
             return record
 
@@ -98,27 +422,358 @@ class FormatExceptionPatch(PatchInterface):
             return record
 
         assert 'level' in record
-        if record['level'] not in self._level_set:
-            record['context']['exception'] = self._traceback.format_exception(
-                type(exception),
-                exception,
-                None
-            )
-            return record
+        traceback_ = exception.__traceback__ if record['level'] in self._level_set else None
 
-        record['context']['exception'] = self._traceback.format_exception(
-            type(exception),
-            exception,
-            exception.__traceback__,
-        )
+        if self._lazy:
+            record['context']['exception'] = LazyTraceback(self, exception, traceback_)
+        else:
+            record['context']['exception'] = self.format_exception(exception, traceback_)
 
         return record
 
+    def format_exception(
+        self,
+        exception: BaseException,
+        traceback_: typing.Optional[types.TracebackType],
+    ) -> typing.List[str]:
+        """
+        Renders exception with traceback, stack entries extracted from traceback (the most expensive part)
+        are stored on exception and reused, when the same exception is logged again, e.g. by each layer
+        it propagates through: traceback grows from its outer end, so only entries added since are extracted
+        """
+        if not self._cache or self._limit is not None:  # limit keeps the outermost entries, so they can't be reused
+            if self._limit is None:
+                return self._traceback.format_exception(type(exception), exception, traceback_)
+            return self._traceback.format_exception(type(exception), exception, traceback_, limit=self._limit)
+
+        # traceback, its extracted stack entries, exception state, rendered lines preceding, of and following entries
+        cached = getattr(exception, self._RENDERED_ATTRIBUTE, None)
+        state = (exception.__cause__, exception.__context__, exception.__suppress_context__, exception.args)
+        notes = list(getattr(exception, '__notes__', None) or ())  # e.g. added by outer layer
+        stack = None
+        if cached is not None and all(a is b for a, b in zip(cached[2], state)) and cached[3] == notes:
+            added_count = 0
+            entry = traceback_
+            while entry is not None and entry is not cached[0]:
+                entry = entry.tb_next
+                added_count += 1
+            if entry is not None or cached[0] is None:
+                prefix, stack_lines, suffix = cached[4], cached[5], cached[6]
+                stack = cached[1]
+                if added_count:
+                    added = self._traceback.extract_tb(traceback_, limit=added_count)
+                    stack = self._traceback.StackSummary.from_list(list(added) + list(stack))
+                    if cached[1] and added[-1][:3] == cached[1][0][:3]:  # e.g. recursion, repeats are collapsed
+                        stack_lines = stack.format()
+                    else:
+                        stack_lines = added.format() + stack_lines
+
+        if stack is None:
+            traceback_exception = self._traceback.TracebackException(type(exception), exception, traceback_)
+            rendered = list(traceback_exception.format())
+            stack = traceback_exception.stack
+            stack_lines = stack.format()
+            suffix = list(traceback_exception.format_exception_only())
+            main = self._render_main(stack_lines, suffix)
+            prefix = rendered[:len(rendered) - len(main)]
+            if prefix + main != rendered:  # e.g. exception group, that is rendered differently
+                return rendered
+        else:
+            main = self._render_main(stack_lines, suffix)
+
+        try:
+            setattr(exception, self._RENDERED_ATTRIBUTE, (traceback_, stack, state, notes, prefix, stack_lines, suffix))
+        except AttributeError:  # e.g. exception type with `__slots__`
+            pass
+        return prefix + main
+
+    @staticmethod
+    def _render_main(stack_lines: typing.List[str], suffix: typing.List[str]) -> typing.List[str]:
+        """ Renders traceback of exception itself (without chained exceptions), suffix is rendered exception """
+        return (['Traceback (most recent call last):\n'] if stack_lines else []) + stack_lines + suffix
+
+    def __repr__(self) -> str:
+        return (
+            'FormatExceptionPatch('
+            f'level_set={self._level_set!r}, '
+            f'lazy={self._lazy!r}, '
+            f'cache={self._cache!r}, '
+            f'limit={self._limit!r}'
+            ')'
+        )
+
+
+class LazyTraceback:
+    """
+    Exception traceback placeholder, that is rendered by `FormatExceptionPatch` only when format serializes it,
+    formats render it into list of strings, as not lazy `FormatExceptionPatch` does
+    """
+    __slots__ = ('_patch', '_exception', '_traceback', '_rendered')
+
+    def __init__(
+        self,
+        patch: FormatExceptionPatch,
+        exception: BaseException,
+        traceback_: typing.Optional[types.TracebackType],
+    ) -> None:
+        self._patch = patch
+        self._exception = exception
+        self._traceback = traceback_
+        self._rendered: typing.Optional[typing.List[str]] = None
+
+    def render(self) -> typing.List[str]:
+        if self._rendered is None:
+            self._rendered = self._patch.format_exception(self._exception, self._traceback)
+            self._exception = self._traceback = None  # type: ignore[assignment]  # release frames
+        return self._rendered
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.render())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyTraceback):
+            other = other.render()
+        return self.render() == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f'LazyTraceback({self._exception!r})' if self._rendered is None else repr(self._rendered)
+
+
+def _render_lazy(context: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    """ Returns context copy with rendered `LazyTraceback` values, or context itself when there are no ones """
+    for value in context.values():
+        if type(value) is LazyTraceback:
+            return {key: value.render() if type(value) is LazyTraceback else value for key, value in context.items()}
+    return context
+
+
+class _DateFormat:
+    """
+    Renders date into string by date format, rendered date is cached per second,
+    so only sub-second part (`%f` directive) is rendered for subsequent dates of the same second
+    """
+    def __init__(self, date_format: str) -> None:
+        self._date_format = date_format
+        self._piece_list = self._split(date_format)
+        self._cache: typing.Tuple[typing.Optional[tuple], typing.List[str]] = (None, [])
+
+    def __call__(self, date: datetime.datetime) -> str:
+        if type(date) is not datetime.datetime:  # e.g. subclass with custom `strftime`
+            return date.strftime(self._date_format)
+
+        # fold distinguishes repeated wall time, e.g. on DST fall-back, which has different offset
+        key = (date.second, date.minute, date.hour, date.day, date.month, date.year, date.tzinfo, date.fold)
+        cached_key, rendered_list = self._cache
+        if key != cached_key:
+            rendered_list = [date.strftime(piece) for piece in self._piece_list]
+            self._cache = (key, rendered_list)
+
+        if len(rendered_list) == 1:
+            return rendered_list[0]
+        return ('%06d' % date.microsecond).join(rendered_list)
+
+    @staticmethod
+    def _split(date_format: str) -> typing.List[str]:
+        """ Splits date format by `%f` directives """
+        piece_list = []
+        start = 0
+        i = 0
+        while i < len(date_format) - 1:
+            if date_format[i] != '%':
+                i += 1
+                continue
+            if date_format[i + 1] == 'f':
+                piece_list.append(date_format[start:i])
+                start = i + 2
+            i += 2  # skip directive, including escaped `%%`
+        piece_list.append(date_format[start:])
+        return piece_list
+
+
+class JsonDefault:
+    """
+    Converts value, that is not JSON serializable, into serializable one (e.g. `datetime` into ISO string),
+    converter is resolved by value type (and its bases) once, then cached per type, `repr` is the fallback
+    """
+    CONVERTER_MAP: typing.Dict[type, typing.Callable[[typing.Any], typing.Any]] = {
+        datetime.date: lambda value: value.isoformat(),  # also `datetime`, as `orjson` does
+        datetime.time: lambda value: value.isoformat(),
+        datetime.timedelta: lambda value: value.total_seconds(),
+        decimal.Decimal: str,
+        uuid.UUID: str,
+        pathlib.PurePath: str,
+        enum.Enum: lambda value: value.value,
+        BaseException: lambda value: ''.join(traceback.format_exception_only(type(value), value)).rstrip('\n'),
+        set: list,
+        frozenset: list,
+        bytes: lambda value: value.decode('utf-8', 'backslashreplace'),
+        bytearray: lambda value: value.decode('utf-8', 'backslashreplace'),
+        collections.abc.Mapping: dict,
+        collections.abc.Iterable: list,
+    }
+
+    def __init__(
+        self,
+        converter_map: typing.Optional[typing.Dict[type, typing.Callable[[typing.Any], typing.Any]]] = None,
+    ) -> None:
+        self._converter_map = {**self.CONVERTER_MAP, LazyTraceback: LazyTraceback.render, **(converter_map or {})}
+        self._cache: typing.Dict[type, typing.Callable[[typing.Any], typing.Any]] = {}
+
+    def __call__(self, value: typing.Any) -> typing.Any:
+        converter = self._cache.get(type(value))
+        if converter is None:
+            converter = self._cache[type(value)] = self._resolve(type(value))
+        return converter(value)
+
+    def _resolve(self, type_: type) -> typing.Callable[[typing.Any], typing.Any]:
+        for base in type_.__mro__:  # the most specific converter first
+            if base in self._converter_map:
+                return self._converter_map[base]
+        for base, converter in self._converter_map.items():  # abstract base classes, e.g. `Mapping`
+            if isinstance(base, abc.ABCMeta) and issubclass(type_, base):
+                return converter
+        return repr
+
+    def __repr__(self) -> str:
+        return 'JsonDefault()'
+
+
+_json_default = JsonDefault()
+_json_encoder = json.JSONEncoder(default=_json_default)  # prebuilt, as `json.dumps` with arguments creates it per call
+_compact_json_encoder = json.JSONEncoder(default=_json_default, separators=(',', ':'))
+
+
+class JsonSerializer:
+    """
+    Serializes log record with the fastest installed JSON encoder (`orjson`, then `ujson`, then builtin `json`),
+    values, that are not JSON serializable, are converted with `JsonDefault`
+    """
+    BACKEND_ORJSON = 'orjson'
+    BACKEND_UJSON = 'ujson'
+    BACKEND_JSON = 'json'
+
+    _BACKEND_TUPLE = (BACKEND_ORJSON, BACKEND_UJSON, BACKEND_JSON)  # in order of preference
+
+    def __init__(
+        self,
+        backend: typing.Optional[str] = None,
+        binary: bool = False,
+        default: typing.Optional[typing.Callable[[typing.Any], typing.Any]] = None,
+    ) -> None:
+        self._binary = binary  # serialize into utf-8 encoded bytes (e.g. to write into binary stream)
+        self._default = default or _json_default
+        self._backend, self._serialize = self._load(backend)
+        self.cache_key: typing.Optional[typing.Hashable] = None
+        if type(self) is JsonSerializer:  # subclass could hold own state, so it should set own key explicitly
+            self.cache_key = type(self), self._backend, binary, self._default
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    def __call__(self, record: typing.MutableMapping[str, typing.Any]) -> typing.Union[str, bytes]:
+        return self._serialize(record)
+
+    def _load(self, backend: typing.Optional[str]) -> typing.Tuple[str, typing.Callable[[typing.Any], typing.Any]]:
+        """ Imports requested backend, or the first installed one, when backend is not provided """
+        assert backend is None or backend in self._BACKEND_TUPLE, f'Unknown backend {backend!r}'
+        default = self._default
+
+        encoder = _json_encoder if default is _json_default else json.JSONEncoder(default=default)
+        if self._binary:
+            encode: typing.Callable[[typing.Any], typing.Any] = lambda value: encoder.encode(value).encode('utf-8')
+        else:
+            encode = encoder.encode
+
+        if backend in (None, self.BACKEND_ORJSON):
+            try:
+                import orjson  # type: ignore  # optional dependency
+            except ImportError:
+                if backend is not None:
+                    raise
+            else:
+                option = orjson.OPT_NON_STR_KEYS
+                binary = self._binary
+
+                def encode_orjson(value: typing.Any) -> typing.Union[str, bytes]:
+                    try:
+                        data = orjson.dumps(value, default=default, option=option)
+                    except TypeError:  # e.g. integer exceeds 64-bit range, builtin `json` encodes it
+                        return encode(value)
+                    return data if binary else data.decode()
+
+                return self.BACKEND_ORJSON, encode_orjson
+
+        if backend in (None, self.BACKEND_UJSON):
+            try:
+                import ujson  # type: ignore  # optional dependency
+            except ImportError:
+                if backend is not None:
+                    raise
+            else:
+                binary = self._binary
+
+                def encode_ujson(value: typing.Any) -> typing.Union[str, bytes]:
+                    try:
+                        data = ujson.dumps(value, default=default)
+                    except (TypeError, OverflowError):  # e.g. integer exceeds 64-bit range, builtin `json` encodes it
+                        return encode(value)
+                    return data.encode('utf-8') if binary else data
+
+                return self.BACKEND_UJSON, encode_ujson
+
+        return self.BACKEND_JSON, encode
+
     def __repr__(self) -> str:
-        return f'FormatExceptionPatch(level_set={self._level_set!r})'
+        return f'JsonSerializer(backend={self._backend!r}, binary={self._binary!r})'
+
+
+def _bind_format(format_: FormatInterface, keep: KeepInterface) -> None:
+    """ Binds stateful format (e.g. `BinaryFormat`), which output is valid in stream of one keep only, to the keep """
+    bind = getattr(format_, 'bind', None)
+    if bind is not None:
+        bind(keep)
+
+
+def _reset_format(format_: FormatInterface) -> None:
+    """ Resets stateful format (e.g. `BinaryFormat`), when keep starts writing into a new stream """
+    reset = getattr(format_, 'reset', None)
+    if reset is not None:
+        reset()
+
+
+def _format_cached(
+    format_: FormatInterface,
+    cache_key: typing.Optional[typing.Hashable],
+    record: typing.MutableMapping[str, typing.Any],
+) -> typing.Any:
+    """ Formats record once per format cache key, so keeps with equivalent formats share formatted record """
+    if cache_key is None or type(record) is not Record:
+        return format_.format(record=record)
+    formatted = record._formatted
+    if formatted is None:
+        formatted = record._formatted = {}
+    else:
+        log = formatted.get(cache_key)
+        if log is not None:
+            return log
+    log = formatted[cache_key] = format_.format(record=record)
+    return log
 
 
 class Format(FormatInterface):  # todo consider to rename to `TextFormat` in next release
+    # record field name -> expression to render it from mapping and from `Record` instance, see `_compile`
+    _FIELD_MAP = {
+        'date': ("format_date(record['date'])", 'format_date(record.date)'),
+        'channel': ("record['channel']", 'record.channel'),
+        'level': ("record['level']", 'record.level'),
+        'message': ("record['message']", 'record.message'),
+        'context': ("dumps(record['context']) if record['context'] else '{}'", "dumps(record._context) if record._context else '{}'"),
+        'extra': ("dumps(record['extra']) if record['extra'] else '{}'", "dumps(record._extra) if record._extra else '{}'"),
+    }
+
     def __init__(
         self,
         record_format: typing.Optional[str] = None,
@@ -126,15 +781,69 @@ class Format(FormatInterface):  # todo consider to rename to `TextFormat` in nex
     ) -> None:
         self._record_format = record_format or '[{date!s}] {channel!s}.{level!s}: {message!s} {context!s} {extra!s}'
         self._date_format = date_format or '%Y-%m-%d %H:%M:%S.%f'
+        self._format_date = _DateFormat(self._date_format)
+        self._format: typing.Callable[[typing.MutableMapping[str, typing.Any]], str]
+        self._format_record: typing.Callable[[Record], str]
+        self._format, self._format_record = self._compile() or (self._format_generic, self._format_generic)
+        self.cache_key: typing.Optional[typing.Hashable] = None
+        if type(self) is Format:  # subclass could hold own state, so it should set own key explicitly
+            self.cache_key = type(self), self._record_format, self._date_format
+
+    def format(self, record: typing.MutableMapping[str, typing.Any]) -> str:
+        if type(record) is Record:
+            return self._format_record(record)
+        return self._format(record)
 
-    def format(self, record: typing.Dict[str, typing.Any]) -> str:
+    def _format_generic(self, record: typing.MutableMapping[str, typing.Any]) -> str:
         return self._record_format.format(
-            date=record['date'].strftime(self._date_format),
+            date=self._format_date(record['date']),
             channel=record['channel'],
             level=record['level'],
             message=record['message'],
-            context=json.dumps(record['context']) if record['context'] else '{}',
-            extra=json.dumps(record['extra']) if record['extra'] else '{}',
+            context=_json_encoder.encode(record['context']) if record['context'] else '{}',
+            extra=_json_encoder.encode(record['extra']) if record['extra'] else '{}',
+        )
+
+    def _compile(self) -> typing.Optional[typing.Tuple[typing.Callable[..., str], typing.Callable[..., str]]]:
+        """
+        Compiles record format once into f-string based functions (for mapping and for `Record` instance),
+        that render only referenced fields,
+        returns `None` when record format could not be compiled (e.g. it refers to an item or attribute of a field)
+        """
+        try:
+            parsed = list(string.Formatter().parse(self._record_format))
+        except ValueError:
+            return None
+
+        template = ''
+        field_list: typing.List[str] = []
+        for literal, field_name, format_spec, conversion in parsed:
+            template += literal.replace('{', '{{').replace('}', '}}')
+            if field_name is None:
+                continue
+            if field_name not in self._FIELD_MAP or any(char in (format_spec or '') for char in '{}\\\'"'):
+                return None
+            if field_name not in field_list:
+                field_list.append(field_name)
+            template += (
+                '{' + field_name
+                + (f'!{conversion!s}' if conversion else '')
+                + (f':{format_spec!s}' if format_spec else '')
+                + '}'
+            )
+
+        source = ''
+        for i, function_name in enumerate(['format_', 'format_record']):
+            source += f'def {function_name!s}(record):\n'
+            for field_name in field_list:
+                source += f'    {field_name} = {self._FIELD_MAP[field_name][i]}\n'
+            source += f'    return f{template!r}\n'
+
+        namespace: typing.Dict[str, typing.Any] = {'dumps': _json_encoder.encode, 'format_date': self._format_date}
+        exec(compile(source, f'<md.log.Format {self._record_format!r}>', 'exec'), namespace)  # nosec B102 -- fields are whitelisted
+        return (
+            typing.cast(typing.Callable[..., str], namespace['format_']),
+            typing.cast(typing.Callable[..., str], namespace['format_record']),
         )
 
     def __repr__(self) -> str:
@@ -144,115 +853,2269 @@ class Format(FormatInterface):  # todo consider to rename to `TextFormat` in nex
 class SerializationFormat(FormatInterface):
     def __init__(
         self,
-        serializer: typing.Callable[[dict], str],
+        serializer: typing.Optional[typing.Callable[[dict], typing.Union[str, bytes]]] = None,
         date_format: typing.Optional[str] = None
     ) -> None:
-        self._serializer = serializer
+        self._serializer = serializer or JsonSerializer()
         self._date_format = date_format or '%Y-%m-%d %H:%M:%S.%f'
+        self._format_date = _DateFormat(self._date_format)
+        self._render_lazy = not isinstance(self._serializer, JsonSerializer)  # `JsonDefault` renders `LazyTraceback`
+        serializer_key = getattr(self._serializer, 'cache_key', None)
+        if serializer_key is None:
+            serializer_key = self._serializer  # e.g. `json.dumps`
+        self.cache_key: typing.Optional[typing.Hashable] = None
+        if type(self) is SerializationFormat and isinstance(serializer_key, collections.abc.Hashable):
+            self.cache_key = type(self), serializer_key, self._date_format
 
-    def format(self, record: typing.Dict[str, typing.Any]) -> str:
-        return self._serializer(collections.OrderedDict(
-            date=record['date'].strftime(self._date_format),
-            channel=record['channel'],
-            level=record['level'],
-            message=record['message'],
-            context=record['context'] if record['context'] else {},
-            extra=record['extra'] if record['extra'] else {},
+    def format(  # type: ignore[override]  # bytes for binary serializer
+        self,
+        record: typing.MutableMapping[str, typing.Any],
+    ) -> typing.Union[str, bytes]:
+        if type(record) is Record:  # fast path, `context` and `extra` are not created when not set
+            context = record._context
+            extra = record._extra
+            date = record.date
+            channel, level, message = record.channel, record.level, record.message
+        else:
+            context = record['context']
+            extra = record['extra']
+            date = record['date']
+            channel, level, message = record['channel'], record['level'], record['message']
+
+        if context and self._render_lazy:
+            context = _render_lazy(context)
+        return self._serializer({  # plain dict keeps insertion order, `context` and `extra` are not copied
+            'date': self._format_date(date),
+            'channel': channel,
+            'level': level,
+            'message': message,
+            'context': context or {},
+            'extra': extra or {},
+        })
+
+    def __repr__(self) -> str:
+        return f'SerializationFormat(serializer={self._serializer!r}, date_format={self._date_format!r})'
+
+
+class BinaryFormat(FormatInterface):
+    """
+    Encodes log record into compact binary length-prefixed frame,
+    channel and level strings are interned: string definition frame precedes the first record that refers it.
+    Frames should be written in the same order as they are encoded into one stream (so instance is bound to one keep),
+    see `BinaryReader` to decode
+    """
+    FRAME_STRING = 1  # frame header, string id, utf-8 string
+    FRAME_RECORD = 2  # frame header, timestamp (microseconds), level string id, channel string id, JSON payload
+
+    _HEADER = struct.Struct('<BI')  # frame kind, frame body length
+    _STRING = struct.Struct('<BII')
+    _RECORD = struct.Struct('<BIqII')
+
+    def __init__(self) -> None:
+        self._string_map: typing.Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._keep_ref: typing.Optional[weakref.ref] = None
+
+    def format(self, record: typing.MutableMapping[str, typing.Any]) -> bytes:  # type: ignore[override]
+        frame = b''
+        level_id = self._string_map.get(record['level'])
+        channel_id = self._string_map.get(record['channel'])
+        if level_id is None or channel_id is None:
+            with self._lock:
+                level_id, level_frame = self._intern(record['level'])
+                channel_id, channel_frame = self._intern(record['channel'])
+            frame = level_frame + channel_frame
+
+        payload = _compact_json_encoder.encode(
+            [record['message'], record['context'] or {}, record['extra'] or {}],
+        ).encode('utf-8')
+
+        return frame + self._RECORD.pack(
+            self.FRAME_RECORD,
+            self._RECORD.size - self._HEADER.size + len(payload),
+            _encode_date(record['date']),
+            level_id,
+            channel_id,
+        ) + payload
+
+    def reset(self) -> None:
+        """ Forgets interned strings, should be called when frames are written into a new stream """
+        with self._lock:
+            self._string_map = {}
+
+    def bind(self, keep: KeepInterface) -> None:
+        """
+        Binds format to keep, that writes its frames (called by keep), interned strings are defined in stream
+        of one keep only, so records of other keep sharing format instance would be unreadable
+        """
+        with self._lock:
+            bound_keep = None if self._keep_ref is None else self._keep_ref()
+            if bound_keep is keep:
+                return
+            if bound_keep is not None:
+                raise ValueError(f'{self!r} is already used by {bound_keep!r}, each keep should have its own format')
+            self._keep_ref = weakref.ref(keep)
+            self._string_map = {}  # strings are defined again in stream of new keep
+
+    def _intern(self, string_: str) -> typing.Tuple[int, bytes]:
+        if string_ in self._string_map:
+            return self._string_map[string_], b''
+        string_id = len(self._string_map)
+        self._string_map[string_] = string_id
+        encoded = string_.encode('utf-8')
+        return string_id, self._STRING.pack(
+            self.FRAME_STRING,
+            self._STRING.size - self._HEADER.size + len(encoded),
+            string_id
+        ) + encoded
+
+    def __repr__(self) -> str:
+        return 'BinaryFormat()'
+
+
+class BinaryReader:
+    """ Reads log records from binary stream written with `BinaryFormat` """
+    def __init__(self, stream: typing.BinaryIO) -> None:
+        self._stream = stream
+
+    def __iter__(self) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+        return self.read()
+
+    def read(
+        self,
+        level_set: typing.Optional[typing.Set[str]] = None,
+        channel_set: typing.Optional[typing.Set[str]] = None,
+        since: typing.Optional[datetime.datetime] = None,
+        until: typing.Optional[datetime.datetime] = None,
+    ) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+        """
+        Yields records matching filters (level and channel in set, `since <= date < until`),
+        payload of skipped record is not decoded.
+        Trailing incomplete frame (e.g. after crash) is ignored
+        """
+        header = BinaryFormat._HEADER
+        record_fixed = struct.Struct('<qII')
+        since_timestamp = None if since is None else _encode_date(since)
+        until_timestamp = None if until is None else _encode_date(until)
+        string_map: typing.Dict[int, str] = {}
+        read = self._stream.read
+
+        while True:
+            frame_header = read(header.size)
+            if len(frame_header) < header.size:
+                return
+            kind, length = header.unpack(frame_header)
+            body = read(length)
+            if len(body) < length:
+                return
+
+            if kind == BinaryFormat.FRAME_STRING:
+                string_map[struct.unpack_from('<I', body)[0]] = body[4:].decode('utf-8')
+                continue
+            if kind != BinaryFormat.FRAME_RECORD:
+                continue  # unknown frame kind, e.g. of newer version
+
+            timestamp, level_id, channel_id = record_fixed.unpack_from(body)
+            level = string_map.get(level_id)
+            channel = string_map.get(channel_id)
+            if level is None or channel is None:
+                continue  # string is not defined, e.g. stream is read not from the beginning
+            if (
+                (level_set is not None and level not in level_set)
+                or (channel_set is not None and channel not in channel_set)
+                or (since_timestamp is not None and timestamp < since_timestamp)
+                or (until_timestamp is not None and timestamp >= until_timestamp)
+            ):
+                continue
+
+            message, context, extra = json.loads(body[record_fixed.size:])
+            yield collections.OrderedDict(
+                date=_decode_date(timestamp),
+                channel=channel,
+                level=level,
+                message=message,
+                context=collections.OrderedDict(context),
+                extra=collections.OrderedDict(extra),
+            )
+
+    def __repr__(self) -> str:
+        return f'BinaryReader(stream={self._stream!r})'
+
+
+class IndexedReader:
+    """
+    Reads log records in time range from file written with default `Format` (message could be multiline)
+    or JSON `SerializationFormat` (one record per line), sparse sidecar index (`{filename}.idx`) of line blocks
+    with their time range and levels is built (and extended as file grows) on read, so only matching blocks are parsed
+    """
+    FORMAT_TEXT = 'text'
+    FORMAT_JSON = 'json'
+
+    _INDEX_MAGIC = b'MDLI'
+    _INDEX_HEADER = struct.Struct('<4sHxxQQ32s')  # magic, version, indexed file size, block count, file head
+    _INDEX_BLOCK = struct.Struct('<QIqqH')  # offset, length, min timestamp, max timestamp, level bit mask
+    _CUSTOM_LEVEL_BIT = 1 << len(LEVEL_RANK)
+
+    def __init__(
+        self,
+        filename: str,
+        format_: str = FORMAT_TEXT,
+        date_format: typing.Optional[str] = None,
+        block_size: int = 256 * 1024,
+    ) -> None:
+        assert format_ in (self.FORMAT_TEXT, self.FORMAT_JSON)
+        assert block_size > 0
+        self._filename = filename
+        self._index_filename = f'{filename}.idx'
+        self._format = format_
+        self._date_format = date_format or '%Y-%m-%d %H:%M:%S.%f'
+        self._block_size = block_size
+        self._parse = self._parse_text if format_ == self.FORMAT_TEXT else self._parse_json
+
+    def __iter__(self) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+        return self.read()
+
+    def read(
+        self,
+        since: typing.Optional[datetime.datetime] = None,
+        until: typing.Optional[datetime.datetime] = None,
+        level_set: typing.Optional[typing.Set[str]] = None,
+        channel_set: typing.Optional[typing.Set[str]] = None,
+    ) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+        """
+        Yields records matching filters (`since <= date < until`, level and channel in set) in file order,
+        index is updated before, incomplete trailing line (e.g. being written) is not read
+        """
+        block_list = self.index()
+        since_timestamp = None if since is None else _encode_date(since)
+        until_timestamp = None if until is None else _encode_date(until)
+        level_mask = None if level_set is None else self._level_mask(level_set)
+
+        with open(self._filename, 'rb') as stream:
+            if os.fstat(stream.fileno()).st_size == 0:
+                return
+            mmap_ = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            for offset, length, min_timestamp, max_timestamp, mask in block_list:
+                if (
+                    (since_timestamp is not None and max_timestamp < since_timestamp)
+                    or (until_timestamp is not None and min_timestamp >= until_timestamp)
+                    or (level_mask is not None and not mask & level_mask)
+                ):
+                    continue  # block is not parsed at all
+                if self._format == self.FORMAT_TEXT:
+                    line_list: typing.Iterable[bytes] = self._read_block(mmap_, offset, offset + length)
+                else:
+                    line_list = mmap_[offset:offset + length].split(b'\n')  # JSON line never contains newline
+                for line in line_list:
+                    record = self._parse(line)
+                    if record is None:
+                        continue
+                    timestamp = _encode_date(record['date'])
+                    if (
+                        (since_timestamp is not None and timestamp < since_timestamp)
+                        or (until_timestamp is not None and timestamp >= until_timestamp)
+                        or (level_set is not None and record['level'] not in level_set)
+                        or (channel_set is not None and record['channel'] not in channel_set)
+                    ):
+                        continue
+                    yield record
+        finally:
+            mmap_.close()
+
+    def index(self) -> typing.List[typing.Tuple[int, int, int, int, int]]:
+        """ Builds index (or extends it with blocks of appended lines), returns index blocks """
+        with open(self._filename, 'rb') as stream:
+            size = os.fstat(stream.fileno()).st_size
+            head = stream.read(32).ljust(32, b'\0')  # identifies file, e.g. to rebuild index after rotation
+            block_list, indexed_size = self._load_index(size, head)
+            if indexed_size >= size:
+                return block_list
+
+            stream.seek(indexed_size)
+            new_block_list = self._index_blocks(stream, indexed_size, size)
+            if not new_block_list:
+                return block_list
+
+        indexed_size = new_block_list[-1][0] + new_block_list[-1][1]
+        mode = 'r+b' if block_list and os.path.exists(self._index_filename) else 'w+b'
+        with open(self._index_filename, mode) as index_stream:
+            index_stream.seek(self._INDEX_HEADER.size + len(block_list) * self._INDEX_BLOCK.size)
+            index_stream.write(b''.join(self._INDEX_BLOCK.pack(*block) for block in new_block_list))
+            index_stream.truncate()
+            index_stream.seek(0)  # header is updated after blocks, so crashed update is ignored
+            index_stream.write(self._INDEX_HEADER.pack(
+                self._INDEX_MAGIC, 1, indexed_size, len(block_list) + len(new_block_list), head,
+            ))
+        return block_list + new_block_list
+
+    def _load_index(self, size: int, head: bytes) -> typing.Tuple[typing.List[tuple], int]:
+        """ Loads index blocks and indexed file size, index of other (e.g. rotated) file is dropped """
+        try:
+            with open(self._index_filename, 'rb') as index_stream:
+                data = index_stream.read()
+        except FileNotFoundError:
+            return [], 0
+        if len(data) < self._INDEX_HEADER.size:
+            return [], 0
+        magic, version, indexed_size, block_count, index_head = self._INDEX_HEADER.unpack_from(data)
+        if magic != self._INDEX_MAGIC or version != 1 or indexed_size > size or (
+            index_head[:min(indexed_size, 32)] != head[:min(indexed_size, 32)]
+        ):
+            return [], 0
+        block_list = list(self._INDEX_BLOCK.iter_unpack(
+            data[self._INDEX_HEADER.size:self._INDEX_HEADER.size + block_count * self._INDEX_BLOCK.size]
         ))
+        if len(block_list) < block_count:
+            return [], 0
+        return block_list, indexed_size
+
+    def _index_blocks(self, stream: typing.BinaryIO, offset: int, size: int) -> typing.List[tuple]:
+        """ Splits complete lines from offset into blocks, resolves time range and levels of each one """
+        block_list = []
+        block_offset = offset
+        block_length = 0
+        min_timestamp = max_timestamp = None
+        mask = 0
+        for line in stream:
+            if not line.endswith(b'\n'):
+                break  # incomplete, e.g. being written
+            record = self._parse(line[:-1], full=False)
+            if record is not None:  # block starts with record, not with continuation line of multiline message
+                if block_length >= self._block_size:
+                    block_list.append((block_offset, block_length, min_timestamp or 0, max_timestamp or 0, mask))
+                    block_offset += block_length
+                    block_length = 0
+                    min_timestamp = max_timestamp = None
+                    mask = 0
+                timestamp = _encode_date(record['date'])
+                if min_timestamp is None or timestamp < min_timestamp:
+                    min_timestamp = timestamp
+                if max_timestamp is None or timestamp > max_timestamp:
+                    max_timestamp = timestamp
+                mask |= self._level_bit(record['level'])
+            block_length += len(line)
+        if block_length:
+            block_list.append((block_offset, block_length, min_timestamp or 0, max_timestamp or 0, mask))
+        return block_list
+
+    def _read_block(self, mmap_: mmap.mmap, offset: int, end: int) -> typing.Iterator[bytes]:
+        """
+        Yields lines of records starting in block, continuation lines (e.g. of multiline message) are joined
+        to record line, including ones after block end; leading continuation lines belong to previous block
+        """
+        record_line_list: typing.List[bytes] = []
+        position = offset
+        while True:
+            line_end = mmap_.find(b'\n', position)
+            if line_end < 0:
+                break  # incomplete, e.g. being written
+            line = mmap_[position:line_end]
+            if self._parse(line, full=False) is not None:
+                if record_line_list:
+                    yield b'\n'.join(record_line_list)
+                if position >= end:
+                    return
+                record_line_list = [line]
+            elif record_line_list:
+                record_line_list.append(line)
+            position = line_end + 1
+        if record_line_list:
+            yield b'\n'.join(record_line_list)
+
+    def _level_mask(self, level_set: typing.Iterable[str]) -> int:
+        mask = 0
+        for level in level_set:
+            mask |= self._level_bit(level)
+        return mask
+
+    def _level_bit(self, level: str) -> int:
+        rank = LEVEL_RANK.get(level)
+        return self._CUSTOM_LEVEL_BIT if rank is None else 1 << rank
+
+    def _parse_date(self, date: str) -> datetime.datetime:
+        if self._date_format == '%Y-%m-%d %H:%M:%S.%f':
+            return datetime.datetime.fromisoformat(date)  # much faster than `strptime`
+        return datetime.datetime.strptime(date, self._date_format)
+
+    def _parse_text(self, line: bytes, full: bool = True) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """ Parses line of default `Format`: `[{date}] {channel}.{level}: {message} {context} {extra}` """
+        try:
+            text = line.decode('utf-8')
+            date_end = text.index('] ')
+            head_end = text.index(': ', date_end + 2)
+            channel, level = text[date_end + 2:head_end].rsplit('.', 1)
+            date = self._parse_date(text[1:date_end])
+        except ValueError:  # not a record line, e.g. continuation of multiline message
+            return None
+        record: typing.Dict[str, typing.Any] = collections.OrderedDict(date=date, channel=channel, level=level)
+        if not full:
+            return record
+
+        message = text[head_end + 2:]
+        mapping_list = []
+        for _ in range(2):  # extra, then context, parsed from the end, as message could contain anything
+            position = len(message)
+            while True:
+                position = message.rfind(' {', 0, position)
+                if position < 0:
+                    return None
+                try:
+                    mapping_list.append(json.loads(message[position + 1:], object_pairs_hook=collections.OrderedDict))
+                except ValueError:
+                    continue
+                message = message[:position]
+                break
+        extra, context = mapping_list
+        record.update(message=message, context=context, extra=extra)
+        return record
+
+    def _parse_json(self, line: bytes, full: bool = True) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """ Parses line of JSON `SerializationFormat` """
+        try:
+            record = json.loads(line, object_pairs_hook=collections.OrderedDict)
+            record['date'] = self._parse_date(record['date'])
+        except (ValueError, KeyError, TypeError):
+            return None
+        return record
 
     def __repr__(self) -> str:
-        return f'SerializationFormat(date_format={self._date_format!r})'
+        return (
+            'IndexedReader('
+            f'filename={self._filename!r}, '
+            f'format_={self._format!r}, '
+            f'date_format={self._date_format!r}, '
+            f'block_size={self._block_size!r}'
+            ')'
+        )
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def _encode_date(date: datetime.datetime) -> int:
+    """ Encodes date into microseconds since epoch, naive date is kept as is, aware date is converted into UTC """
+    if date.tzinfo is not None:
+        date = date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (date - _EPOCH) // _MICROSECOND
+
+
+def _decode_date(timestamp: int) -> datetime.datetime:
+    return _EPOCH + datetime.timedelta(microseconds=timestamp)
 
 
 class KeepStream(KeepInterface):
     def __init__(
         self,
         stream_list: typing.List[typing.IO],
-        format_: typing.Optional[FormatInterface] = None
+        format_: typing.Optional[FormatInterface] = None,
+        durability: str = DURABILITY_RECORD,
+        batch_size: int = 1000,
+        buffer_size: int = 65536,
+        flush_interval: typing.Optional[float] = 1.0,
+        level: typing.Optional[str] = None,
+        terminator: typing.Union[str, bytes] = '\n',
     ) -> None:
+        assert durability in (DURABILITY_RECORD, DURABILITY_BATCH, DURABILITY_FSYNC)
+        assert batch_size > 0
+        assert buffer_size > 0
         self._format = format_ or Format()
+        self._cache_key = getattr(self._format, 'cache_key', None)
         self._stream_list = stream_list
+        self._durability = durability
+        self._batch_size = batch_size
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._disabled_level_set = _disabled_level_set(level)
+        self._terminator = terminator  # e.g. `b''` for binary format
+        self._local = threading.local()  # buffer of current thread and its length, see `_register_buffer`
+        self._buffer_list: typing.List[typing.Tuple[threading.Thread, list]] = []  # buffers of all threads
+        self._buffer: list = []  # buffer shared by all threads, when format could be stateful, see `keep`
+        self._buffer_length = 0
+        self._lock = threading.Lock()  # orders writes, so lines of different threads are never interleaved
+        self._ordered = self._cache_key is None  # format could be stateful (e.g. `BinaryFormat`), see `keep`
+        _bind_format(self._format, self)
+        self._closed = threading.Event()
+        self._dropped_count = 0
+        self._flush_at_exit = _weak_method(self.flush)  # keep is not kept alive by `atexit` and flush thread
+        _register_at_fork(self._after_fork)
+
+        if durability != DURABILITY_RECORD:
+            atexit.register(self._flush_at_exit)
+            if flush_interval:
+                _call_periodically(self._flush_at_exit, flush_interval, self._closed, 'md.log.KeepStream')
 
-    def keep(self, record: typing.Dict[str, typing.Any]) -> None:
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
         """ Writes a log message """
-        log = self._format.format(record=record)
+        if record['level'] in self._disabled_level_set:
+            return
+
+        if self._ordered:
+            with self._lock:  # formatted under lock, so e.g. string definition frame is written before its use
+                log = _format_cached(self._format, self._cache_key, record) + self._terminator  # str or bytes
+                if self._durability == DURABILITY_RECORD:
+                    self._write_record(log)
+                    return
+                self._buffer.append(log)  # per-thread buffers would reorder records of different threads
+                self._buffer_length += len(log)
+                if len(self._buffer) >= self._batch_size or self._buffer_length >= self._buffer_size:
+                    self._buffer_length = 0
+                    self._write(self._drain(self._buffer))
+            return
+
+        log = _format_cached(self._format, self._cache_key, record) + self._terminator
+
+        if self._durability == DURABILITY_RECORD:
+            with self._lock:
+                self._write_record(log)
+            return
+
+        local = self._local
+        buffer = getattr(local, 'buffer', None)
+        if buffer is None:
+            buffer = self._register_buffer()
+        buffer.append(log)  # no lock, buffer is appended by its thread only
+        local.length += len(log)
+        if len(buffer) >= self._batch_size or local.length >= self._buffer_size:
+            local.length = 0
+            with self._lock:
+                self._write(self._drain(buffer))
+
+    def flush(self) -> None:
+        """ Writes buffered log messages of all threads """
+        with self._lock:
+            log_list = self._drain(self._buffer)
+            self._buffer_length = 0
+            buffer_list = []
+            for thread, buffer in self._buffer_list:
+                if buffer:
+                    log_list += self._drain(buffer)
+                if thread.is_alive():
+                    buffer_list.append((thread, buffer))
+            self._buffer_list = buffer_list  # buffers of finished threads are drained and forgotten
+            if log_list:
+                self._write(log_list)
+
+    @property
+    def dropped_count(self) -> int:
+        """ Amount of log messages dropped, because keep is closed """
+        return self._dropped_count
+
+    def close(self) -> None:
+        """ Writes buffered log messages and closes streams """
+        atexit.unregister(self._flush_at_exit)
+        self.flush()
+        with self._lock:
+            self._closed.set()  # also stops flush thread
+            for stream in self._stream_list:
+                if not stream.closed:
+                    stream.close()
+
+    def _after_fork(self) -> None:
+        """ Resets buffers in child process, log messages buffered before fork are written by parent process """
+        self._lock = threading.Lock()  # lock could be held by threads, that are gone (e.g. flush thread)
+        self._local = threading.local()
+        self._buffer_list = []
+        self._buffer = []
+        self._buffer_length = 0
+
+    def _register_buffer(self) -> list:
+        buffer: list = []
+        self._local.buffer = buffer
+        self._local.length = 0
+        with self._lock:
+            self._buffer_list.append((threading.current_thread(), buffer))
+        return buffer
+
+    @staticmethod
+    def _drain(buffer: list) -> list:
+        """ Takes buffered log messages, should be called under lock, while buffer thread could append to it """
+        log_list = buffer[:]
+        del buffer[:len(log_list)]
+        return log_list
+
+    def _write_record(self, log: typing.Union[str, bytes]) -> None:
+        if self._closed.is_set():  # e.g. record of other `atexit` hook
+            self._dropped_count += 1
+            return
+        for stream in self._stream_list:
+            stream.write(log)
+            stream.flush()
 
+    def _write(self, log_list: list) -> None:
+        if self._closed.is_set():  # e.g. buffered after close
+            self._dropped_count += len(log_list)
+            return
+        data = self._terminator[:0].join(log_list)
         for stream in self._stream_list:
-            stream.write(log + '\n')
+            stream.write(data)
             stream.flush()
+            if self._durability == DURABILITY_FSYNC:
+                os.fsync(stream.fileno())
 
     @classmethod
-    def from_file(cls, filename_list: typing.List[str], format_: typing.Optional[FormatInterface] = None) -> 'KeepStream':
+    def from_file(
+        cls,
+        filename_list: typing.List[str],
+        format_: typing.Optional[FormatInterface] = None,
+        mode: str = 'a',
+        **kwargs: typing.Any,
+    ) -> 'KeepStream':
+        """ Opens files to append (`mode='ab'` for binary format) and creates keep, see constructor for options """
         assert isinstance(filename_list, list)
         return cls(
-            stream_list=[open(filename, 'a') for filename in filename_list],
+            stream_list=[open(filename, mode) for filename in filename_list],
             format_=format_,
+            **kwargs
         )
 
     def __repr__(self) -> str:
         return f'KeepStream(stream_list={self._stream_list!r}), format={self._format!r}'
 
     def __del__(self) -> None:
+        if hasattr(self, '_flush_at_exit'):
+            atexit.unregister(self._flush_at_exit)
+            log_list = self._buffer + [log for _, buffer in self._buffer_list for log in buffer]
+            if log_list:
+                self._write(log_list)  # dropped, when keep is closed
+            self._closed.set()  # stops flush thread
         if hasattr(self, '_stream_list'):
             for stream in self._stream_list:
                 if not stream.closed:
                     stream.close()
 
 
-class Logger(psr.log.LoggerInterface):
+class KeepQueue(KeepInterface):
+    """ Enqueues log record into bounded queue, that drained by background worker thread into wrapped keep list """
+    _STOP = object()
+
     def __init__(
         self,
-        name: str = 'app',
-        keep_list: typing.Optional[typing.List[KeepInterface]] = None,
-        patch_list: typing.Optional[typing.List[PatchInterface]] = None,
+        keep_list: typing.List[KeepInterface],
+        size: int = 10000,
+        overflow: str = OVERFLOW_BLOCK,
+        sample_rate: int = 10,
+        level: typing.Optional[str] = None,
     ) -> None:
-        self._name = name
-        self._keep_list = keep_list or []
-        self._patch_list = patch_list or []
-        assert len(self._keep_list) > 0, 'No keep action makes no sense'
+        assert len(keep_list) > 0, 'No keep action makes no sense'
+        assert size > 0
+        assert overflow in (OVERFLOW_BLOCK, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST, OVERFLOW_SAMPLE)
+        assert sample_rate > 0
+        self._keep_list = keep_list
+        self._size = size
+        self._overflow = overflow
+        self._sample_rate = sample_rate
+        self._disabled_level_set = _disabled_level_set(level)
+        self._queue: queue.Queue = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._overflow_count = 0
+        self._dropped_count = 0
+        self._closed = False
+        self._thread = self._start()
+        self._close_at_exit = _weak_method(self.close)  # keep is not kept alive by `atexit`
+        atexit.register(self._close_at_exit)
+        _register_at_fork(self._after_fork)
 
-    def __repr__(self) -> str:
-        return (
-            'Logger('
-            f'name={self._name!r}, '
-            f'keep_list={self._keep_list!r}, '
-            f'patch_list={self._patch_list!r}'
-            ')'
-        )
+    @property
+    def dropped_count(self) -> int:
+        """ Amount of records dropped due to queue overflow """
+        return self._dropped_count
 
-    def emergency(self, message: str, context: typing.Optional[dict] = None) -> None:
-        self.log(level=psr.log.LEVEL_EMERGENCY, message=message, context=context)
+    @property
+    def queue_size(self) -> int:
+        """ Amount of records waiting in queue """
+        return self._queue.qsize()
 
-    def alert(self, message: str, context: typing.Optional[dict] = None) -> None:
-        self.log(level=psr.log.LEVEL_ALERT, message=message, context=context)
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Enqueues a log record """
+        if record['level'] in self._disabled_level_set:
+            return
 
-    def critical(self, message: str, context: typing.Optional[dict] = None) -> None:
-        self.log(level=psr.log.LEVEL_CRITICAL, message=message, context=context)
+        if self._closed:
+            with self._lock:
+                self._dropped_count += 1
+            return
 
-    def error(self, message: str, context: typing.Optional[dict] = None) -> None:
-        self.log(level=psr.log.LEVEL_ERROR, message=message, context=context)
+        if self._overflow == OVERFLOW_BLOCK:
+            self._queue.put(record)
+            return
 
-    def warning(self, message: str, context: typing.Optional[dict] = None) -> None:
-        self.log(level=psr.log.LEVEL_WARNING, message=message, context=context)
+        try:
+            self._queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self._overflow == OVERFLOW_DROP_NEWEST:
+                with self._lock:
+                    self._dropped_count += 1
+                return
 
-    def notice(self, message: str, context: typing.Optional[dict] = None) -> None:
-        self.log(level=psr.log.LEVEL_NOTICE, message=message, context=context)
+        with self._lock:
+            if self._overflow == OVERFLOW_SAMPLE:
+                self._overflow_count += 1
+                if self._overflow_count % self._sample_rate != 0:
+                    self._dropped_count += 1
+                    return
 
-    def info(self, message: str, context: typing.Optional[dict] = None) -> None:
-        self.log(level=psr.log.LEVEL_INFO, message=message, context=context)
+            while True:  # drop the oldest record(s) to free a slot
+                try:
+                    self._queue.put_nowait(record)
+                    return
+                except queue.Full:
+                    self._drop_oldest()
 
-    def debug(self, message: str, context: typing.Optional[dict] = None) -> None:
+    def _drop_oldest(self) -> None:
+        try:
+            self._queue.get_nowait()
+        except queue.Empty:
+            return
+        self._queue.task_done()
+        self._dropped_count += 1
+
+    def flush(self) -> None:
+        """ Waits until all enqueued records are kept """
+        if self._thread.is_alive():
+            self._queue.join()
+        for keep in self._keep_list:
+            if hasattr(keep, 'flush'):
+                keep.flush()
+
+    def close(self) -> None:
+        """ Keeps enqueued records and stops worker thread """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self._close_at_exit)
+        self._queue.put(self._STOP)
+        while self._thread.is_alive():  # stop marker might be dropped by concurrent overflow
+            self._thread.join(timeout=0.1)
+            if self._thread.is_alive() and self._queue.empty():
+                self._queue.put(self._STOP)
+        for keep in self._keep_list:
+            if hasattr(keep, 'flush'):
+                keep.flush()
+
+    def _after_fork(self) -> None:
+        """ Restarts worker thread in child process, records enqueued before fork are kept by parent process """
+        self._queue = queue.Queue(maxsize=self._size)  # queue and lock could be held by threads, that are gone
+        self._lock = threading.Lock()
+        if not self._closed:
+            self._thread = self._start()
+
+    def _start(self) -> threading.Thread:
+        """ Starts worker thread, that doesn't refer keep, so discarded keep is collected and its worker stops """
+        thread = threading.Thread(
+            target=self._drain, args=(self._queue, self._keep_list), name='md.log.KeepQueue', daemon=True
+        )
+        thread.start()
+        return thread
+
+    @classmethod
+    def _drain(cls, queue_: queue.Queue, keep_list: typing.List[KeepInterface]) -> None:
+        while True:
+            record = queue_.get()
+            try:
+                if record is cls._STOP:
+                    return
+                for keep in keep_list:
+                    try:
+                        keep.keep(record=record)
+                    except Exception:  # worker must survive a faulty keep
+                        traceback.print_exc()
+            finally:
+                queue_.task_done()
+
+    def __repr__(self) -> str:
+        return (
+            'KeepQueue('
+            f'keep_list={self._keep_list!r}, '
+            f'size={self._size!r}, '
+            f'overflow={self._overflow!r}, '
+            f'sample_rate={self._sample_rate!r}'
+            ')'
+        )
+
+    def __del__(self) -> None:
+        if hasattr(self, '_close_at_exit'):
+            atexit.unregister(self._close_at_exit)
+            if not self._closed:
+                self._queue.put(self._STOP)  # worker keeps enqueued records and stops
+
+
+class KeepRotatingFile(KeepInterface):
+    """
+    Writes log records into a file, that is rotated by size and/or time interval,
+    rotated files are shifted and compressed by background thread (`{filename}.1.gz`, `{filename}.2.gz`, etc)
+    """
+    _STOP = object()
+
+    def __init__(
+        self,
+        filename: str,
+        format_: typing.Optional[FormatInterface] = None,
+        max_bytes: typing.Optional[int] = None,
+        interval: typing.Optional[float] = None,
+        backup_count: int = 7,
+        compress: bool = True,
+        level: typing.Optional[str] = None,
+        terminator: typing.Union[str, bytes] = '\n',
+    ) -> None:
+        assert max_bytes is None or max_bytes > 0
+        assert interval is None or interval > 0
+        assert backup_count >= 0
+        self._filename = filename
+        self._format = format_ or Format()
+        self._cache_key = getattr(self._format, 'cache_key', None)
+        self._max_bytes = max_bytes
+        self._interval = interval
+        self._backup_count = backup_count
+        self._compress = compress
+        self._disabled_level_set = _disabled_level_set(level)
+        self._terminator = terminator  # e.g. `b''` for binary format
+        self._lock = threading.Lock()
+        self._ordered = self._cache_key is None  # format could be stateful (e.g. `BinaryFormat`), see `keep`
+        _bind_format(self._format, self)
+        self._reopen_requested = False
+        self._rotated_queue: queue.Queue = queue.Queue()
+        self._rotated_count = 0
+        self._dropped_count = 0
+        self._closed = False
+        self._size = 0
+        self._stream = self._open()
+        self._rotate_at = self._next_rotate_at()
+        self._thread = threading.Thread(  # worker doesn't refer keep, so discarded keep is collected
+            target=self._process_rotated,
+            args=(self._rotated_queue, filename, backup_count, compress),
+            name='md.log.KeepRotatingFile',
+            daemon=True,
+        )
+        self._thread.start()
+        self._close_at_exit = _weak_method(self.close)  # keep is not kept alive by `atexit`
+        atexit.register(self._close_at_exit)
+
+    @property
+    def dropped_count(self) -> int:
+        """ Amount of log records dropped, because file is closed """
+        return self._dropped_count
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Writes a log message, rotates file before when required """
+        if record['level'] in self._disabled_level_set:
+            return
+
+        if self._ordered:
+            with self._lock:  # formatted under lock, so e.g. string definition frame is written before its use
+                self._write(record, self._encode(record))
+            return
+
+        log = self._encode(record)
+        with self._lock:
+            self._write(record, log)
+
+    def reopen(self) -> None:
+        """
+        Requests to reopen file before next record is written (e.g. after external rotation),
+        it's safe to call in signal handler
+        """
+        self._reopen_requested = True
+
+    def rotate(self) -> None:
+        """ Rotates file immediately """
+        with self._lock:
+            if not self._closed:
+                self._rotate()
+
+    def flush(self) -> None:
+        """ Waits until rotated files are processed """
+        self._rotated_queue.join()
+
+    def close(self) -> None:
+        """ Waits until rotated files are processed, stops worker thread and closes file """
+        atexit.unregister(self._close_at_exit)
+        self.flush()
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if not self._stream.closed:
+                self._stream.close()
+        self._rotated_queue.put(self._STOP)
+        self._thread.join()
+
+    def _encode(self, record: typing.MutableMapping[str, typing.Any]) -> bytes:
+        log = _format_cached(self._format, self._cache_key, record) + self._terminator
+        return log.encode('utf-8') if isinstance(log, str) else log  # binary format output is passed through
+
+    def _write(self, record: typing.MutableMapping[str, typing.Any], log: bytes) -> None:
+        """ Writes encoded log message, rotates file before when required, should be called under lock """
+        if self._closed:  # e.g. record of other thread or `atexit` hook after close
+            self._dropped_count += 1
+            return
+        stream = self._stream
+        if self._reopen_requested:
+            self._reopen_requested = False
+            self._stream.close()
+            self._stream = self._open()
+        if self._size > 0 and (
+            (self._max_bytes is not None and self._size + len(log) > self._max_bytes)
+            or (self._rotate_at is not None and time.time() >= self._rotate_at)
+        ):
+            self._rotate()
+        if self._ordered and self._stream is not stream:  # stateful format was reset for the new file
+            log = self._encode(record)
+        self._stream.write(log)
+        self._stream.flush()
+        self._size += len(log)
+
+    def _open(self) -> typing.BinaryIO:
+        stream = open(self._filename, 'ab')
+        self._size = stream.tell()
+        if self._ordered:
+            _reset_format(self._format)
+        return stream
+
+    def _next_rotate_at(self) -> typing.Optional[float]:
+        if self._interval is None:
+            return None
+        return (time.time() // self._interval + 1) * self._interval  # aligned to interval since epoch
+
+    def _rotate(self) -> None:
+        self._stream.close()
+        self._rotated_count += 1
+        rotated_filename = f'{self._filename}.{os.getpid()}-{self._rotated_count}.rotated'
+        if os.path.exists(self._filename):
+            os.replace(self._filename, rotated_filename)
+            self._rotated_queue.put(rotated_filename)
+        self._stream = self._open()
+        self._rotate_at = self._next_rotate_at()
+
+    @classmethod
+    def _process_rotated(cls, rotated_queue: queue.Queue, filename: str, backup_count: int, compress: bool) -> None:
+        while True:
+            rotated_filename = rotated_queue.get()
+            try:
+                if rotated_filename is cls._STOP:
+                    return
+                cls._shift(rotated_filename, filename, backup_count, compress)
+            except Exception:  # worker must survive e.g. file system error
+                traceback.print_exc()
+            finally:
+                rotated_queue.task_done()
+
+    @staticmethod
+    def _shift(rotated_filename: str, filename: str, backup_count: int, compress: bool) -> None:
+        """ Shifts generations of rotated files and stores just rotated file as the first one """
+        if backup_count == 0:
+            os.remove(rotated_filename)
+            return
+
+        suffix = '.gz' if compress else ''
+        for i in range(backup_count - 1, 0, -1):
+            if os.path.exists(f'{filename}.{i}{suffix}'):
+                os.replace(f'{filename}.{i}{suffix}', f'{filename}.{i + 1}{suffix}')
+
+        if not compress:
+            os.replace(rotated_filename, f'{filename}.1')
+            return
+
+        with open(rotated_filename, 'rb') as source, gzip.open(f'{filename}.1.gz.tmp', 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.replace(f'{filename}.1.gz.tmp', f'{filename}.1.gz')
+        os.remove(rotated_filename)
+
+    def __repr__(self) -> str:
+        return (
+            'KeepRotatingFile('
+            f'filename={self._filename!r}, '
+            f'format_={self._format!r}, '
+            f'max_bytes={self._max_bytes!r}, '
+            f'interval={self._interval!r}, '
+            f'backup_count={self._backup_count!r}, '
+            f'compress={self._compress!r}'
+            ')'
+        )
+
+    def __del__(self) -> None:
+        if hasattr(self, '_close_at_exit'):
+            atexit.unregister(self._close_at_exit)
+            if not self._closed:
+                self._rotated_queue.put(self._STOP)  # worker processes rotated files and stops
+                self._stream.close()
+
+
+class KeepCompressedFile(KeepInterface):
+    """
+    Appends log records into a file through incremental compressor (gzip, lzma or bz2),
+    records are buffered by caller and compressed by background thread.
+    Each flush ends compressed member (stream), so the file is readable up to the last flush after crash
+    (concatenated members are read by `gzip.open`, `lzma.open` and `bz2.open` as one stream)
+    """
+    CODEC_GZIP = 'gzip'
+    CODEC_LZMA = 'lzma'
+    CODEC_BZ2 = 'bz2'
+
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(
+        self,
+        filename: str,
+        format_: typing.Optional[FormatInterface] = None,
+        codec: str = CODEC_GZIP,
+        compression_level: typing.Optional[int] = None,
+        buffer_size: int = 65536,
+        flush_interval: float = 1.0,
+        queue_size: int = 64,
+        level: typing.Optional[str] = None,
+        terminator: typing.Union[str, bytes] = '\n',
+    ) -> None:
+        assert codec in (self.CODEC_GZIP, self.CODEC_LZMA, self.CODEC_BZ2)
+        assert buffer_size > 0
+        assert flush_interval > 0
+        assert queue_size > 0
+        self._filename = filename
+        self._format = format_ or Format()
+        self._cache_key = getattr(self._format, 'cache_key', None)
+        self._codec = codec
+        self._compression_level = compression_level
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._disabled_level_set = _disabled_level_set(level)
+        self._terminator = terminator  # e.g. `b''` for binary format
+        self._lock = threading.Lock()  # orders chunks, so lines of different threads are never interleaved
+        self._ordered = self._cache_key is None  # format could be stateful (e.g. `BinaryFormat`), see `keep`
+        _bind_format(self._format, self)
+        self._buffer: typing.List[bytes] = []
+        self._buffer_length = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)  # caller waits, when compression falls behind
+        self._closed = False
+        self._dropped_count = 0
+        self._stream = open(filename, 'ab')  # new members are appended to members of existing file
+        self._thread = threading.Thread(target=self._compress, name='md.log.KeepCompressedFile', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def dropped_count(self) -> int:
+        """ Amount of records dropped, as keep is closed or compression thread is dead """
+        return self._dropped_count
+
+    @property
+    def queue_size(self) -> int:
+        """ Amount of chunks waiting for compression """
+        return self._queue.qsize()
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Buffers a log message, passes buffer to compression thread, when it's full """
+        if record['level'] in self._disabled_level_set:
+            return
+
+        if self._ordered:
+            with self._lock:  # formatted under lock, so e.g. string definition frame is written before its use
+                self._append(self._encode(record))
+            return
+
+        log = self._encode(record)
+        with self._lock:
+            self._append(log)
+
+    def flush(self) -> None:
+        """ Compresses buffered log messages and ends compressed member, waits until it's written """
+        event = threading.Event()
+        with self._lock:
+            if self._closed:
+                return
+            if self._buffer:
+                self._put(self._take())
+            if not self._put((self._FLUSH, event)):
+                return
+        while not event.wait(timeout=0.1) and self._thread.is_alive():
+            pass
+
+    def close(self) -> None:
+        """ Compresses buffered log messages, stops compression thread and closes file """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            atexit.unregister(self.close)
+            if self._buffer:
+                self._put(self._take())
+            self._put((self._STOP, None))
+        self._thread.join()
+        if not self._stream.closed:  # worker is dead
+            self._stream.close()
+
+    def _encode(self, record: typing.MutableMapping[str, typing.Any]) -> bytes:
+        log = _format_cached(self._format, self._cache_key, record) + self._terminator
+        return log.encode('utf-8') if isinstance(log, str) else log  # binary format output is passed through
+
+    def _append(self, log: bytes) -> None:
+        """ Buffers encoded log message, should be called under lock """
+        if self._closed:
+            self._dropped_count += 1
+            return
+        self._buffer.append(log)
+        self._buffer_length += len(log)
+        if self._buffer_length >= self._buffer_size:
+            count = len(self._buffer)
+            if not self._put(self._take()):
+                self._dropped_count += count
+
+    def _put(self, item: typing.Any) -> bool:
+        """ Enqueues item for compression thread, waits while queue is full, unless thread is dead """
+        while True:
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if not self._thread.is_alive():
+                    return False
+
+    def _take(self) -> bytes:
+        """ Takes buffered log messages, should be called under lock """
+        chunk = b''.join(self._buffer)
+        self._buffer = []
+        self._buffer_length = 0
+        return chunk
+
+    def _compressor(self) -> typing.Any:
+        if self._codec == self.CODEC_GZIP:
+            level = zlib.Z_DEFAULT_COMPRESSION if self._compression_level is None else self._compression_level
+            return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip header and trailer
+        if self._codec == self.CODEC_LZMA:
+            import lzma  # optional stdlib module
+            return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=self._compression_level)
+        import bz2  # optional stdlib module
+        return bz2.BZ2Compressor(9 if self._compression_level is None else self._compression_level)
+
+    def _compress(self) -> None:
+        compressor = None  # member is started by the first chunk after flush
+        flush_at = time.monotonic() + self._flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(flush_at - time.monotonic(), 0))
+            except queue.Empty:
+                with self._lock:  # records are rare, so buffer is not filled until flush interval
+                    item = self._take() if self._buffer else None
+            chunk = marker = event = None  # separate locals, so failed write never breaks marker handling
+            if isinstance(item, bytes):
+                chunk = item
+            elif item is not None:
+                marker, event = item
+            try:
+                if chunk is not None:
+                    if compressor is None:
+                        compressor = self._compressor()
+                    self._stream.write(compressor.compress(chunk))
+                if marker is not None or time.monotonic() >= flush_at:
+                    flush_at = time.monotonic() + self._flush_interval
+                    if compressor is not None:
+                        self._stream.write(compressor.flush())
+                        self._stream.flush()
+                        compressor = None
+            except Exception:  # worker must survive e.g. file system error, broken member is not continued
+                compressor = None
+                traceback.print_exc()
+            finally:
+                if event is not None:
+                    event.set()
+            if marker is self._STOP:
+                self._stream.close()
+                return
+
+    def __repr__(self) -> str:
+        return (
+            'KeepCompressedFile('
+            f'filename={self._filename!r}, '
+            f'format_={self._format!r}, '
+            f'codec={self._codec!r}, '
+            f'compression_level={self._compression_level!r}'
+            ')'
+        )
+
+
+class KeepMappedFile(KeepInterface):
+    """
+    Appends formatted log records into preallocated memory-mapped segment files
+    (`{filename}.000001`, `{filename}.000002`, etc), segment is sealed and the next one is created when it's full.
+    Record is copied with length prefix (so record could contain line breaks, e.g. rendered traceback),
+    segment header holds write cursor, that is updated after record bytes are copied,
+    so `MappedFileReader` reads complete records only without any locking.
+    Lock orders writes of one process only, so each process should write its own segments
+    """
+    SEGMENT_MAGIC = b'MDLS'
+
+    _HEADER = struct.Struct('<4sB3xQ')  # magic, sealed flag, padding, write cursor (offset of free space)
+    _CURSOR = struct.Struct('<Q')
+    _LENGTH = struct.Struct('<I')  # record length prefix
+    _SEALED_OFFSET = 4
+    _CURSOR_OFFSET = 8
+
+    def __init__(
+        self,
+        filename: str,
+        format_: typing.Optional[FormatInterface] = None,
+        segment_size: int = 64 * 1024 * 1024,
+        segment_count: typing.Optional[int] = None,
+        level: typing.Optional[str] = None,
+    ) -> None:
+        assert segment_size > self._HEADER.size
+        assert segment_count is None or segment_count > 0
+        self._filename = filename
+        self._format = format_ or Format()
+        self._cache_key = getattr(self._format, 'cache_key', None)
+        self._segment_size = segment_size
+        self._segment_count = segment_count  # amount of the latest segments to retain, all are retained when None
+        self._disabled_level_set = _disabled_level_set(level)
+        self._lock = threading.Lock()
+        self._ordered = self._cache_key is None  # format could be stateful (e.g. `BinaryFormat`), see `keep`
+        _bind_format(self._format, self)
+        self._mmap: typing.Optional[mmap.mmap] = None
+        self._size = 0
+
+        index_list = _segment_index_list(filename)
+        self._index = index_list[-1] if index_list else 1
+        self._open(create=not index_list)
+        atexit.register(self.close)
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Copies formatted log record into current segment, rolls to the next segment when it's full """
+        if record['level'] in self._disabled_level_set:
+            return
+
+        if self._ordered:
+            with self._lock:  # formatted under lock, so e.g. string definition frame is written before its use
+                self._write(record, self._encode(record))
+            return
+
+        log = self._encode(record)
+        with self._lock:
+            self._write(record, log)
+
+    def flush(self) -> None:
+        """ Syncs current segment to disk (records are visible to readers without it) """
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.flush()
+
+    def close(self) -> None:
+        """ Syncs and unmaps current segment, it's not sealed, so the next keep continues to write it """
+        atexit.unregister(self.close)
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.flush()
+                self._mmap.close()
+                self._mmap = None
+
+    def _encode(self, record: typing.MutableMapping[str, typing.Any]) -> bytes:
+        log = _format_cached(self._format, self._cache_key, record)
+        if isinstance(log, str):  # binary format output is passed through
+            log = log.encode('utf-8')
+        return self._LENGTH.pack(len(log)) + log
+
+    def _write(self, record: typing.MutableMapping[str, typing.Any], log: bytes) -> None:
+        """ Copies encoded log record, rolls to the next segment when required, should be called under lock """
+        mmap_ = self._mmap
+        if mmap_ is None:
+            return  # closed
+        if mmap_.tell() + len(log) > self._size:
+            self._roll(len(log))
+            if self._ordered:  # stateful format was reset for the new segment, definitions could change length
+                log = self._encode(record)
+                if self._HEADER.size + len(log) > self._size:
+                    self._roll(len(log))  # empty segment does not fit record with definitions
+            mmap_ = self._mmap
+            assert mmap_ is not None  # opened by `_roll`
+        mmap_.write(log)  # position of mapping is write cursor
+        self._CURSOR.pack_into(mmap_, self._CURSOR_OFFSET, mmap_.tell())  # published after record bytes
+
+    def _open(self, create: bool, length: int = 0) -> None:
+        filename = _segment_filename(self._filename, self._index)
+        with open(filename, 'w+b' if create else 'r+b') as stream:
+            if create:  # preallocated (sparse where file system supports it), fits record larger than segment
+                stream.truncate(max(self._segment_size, self._HEADER.size + length))
+                stream.write(self._HEADER.pack(self.SEGMENT_MAGIC, 0, self._HEADER.size))
+                stream.flush()
+            mmap_ = mmap.mmap(stream.fileno(), 0)  # mapping stays valid after file is closed
+        magic, sealed, cursor = self._HEADER.unpack_from(mmap_)
+        assert magic == self.SEGMENT_MAGIC, f'Not a segment file: {filename!r}'
+        mmap_.seek(cursor)
+        self._mmap = mmap_
+        self._size = len(mmap_)
+        if sealed:  # e.g. sealed by previous keep, that crashed before next segment is created
+            self._roll(0)
+
+    def _roll(self, length: int) -> None:
+        """ Seals current segment, creates the next one, that fits record of provided length at least """
+        assert self._mmap is not None
+        self._mmap[self._SEALED_OFFSET] = 1  # readers move to the next segment after they read sealed one
+        self._mmap.close()
+        self._index += 1
+        if self._ordered:
+            _reset_format(self._format)  # segment is readable on its own, e.g. after older ones are removed
+        self._open(create=True, length=length)
+        if self._segment_count is not None:
+            for index in _segment_index_list(self._filename)[:-self._segment_count]:
+                try:
+                    os.remove(_segment_filename(self._filename, index))
+                except FileNotFoundError:  # e.g. removed by other process
+                    pass
+
+    def __repr__(self) -> str:
+        return (
+            'KeepMappedFile('
+            f'filename={self._filename!r}, '
+            f'format_={self._format!r}, '
+            f'segment_size={self._segment_size!r}, '
+            f'segment_count={self._segment_count!r}'
+            ')'
+        )
+
+
+class MappedFileReader:
+    """
+    Reads (and optionally tails) log records written with `KeepMappedFile`, while it's writing them,
+    records of binary format (e.g. `BinaryFormat`) are yielded as bytes when `binary` is set
+    """
+    def __init__(self, filename: str, poll_interval: float = 0.1, binary: bool = False) -> None:
+        self._filename = filename
+        self._poll_interval = poll_interval
+        self._binary = binary
+
+    def __iter__(self) -> typing.Iterator[typing.Any]:
+        return self.read()
+
+    def read(self, follow: bool = False) -> typing.Iterator[typing.Any]:
+        """
+        Yields formatted records (str or bytes) of all segments in order,
+        when `follow` is set, waits for new records instead of stop at the end of current segment
+        """
+        index_list = _segment_index_list(self._filename)
+        while not index_list:
+            if not follow:
+                return
+            time.sleep(self._poll_interval)
+            index_list = _segment_index_list(self._filename)
+
+        index = index_list[0]
+        while True:
+            try:
+                sealed = yield from self._read_segment(index, follow)
+            except FileNotFoundError:
+                index_list = [index_ for index_ in _segment_index_list(self._filename) if index_ > index]
+                if index_list:  # removed by retention, continue from the oldest retained
+                    index = index_list[0]
+                    continue
+                if not follow:
+                    return
+                time.sleep(self._poll_interval)  # sealed, but the next one is not created yet
+                continue
+            if not sealed:
+                return
+            index += 1
+
+    def _read_segment(self, index: int, follow: bool) -> typing.Generator[typing.Any, None, bool]:
+        """ Yields records of segment, returns whether segment is sealed (so the next one exists) """
+        header = KeepMappedFile._HEADER
+        length_struct = KeepMappedFile._LENGTH
+        with open(_segment_filename(self._filename, index), 'rb') as stream:
+            while os.fstat(stream.fileno()).st_size < header.size:  # just created, not preallocated yet
+                if not follow:
+                    return False
+                time.sleep(self._poll_interval)
+            mmap_ = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            position = header.size
+            while True:
+                sealed = mmap_[KeepMappedFile._SEALED_OFFSET]  # read before cursor, so cursor is final when sealed
+                cursor = KeepMappedFile._CURSOR.unpack_from(mmap_, KeepMappedFile._CURSOR_OFFSET)[0]
+                while position < cursor:
+                    length, = length_struct.unpack_from(mmap_, position)
+                    position += length_struct.size + length
+                    log = mmap_[position - length:position]
+                    yield log if self._binary else log.decode('utf-8')
+                if sealed:
+                    return True
+                if not follow:
+                    return False
+                time.sleep(self._poll_interval)
+        finally:
+            mmap_.close()
+
+    def __repr__(self) -> str:
+        return (
+            'MappedFileReader('
+            f'filename={self._filename!r}, '
+            f'poll_interval={self._poll_interval!r}, '
+            f'binary={self._binary!r}'
+            ')'
+        )
+
+
+def _segment_filename(filename: str, index: int) -> str:
+    return f'{filename}.{index:06d}'
+
+
+def _segment_index_list(filename: str) -> typing.List[int]:
+    """ Lists indexes of existing segment files in ascending order """
+    directory, prefix = os.path.split(os.path.abspath(filename))
+    prefix += '.'
+    return sorted(
+        int(name[len(prefix):]) for name in os.listdir(directory)
+        if name.startswith(prefix) and name[len(prefix):].isdigit()
+    )
+
+
+class KeepCollector(KeepInterface):
+    """
+    Sends formatted log records from any process into single collector process,
+    that owns file streams and writes records in batches (e.g. for pre-fork servers)
+    """
+    def __init__(
+        self,
+        filename_list: typing.List[str],
+        format_: typing.Optional[FormatInterface] = None,
+        batch_size: int = 1000,
+        level: typing.Optional[str] = None,
+    ) -> None:
+        assert isinstance(filename_list, list)
+        assert batch_size > 0
+        self._filename_list = filename_list
+        self._format = format_ or Format()
+        self._cache_key = getattr(self._format, 'cache_key', None)
+        self._batch_size = batch_size
+        self._disabled_level_set = _disabled_level_set(level)
+        import multiprocessing
+        self._pid = os.getpid()
+        self._queue: 'multiprocessing.Queue' = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_collect,
+            args=(self._queue, filename_list, batch_size),
+            name='md.log.KeepCollector',
+        )
+        self._process.start()
+        self._lock = threading.Lock()
+        self._dropped_count = 0
+        self._closed = False
+        atexit.register(self.close)
+
+    @property
+    def dropped_count(self) -> int:
+        """ Amount of log records dropped, because keep is closed """
+        return self._dropped_count
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Formats a log record and sends it to collector process """
+        if record['level'] in self._disabled_level_set:
+            return
+
+        if self._closed:  # e.g. record of other `atexit` hook, collector process could be stopped already
+            with self._lock:
+                self._dropped_count += 1
+            return
+
+        self._queue.put(_format_cached(self._format, self._cache_key, record))
+
+    def close(self) -> None:
+        """
+        Sends pending records to collector process,
+        in process that created the keep, also waits until collector process writes all records and stops
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        atexit.unregister(self.close)
+
+        if os.getpid() != self._pid:  # e.g. forked worker process
+            self._queue.close()
+            self._queue.join_thread()
+            return
+
+        self._queue.put(None)
+        self._process.join()
+
+    def __repr__(self) -> str:
+        return (
+            'KeepCollector('
+            f'filename_list={self._filename_list!r}, '
+            f'format_={self._format!r}, '
+            f'batch_size={self._batch_size!r}'
+            ')'
+        )
+
+
+def _collect(queue_: 'multiprocessing.Queue', filename_list: typing.List[str], batch_size: int) -> None:
+    """ Collector process routine of `KeepCollector`: writes received formatted records until `None` received """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # stops on parent process request only
+    stream_list = [open(filename, 'a') for filename in filename_list]
+    try:
+        stop = False
+        while not stop:
+            batch = []
+            log = queue_.get()
+            while True:
+                if log is None:
+                    stop = True
+                    break
+                batch.append(log)
+                if len(batch) >= batch_size:
+                    break
+                try:
+                    log = queue_.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                data = '\n'.join(batch) + '\n'
+                for stream in stream_list:
+                    stream.write(data)
+                    stream.flush()
+    finally:
+        for stream in stream_list:
+            stream.close()
+
+
+class _KeepSuppress(KeepInterface):
+    """ Base of keeps, that suppress some records and periodically keep summary record with suppressed counts """
+    SUMMARY_CHANNEL = 'md.log'
+    SUMMARY_MESSAGE = 'Log records suppressed'
+
+    def __init__(
+        self,
+        keep_list: typing.List[KeepInterface],
+        summary_interval: typing.Optional[float],
+        summary_size: int = 100,
+    ) -> None:
+        assert len(keep_list) > 0, 'No keep action makes no sense'
+        self._keep_list = keep_list
+        self._summary_interval = summary_interval
+        self._summary_size = summary_size
+        self._summary_at = time.monotonic() + (summary_interval or 0)
+        self._suppressed_map: typing.Dict[tuple, int] = {}  # (channel, level, message) -> count
+        self._suppressed_count = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flush_at_exit = _weak_method(self.flush)  # summary is kept at exit, keep is not kept alive
+        atexit.register(self._flush_at_exit)
+        if summary_interval:  # summary is kept without waiting for next record
+            name = f'md.log.{type(self).__name__}'
+            _call_periodically(_weak_method(self._keep_summary), summary_interval, self._closed, name)
+
+    @property
+    def suppressed_count(self) -> int:
+        """ Total amount of suppressed records """
+        return self._suppressed_count
+
+    def flush(self) -> None:
+        """ Keeps summary record of suppressed records immediately """
+        with self._lock:
+            summary = self._summarize()
+        if summary is not None:
+            self._keep(summary)
+        for keep in self._keep_list:
+            if hasattr(keep, 'flush'):
+                keep.flush()
+
+    def close(self) -> None:
+        """ Keeps summary record of suppressed records and stops periodic summary """
+        atexit.unregister(self._flush_at_exit)
+        self._closed.set()
+        self.flush()
+
+    def _keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        for keep in self._keep_list:
+            keep.keep(record=record)
+
+    def _keep_summary(self) -> None:
+        """ Keeps summary record, when summary interval passed """
+        with self._lock:
+            summary = self._summarize_periodically(time.monotonic())
+        if summary is not None:
+            self._keep(summary)
+
+    def _suppress(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Counts suppressed record, should be called under lock """
+        key = (record['channel'], record['level'], record['message'])
+        self._suppressed_map[key] = self._suppressed_map.get(key, 0) + 1
+        self._suppressed_count += 1
+
+    def _summarize_periodically(self, now: float) -> typing.Optional[Record]:
+        """ Makes summary record, when summary interval passed, should be called under lock """
+        if self._summary_interval is None or now < self._summary_at:
+            return None
+        self._summary_at = now + self._summary_interval
+        return self._summarize()
+
+    def _summarize(self) -> typing.Optional[Record]:
+        if not self._suppressed_map:
+            return None
+        suppressed_list = sorted(self._suppressed_map.items(), key=lambda item: item[1], reverse=True)
+        self._suppressed_map = {}
+        return Record(
+            date=datetime.datetime.now(),
+            channel=self.SUMMARY_CHANNEL,
+            level=psr.log.LEVEL_WARNING,
+            message=self.SUMMARY_MESSAGE,
+            context=collections.OrderedDict(
+                suppressed_count=sum(count for _, count in suppressed_list),
+                suppressed=[
+                    collections.OrderedDict(channel=channel, level=level, message=message, count=count)
+                    for (channel, level, message), count in suppressed_list[:self._summary_size]
+                ],
+            ),
+        )
+
+    def __del__(self) -> None:
+        if hasattr(self, '_flush_at_exit'):
+            atexit.unregister(self._flush_at_exit)
+            self._closed.set()
+            summary = self._summarize()
+            if summary is not None:
+                self._keep(summary)
+
+
+class KeepRateLimit(_KeepSuppress):
+    """
+    Limits rate of log records with token bucket per record key (by default: channel, level and message),
+    excessive records are suppressed before format, summary record with suppressed counts is kept periodically
+    """
+    def __init__(
+        self,
+        keep_list: typing.List[KeepInterface],
+        rate: float = 10.0,
+        burst: int = 100,
+        key: typing.Optional[typing.Callable[[typing.MutableMapping[str, typing.Any]], typing.Hashable]] = None,
+        summary_interval: typing.Optional[float] = 60.0,
+        key_count: int = 10000,
+    ) -> None:
+        assert rate > 0
+        assert burst > 0
+        assert key_count > 0
+        super().__init__(keep_list=keep_list, summary_interval=summary_interval)
+        self._rate = rate
+        self._burst = burst
+        self._key = key or self._default_key
+        self._key_count = key_count
+        self._bucket_map: collections.OrderedDict = collections.OrderedDict()  # key -> [tokens, time], LRU ordered
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Keeps a log record, when rate limit is not exceeded """
+        now = time.monotonic()
+        key = self._key(record)
+
+        with self._lock:
+            bucket = self._bucket_map.get(key)
+            if bucket is None:
+                bucket = self._bucket_map[key] = [float(self._burst), now]
+                if len(self._bucket_map) > self._key_count:
+                    self._bucket_map.popitem(last=False)
+            else:
+                self._bucket_map.move_to_end(key)
+                bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+                bucket[1] = now
+
+            is_allowed = bucket[0] >= 1
+            if is_allowed:
+                bucket[0] -= 1
+            else:
+                self._suppress(record)
+            summary = self._summarize_periodically(now)
+
+        if summary is not None:
+            self._keep(summary)
+        if is_allowed:
+            self._keep(record)
+
+    @staticmethod
+    def _default_key(record: typing.MutableMapping[str, typing.Any]) -> typing.Hashable:
+        return record['channel'], record['level'], record['message']
+
+    def __repr__(self) -> str:
+        return (
+            'KeepRateLimit('
+            f'keep_list={self._keep_list!r}, '
+            f'rate={self._rate!r}, '
+            f'burst={self._burst!r}, '
+            f'summary_interval={self._summary_interval!r}'
+            ')'
+        )
+
+
+class KeepSample(_KeepSuppress):
+    """
+    Keeps random sample of log records (e.g. `rate=0.01` keeps 1% records), other records are suppressed
+    before format, summary record with suppressed counts is kept periodically
+    """
+    def __init__(
+        self,
+        keep_list: typing.List[KeepInterface],
+        rate: float,
+        exempt_level: typing.Optional[str] = psr.log.LEVEL_ERROR,
+        summary_interval: typing.Optional[float] = 60.0,
+    ) -> None:
+        assert 0 <= rate <= 1
+        super().__init__(keep_list=keep_list, summary_interval=summary_interval)
+        self._rate = rate
+        self._exempt_level = exempt_level
+        # records of exempt level and more severe ones are never suppressed
+        self._sampled_level_set = _disabled_level_set(exempt_level) if exempt_level else None
+        self._random = random.random
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Keeps a log record, when it's sampled """
+        is_suppressed = (
+            (self._sampled_level_set is None or record['level'] in self._sampled_level_set)
+            and self._random() >= self._rate  # nosec B311 -- not used for security
+        )
+
+        with self._lock:
+            if is_suppressed:
+                self._suppress(record)
+            summary = self._summarize_periodically(time.monotonic())
+
+        if summary is not None:
+            self._keep(summary)
+        if not is_suppressed:
+            self._keep(record)
+
+    def __repr__(self) -> str:
+        return (
+            'KeepSample('
+            f'keep_list={self._keep_list!r}, '
+            f'rate={self._rate!r}, '
+            f'exempt_level={self._exempt_level!r}, '
+            f'summary_interval={self._summary_interval!r}'
+            ')'
+        )
+
+
+class KeepAggregate(KeepInterface):
+    """
+    Collapses repeated log records with the same key (by default: channel, level and message):
+    the first record is kept immediately, repeats within time window are kept as one record
+    with repeat count and first/last repeat dates in `extra`
+    """
+    def __init__(
+        self,
+        keep_list: typing.List[KeepInterface],
+        window: float = 60.0,
+        key: typing.Optional[typing.Callable[[typing.MutableMapping[str, typing.Any]], typing.Hashable]] = None,
+        key_count: int = 10000,
+        flush_interval: typing.Optional[float] = 1.0,
+    ) -> None:
+        assert len(keep_list) > 0, 'No keep action makes no sense'
+        assert window > 0
+        assert key_count > 0
+        self._keep_list = keep_list
+        self._window = window
+        self._key = key or self._default_key
+        self._key_count = key_count
+        # key -> [window start time, last repeat time, repeat count, first repeat date, last repeated record], LRU ordered
+        self._window_map: collections.OrderedDict = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flush_at_exit = _weak_method(self.flush)  # repeats are kept at exit, keep is not kept alive
+        atexit.register(self._flush_at_exit)
+        if flush_interval:  # repeats of expired windows are kept without waiting for next record
+            flush_expired = _weak_method(self._flush_expired)
+            _call_periodically(flush_expired, flush_interval, self._closed, 'md.log.KeepAggregate')
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Keeps a log record, when it's not a repeat within time window """
+        now = time.monotonic()
+        key = self._key(record)
+        aggregate_list = []
+
+        with self._lock:
+            while self._window_map:  # least recently repeated windows are expired first
+                window = next(iter(self._window_map.values()))
+                is_full = len(self._window_map) >= self._key_count and key not in self._window_map
+                if now - window[1] < self._window and not is_full:
+                    break
+                aggregate_list.append(self._window_map.popitem(last=False)[1])
+
+            window = self._window_map.get(key)
+            if window is not None and now - window[0] >= self._window:
+                aggregate_list.append(self._window_map.pop(key))
+                window = None
+
+            if window is None:
+                self._window_map[key] = [now, now, 0, None, None]
+            else:
+                self._window_map.move_to_end(key)
+                window[1] = now
+                window[2] += 1
+                if window[3] is None:
+                    window[3] = record['date']
+                window[4] = record
+
+        self._keep_aggregate(aggregate_list)
+        if window is None:
+            for keep in self._keep_list:
+                keep.keep(record=record)
+
+    def flush(self) -> None:
+        """ Keeps aggregated repeats of all windows immediately """
+        with self._lock:
+            aggregate_list = list(self._window_map.values())
+            self._window_map.clear()
+        self._keep_aggregate(aggregate_list)
+        for keep in self._keep_list:
+            if hasattr(keep, 'flush'):
+                keep.flush()
+
+    def close(self) -> None:
+        """ Keeps aggregated repeats of all windows and stops periodic flush """
+        atexit.unregister(self._flush_at_exit)
+        self._closed.set()
+        self.flush()
+
+    def _flush_expired(self) -> None:
+        """ Keeps aggregated repeats of expired windows """
+        now = time.monotonic()
+        with self._lock:
+            expired_list = [key for key, window in self._window_map.items() if now - window[0] >= self._window]
+            aggregate_list = [self._window_map.pop(key) for key in expired_list]
+        self._keep_aggregate(aggregate_list)
+
+    def _keep_aggregate(self, window_list: typing.List[list]) -> None:
+        for _, _, count, first_date, record in window_list:
+            if count == 0:
+                continue
+            aggregate = Record(
+                date=record['date'],
+                channel=record['channel'],
+                level=record['level'],
+                message=record['message'],
+                context=record['context'],
+                extra=collections.OrderedDict(
+                    record['extra'],
+                    repeat_count=count,
+                    repeat_first_date=first_date.isoformat(sep=' '),
+                    repeat_last_date=record['date'].isoformat(sep=' '),
+                ),
+            )
+            for keep in self._keep_list:
+                keep.keep(record=aggregate)
+
+    @staticmethod
+    def _default_key(record: typing.MutableMapping[str, typing.Any]) -> typing.Hashable:
+        return record['channel'], record['level'], record['message']
+
+    def __repr__(self) -> str:
+        return f'KeepAggregate(keep_list={self._keep_list!r}, window={self._window!r}, key_count={self._key_count!r})'
+
+    def __del__(self) -> None:
+        if hasattr(self, '_flush_at_exit'):
+            atexit.unregister(self._flush_at_exit)
+            self._closed.set()
+            self._keep_aggregate(list(self._window_map.values()))
+
+
+class KeepRingBuffer(KeepInterface):
+    """
+    Stores the last log records (not formatted) in fixed-size ring buffer, global or per thread,
+    when record of trigger level (or more severe) arrives, buffered records are kept with wrapped keep list before it,
+    so debug records are formatted only when there is an error to explain
+    """
+    def __init__(
+        self,
+        keep_list: typing.List[KeepInterface],
+        size: int = 1000,
+        trigger_level: str = psr.log.LEVEL_ERROR,
+        pass_level: typing.Optional[str] = None,
+        per_thread: bool = False,
+    ) -> None:
+        assert len(keep_list) > 0, 'No keep action makes no sense'
+        assert size > 0
+        assert trigger_level in LEVEL_RANK, f'Unknown level {trigger_level!r}'
+        self._keep_list = keep_list
+        self._size = size
+        self._trigger_level = trigger_level
+        self._trigger_level_set = frozenset(LEVEL_RANK) - _disabled_level_set(trigger_level)
+        self._pass_level = pass_level  # records of this level (or more severe) are kept immediately
+        self._pass_level_set = frozenset() if pass_level is None else (
+            frozenset(LEVEL_RANK) - _disabled_level_set(pass_level)
+        )
+        self._per_thread = per_thread
+        self._local = threading.local()
+        self._buffer: typing.Deque[typing.MutableMapping[str, typing.Any]] = collections.deque(maxlen=size)
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Buffers a log record, keeps buffered records and the record, when it's of trigger level """
+        level = record['level']
+        if level in self._trigger_level_set:
+            self.dump()
+        elif level not in self._pass_level_set:
+            self._get_buffer().append(record)  # the oldest record is dropped, when buffer is full
+            return
+
+        for keep in self._keep_list:
+            keep.keep(record=record)
+
+    def dump(self) -> None:
+        """ Keeps buffered records (of current thread in per thread mode) with wrapped keep list """
+        buffer = self._get_buffer()
+        while True:
+            try:
+                record = buffer.popleft()  # atomic, so records buffered concurrently are not lost
+            except IndexError:
+                return
+            for keep in self._keep_list:
+                keep.keep(record=record)
+
+    def clear(self) -> None:
+        """ Drops buffered records (of current thread in per thread mode), e.g. when request is handled """
+        self._get_buffer().clear()
+
+    def flush(self) -> None:
+        """ Flushes wrapped keeps, buffered records are not kept """
+        for keep in self._keep_list:
+            if hasattr(keep, 'flush'):
+                keep.flush()
+
+    def _get_buffer(self) -> typing.Deque[typing.MutableMapping[str, typing.Any]]:
+        if not self._per_thread:
+            return self._buffer
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = collections.deque(maxlen=self._size)
+        return buffer
+
+    def __repr__(self) -> str:
+        return (
+            'KeepRingBuffer('
+            f'keep_list={self._keep_list!r}, '
+            f'size={self._size!r}, '
+            f'trigger_level={self._trigger_level!r}, '
+            f'pass_level={self._pass_level!r}, '
+            f'per_thread={self._per_thread!r}'
+            ')'
+        )
+
+
+class KeepAsync(KeepInterface):
+    """
+    Hands log records to event loop task, that keeps them with wrapped keep list in dedicated thread,
+    so blocking writes never stall event loop; should be used from event loop thread only
+    """
+    def __init__(
+        self,
+        keep_list: typing.List[KeepInterface],
+        size: int = 10000,
+        level: typing.Optional[str] = None,
+    ) -> None:
+        assert len(keep_list) > 0, 'No keep action makes no sense'
+        assert size > 0
+        self._keep_list = keep_list
+        self._size = size
+        self._disabled_level_set = _disabled_level_set(level)
+        import asyncio
+        import concurrent.futures
+        self._asyncio = asyncio
+        self._queue: typing.Optional['asyncio.Queue'] = None  # created in running event loop
+        self._task: typing.Optional['asyncio.Task'] = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='md.log.KeepAsync')
+        self._dropped_count = 0
+
+    @property
+    def dropped_count(self) -> int:
+        """ Amount of records dropped due to queue overflow (see `keep`) """
+        return self._dropped_count
+
+    @property
+    def queue_size(self) -> int:
+        """ Amount of records waiting in queue """
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def keep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """
+        Enqueues a log record without waiting: record is dropped when queue is full,
+        when there is no running event loop record is kept immediately
+        """
+        if record['level'] in self._disabled_level_set:
+            return
+
+        queue_ = self._get_queue()
+        if queue_ is None:
+            self._keep_batch([record])
+            return
+
+        try:
+            queue_.put_nowait(record)
+        except self._asyncio.QueueFull:
+            self._dropped_count += 1
+
+    async def akeep(self, record: typing.MutableMapping[str, typing.Any]) -> None:
+        """ Enqueues a log record, waits for free slot when queue is full (backpressure) """
+        if record['level'] in self._disabled_level_set:
+            return
+        queue_ = self._get_queue()
+        assert queue_ is not None
+        await queue_.put(record)
+
+    async def aflush(self) -> None:
+        """ Waits until all enqueued records are kept """
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def aclose(self) -> None:
+        """ Keeps enqueued records and stops keeping task """
+        await self.aflush()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._queue = None
+        self._executor.shutdown(wait=True)
+
+    def _get_queue(self) -> typing.Optional['asyncio.Queue']:
+        try:
+            loop = self._asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        if self._task is None or self._task.done():
+            self._queue = self._asyncio.Queue(maxsize=self._size)
+            self._task = loop.create_task(self._drain(self._queue))
+        return self._queue
+
+    async def _drain(self, queue_: 'asyncio.Queue') -> None:
+        loop = self._asyncio.get_running_loop()
+        while True:
+            batch = [await queue_.get()]
+            while not queue_.empty() and len(batch) < 1000:
+                batch.append(queue_.get_nowait())
+            try:
+                await loop.run_in_executor(self._executor, self._keep_batch, batch)
+            finally:
+                for _ in batch:
+                    queue_.task_done()
+
+    def _keep_batch(self, batch: typing.List[typing.MutableMapping[str, typing.Any]]) -> None:
+        for record in batch:
+            for keep in self._keep_list:
+                try:
+                    keep.keep(record=record)
+                except Exception:  # task must survive a faulty keep
+                    traceback.print_exc()
+
+    def __repr__(self) -> str:
+        return f'KeepAsync(keep_list={self._keep_list!r}, size={self._size!r})'
+
+
+class Metrics:
+    """
+    Collects metrics of logger pipeline (see `Logger` `metrics` parameter): record counts per channel and level,
+    duration of each patch, format and keep call, bytes formatted per keep, queue size and dropped records of keeps
+    """
+    EMIT_CHANNEL = 'md.log'
+    EMIT_MESSAGE = 'Logger metrics'
+
+    def __init__(self, emit_interval: typing.Optional[float] = None) -> None:
+        assert emit_interval is None or emit_interval > 0
+        self._emit_interval = emit_interval  # snapshot is kept as log record periodically, when set
+        self._emit_at = time.monotonic() + (emit_interval or 0)
+        self._lock = threading.Lock()
+        self._record_count_map: typing.Dict[typing.Tuple[str, str], int] = {}  # (channel, level) -> count
+        self._stage_map: typing.Dict[str, typing.List[int]] = {}  # stage -> [call count, total ns, max ns]
+        self._byte_count_map: typing.Dict[str, int] = {}  # keep name -> formatted bytes
+        self._keep_map: typing.Dict[str, KeepInterface] = {}  # keep name -> keep, to read its queue size, etc
+
+    def watch(self, name: str, keep: KeepInterface) -> None:
+        """ Registers keep to report its gauges (`queue_size`, `dropped_count`, `suppressed_count`) """
+        self._keep_map[name] = keep
+
+    def add(
+        self,
+        channel: str,
+        level: str,
+        stage_list: typing.List[typing.Tuple[str, int]],
+        byte_count_list: typing.List[typing.Tuple[str, int]],
+    ) -> None:
+        """ Adds metrics of one log record: stage durations (in nanoseconds) and bytes formatted per keep """
+        with self._lock:
+            key = channel, level
+            self._record_count_map[key] = self._record_count_map.get(key, 0) + 1
+            for stage, duration in stage_list:
+                value = self._stage_map.get(stage)
+                if value is None:
+                    self._stage_map[stage] = [1, duration, duration]
+                    continue
+                value[0] += 1
+                value[1] += duration
+                if duration > value[2]:
+                    value[2] = duration
+            for name, byte_count in byte_count_list:
+                self._byte_count_map[name] = self._byte_count_map.get(name, 0) + byte_count
+
+    def snapshot(self) -> typing.Dict[str, typing.Any]:
+        """ Returns copy of collected metrics """
+        with self._lock:
+            record_count_map: typing.Dict[str, typing.Dict[str, int]] = {}
+            for (channel, level), count in self._record_count_map.items():
+                record_count_map.setdefault(channel, {})[level] = count
+            stage_map = {
+                stage: {'count': count, 'total_ns': total, 'max_ns': maximum, 'mean_ns': total // count}
+                for stage, (count, total, maximum) in self._stage_map.items()
+            }
+            keep_map: typing.Dict[str, typing.Dict[str, int]] = {
+                name: {'bytes': byte_count} for name, byte_count in self._byte_count_map.items()
+            }
+
+        for name, keep in list(self._keep_map.items()):
+            for gauge in ('queue_size', 'dropped_count', 'suppressed_count'):
+                if hasattr(keep, gauge):
+                    keep_map.setdefault(name, {})[gauge] = getattr(keep, gauge)
+        return {'record_count': record_count_map, 'stage': stage_map, 'keep': keep_map}
+
+    def reset(self) -> None:
+        """ Drops collected counters and durations """
+        with self._lock:
+            self._record_count_map.clear()
+            self._stage_map.clear()
+            self._byte_count_map.clear()
+
+    def emit(self) -> typing.Optional[Record]:
+        """ Returns snapshot record, when emit interval is passed since the previous one """
+        if self._emit_interval is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            if now < self._emit_at:
+                return None
+            self._emit_at = now + self._emit_interval
+        return Record(
+            date=datetime.datetime.now(),
+            channel=self.EMIT_CHANNEL,
+            level=psr.log.LEVEL_INFO,
+            message=self.EMIT_MESSAGE,
+            context=self.snapshot(),
+        )
+
+    def __repr__(self) -> str:
+        return f'Metrics(emit_interval={self._emit_interval!r})'
+
+
+class Logger(psr.log.LoggerInterface):
+    def __init__(
+        self,
+        name: str = 'app',
+        keep_list: typing.Optional[typing.List[KeepInterface]] = None,
+        patch_list: typing.Optional[typing.List[PatchInterface]] = None,
+        level: typing.Optional[str] = None,
+        level_map: typing.Optional[typing.Dict[str, typing.Optional[str]]] = None,
+        context: typing.Optional[dict] = None,
+        metrics: typing.Optional[Metrics] = None,
+    ) -> None:
+        self._name = name
+        self._keep_list = keep_list or []
+        self._patch_list = patch_list or []
+        self._level = level
+        self._level_map = level_map or {}  # minimal level per channel (and its descendant channels)
+        self._context = dict(context) if context else None  # bound context, added into each record context
+        self._disabled_level_set = _disabled_level_set(_resolve_level(name, level, self._level_map))
+        assert len(self._keep_list) > 0, 'No keep action makes no sense'
+        self._metrics = metrics
+        if metrics is not None:  # measured pipeline is used instead, so there is no cost when metrics are disabled
+            self._prepare_metrics(metrics)
+            self.log = self._log_measured  # type: ignore[method-assign]
+
+    def __repr__(self) -> str:
+        return (
+            f'{type(self).__name__}('
+            f'name={self._name!r}, '
+            f'keep_list={self._keep_list!r}, '
+            f'patch_list={self._patch_list!r}, '
+            f'level={self._level!r}, '
+            f'level_map={self._level_map!r}, '
+            f'context={self._context!r}, '
+            f'metrics={self._metrics!r}'
+            ')'
+        )
+
+    def child(self, name: str, context: typing.Optional[dict] = None) -> 'Logger':
+        """
+        Creates logger of `{name}.{child name}` channel, that shares keep and patch lists with this logger,
+        channel level is resolved from `level_map` once on creation
+        """
+        assert name, 'Child channel name is required'
+        return self._derive(name=f'{self._name}.{name}', context=context)
+
+    def bind(self, context: dict) -> 'Logger':
+        """ Creates logger of the same channel, that adds provided context into each record context """
+        return self._derive(name=self._name, context=context)
+
+    def _derive(self, name: str, context: typing.Optional[dict]) -> 'Logger':
+        if context and self._context:
+            context = {**self._context, **context}  # merged once
+        return type(self)(
+            name=name,
+            keep_list=self._keep_list,  # shared, as well as patch list and level map
+            patch_list=self._patch_list,
+            level=self._level,
+            level_map=self._level_map,
+            context=context or self._context,
+            metrics=self._metrics,
+        )
+
+    def is_enabled(self, level: str) -> bool:
+        """ Checks whether log record of provided level will be kept (e.g. to skip building expensive context) """
+        return level not in self._disabled_level_set
+
+    def emergency(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_EMERGENCY in self._disabled_level_set:
+            return
+        self.log(level=psr.log.LEVEL_EMERGENCY, message=message, context=context)
+
+    def alert(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_ALERT in self._disabled_level_set:
+            return
+        self.log(level=psr.log.LEVEL_ALERT, message=message, context=context)
+
+    def critical(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_CRITICAL in self._disabled_level_set:
+            return
+        self.log(level=psr.log.LEVEL_CRITICAL, message=message, context=context)
+
+    def error(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_ERROR in self._disabled_level_set:
+            return
+        self.log(level=psr.log.LEVEL_ERROR, message=message, context=context)
+
+    def warning(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_WARNING in self._disabled_level_set:
+            return
+        self.log(level=psr.log.LEVEL_WARNING, message=message, context=context)
+
+    def notice(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_NOTICE in self._disabled_level_set:
+            return
+        self.log(level=psr.log.LEVEL_NOTICE, message=message, context=context)
+
+    def info(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_INFO in self._disabled_level_set:
+            return
+        self.log(level=psr.log.LEVEL_INFO, message=message, context=context)
+
+    def debug(self, message: str, context: typing.Optional[dict] = None) -> None:
+        if psr.log.LEVEL_DEBUG in self._disabled_level_set:
+            return
         self.log(level=psr.log.LEVEL_DEBUG, message=message, context=context)
 
     def log(self, level: str, message: str, context: typing.Optional[dict] = None) -> None:
         """ Writes a log message """
-        record = collections.OrderedDict(
+        if level in self._disabled_level_set:
+            return
+
+        record = Record(
             date=datetime.datetime.now(),
             channel=self._name,
             level=level,
             message=message,
-            context=context or collections.OrderedDict(),
-            extra=collections.OrderedDict(),
+            context=self._merge_context(context),
         )
 
         for patch in self._patch_list:
@@ -260,3 +3123,146 @@ class Logger(psr.log.LoggerInterface):
 
         for keep in self._keep_list:
             keep.keep(record=record)
+
+    def _prepare_metrics(self, metrics: Metrics) -> None:
+        """ Resolves stage names of patches and keeps, and formats of keeps to measure them separately """
+        self._measured_patch_list = [(f'patch.{type(patch).__name__}', patch) for patch in self._patch_list]
+        # stage name, keep, format (when its output is reused by keep), format cache key, format stage name, levels
+        self._measured_keep_list: typing.List[typing.Tuple[
+            str,
+            KeepInterface,
+            typing.Optional[FormatInterface],
+            typing.Optional[typing.Hashable],
+            str,
+            typing.AbstractSet[str],
+        ]] = []
+        for i, keep in enumerate(self._keep_list):
+            name = f'keep.{i}.{type(keep).__name__}'
+            format_ = getattr(keep, '_format', None)
+            cache_key = getattr(keep, '_cache_key', None)
+            if format_ is None or cache_key is None:  # format output could not be reused by keep
+                format_ = None
+            self._measured_keep_list.append((
+                name,
+                keep,
+                format_,
+                cache_key,
+                f'format.{type(format_).__name__}',
+                getattr(keep, '_disabled_level_set', frozenset()),
+            ))
+            metrics.watch(name, keep)
+
+    def _log_measured(self, level: str, message: str, context: typing.Optional[dict] = None) -> None:
+        """ Writes a log message, as `log` does, measuring each stage """
+        if level in self._disabled_level_set:
+            return
+
+        metrics = self._metrics
+        assert metrics is not None
+        clock = time.perf_counter_ns
+        stage_list = []
+        byte_count_list = []
+        record = Record(
+            date=datetime.datetime.now(),
+            channel=self._name,
+            level=level,
+            message=message,
+            context=self._merge_context(context),
+        )
+
+        for stage, patch in self._measured_patch_list:
+            start = clock()
+            patch.patch(record=record)
+            stage_list.append((stage, clock() - start))
+
+        for stage, keep, format_, cache_key, format_stage, disabled_level_set in self._measured_keep_list:
+            if format_ is not None and level not in disabled_level_set:
+                is_formatted = record._formatted is not None and cache_key in record._formatted
+                start = clock()
+                log = _format_cached(format_, cache_key, record)  # keep reuses formatted record
+                if not is_formatted:
+                    stage_list.append((format_stage, clock() - start))
+                if isinstance(log, str):
+                    byte_count_list.append((stage, len(log) if log.isascii() else len(log.encode('utf-8'))))
+                else:
+                    byte_count_list.append((stage, len(log)))
+            start = clock()
+            keep.keep(record=record)
+            stage_list.append((stage, clock() - start))
+
+        metrics.add(record.channel, level, stage_list, byte_count_list)
+
+        summary = metrics.emit()
+        if summary is not None:
+            for keep in self._keep_list:
+                keep.keep(record=summary)
+
+    def _merge_context(self, context: typing.Optional[dict]) -> typing.Optional[dict]:
+        """ Adds bound context into record context, a copy is made, as patches could modify record context """
+        if self._context is None:
+            return context or None  # created on first access
+        return {**self._context, **context} if context else dict(self._context)
+
+
+class AsyncLogger(Logger):
+    """
+    Logger for event loop applications, in addition to `Logger` methods, provides awaitable ones,
+    that wait for free slot in `KeepAsync` queue (backpressure)
+    """
+    async def aemergency(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_EMERGENCY, message=message, context=context)
+
+    async def aalert(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_ALERT, message=message, context=context)
+
+    async def acritical(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_CRITICAL, message=message, context=context)
+
+    async def aerror(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_ERROR, message=message, context=context)
+
+    async def awarning(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_WARNING, message=message, context=context)
+
+    async def anotice(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_NOTICE, message=message, context=context)
+
+    async def ainfo(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_INFO, message=message, context=context)
+
+    async def adebug(self, message: str, context: typing.Optional[dict] = None) -> None:
+        await self.alog(level=psr.log.LEVEL_DEBUG, message=message, context=context)
+
+    async def alog(self, level: str, message: str, context: typing.Optional[dict] = None) -> None:
+        """ Writes a log message, waits when `KeepAsync` queue is full """
+        if level in self._disabled_level_set:
+            return
+
+        record = Record(
+            date=datetime.datetime.now(),
+            channel=self._name,
+            level=level,
+            message=message,
+            context=self._merge_context(context),
+        )
+
+        for patch in self._patch_list:
+            patch.patch(record=record)
+
+        for keep in self._keep_list:
+            if isinstance(keep, KeepAsync):
+                await keep.akeep(record=record)
+            else:
+                keep.keep(record=record)
+
+    async def aflush(self) -> None:
+        """ Waits until records enqueued into `KeepAsync` keeps are kept """
+        for keep in self._keep_list:
+            if isinstance(keep, KeepAsync):
+                await keep.aflush()
+
+    async def aclose(self) -> None:
+        """ Keeps enqueued records and stops `KeepAsync` keeps """
+        for keep in self._keep_list:
+            if isinstance(keep, KeepAsync):
+                await keep.aclose()
@@ -0,0 +1,732 @@
+"""
+md.log performance benchmark suite, covers each stage of Logger -> patch -> format -> keep pipeline
+and end-to-end configurations, run with:
+
+    python tests/benchmark/md/log.py [--quick] [-k substring ...] [--json result.json]
+
+Results are printed and optionally written as JSON to compare releases.
+"""
+import argparse
+import asyncio
+import collections
+import datetime
+import gc
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+import typing
+
+import psr.log
+import md.log
+
+
+Result = typing.Dict[str, typing.Any]
+BENCHMARK_MAP: typing.Dict[str, typing.Callable[[int], typing.List[Result]]] = collections.OrderedDict()
+
+
+def benchmark(name: str) -> typing.Callable:
+    """ Registers benchmark, that takes scale divider and returns result list """
+    def register(function: typing.Callable[[int], typing.List[Result]]) -> typing.Callable[[int], typing.List[Result]]:
+        BENCHMARK_MAP[name] = function
+        return function
+    return register
+
+
+# Fixture
+def make_record() -> typing.Dict[str, typing.Any]:
+    return collections.OrderedDict(
+        date=datetime.datetime.now(),
+        channel='request',
+        level='info',
+        message='Request handled',
+        context=collections.OrderedDict(method='GET', path='/api/v1/item/42', status=200, duration=0.0042),
+        extra=collections.OrderedDict(pid=4242),
+    )
+
+
+class LegacyFormat(md.log.FormatInterface):
+    """ `md.log.Format` implementation as of 3.2.1 release, that is used as baseline """
+    def __init__(self, record_format: typing.Optional[str] = None, date_format: typing.Optional[str] = None) -> None:
+        self._record_format = record_format or '[{date!s}] {channel!s}.{level!s}: {message!s} {context!s} {extra!s}'
+        self._date_format = date_format or '%Y-%m-%d %H:%M:%S.%f'
+
+    def format(self, record: typing.Dict[str, typing.Any]) -> str:
+        return self._record_format.format(
+            date=record['date'].strftime(self._date_format),
+            channel=record['channel'],
+            level=record['level'],
+            message=record['message'],
+            context=json.dumps(record['context']) if record['context'] else '{}',
+            extra=json.dumps(record['extra']) if record['extra'] else '{}',
+        )
+
+
+class LegacyLogger(md.log.Logger):
+    """ `md.log.Logger` record construction as of 3.2.1 release, that is used as baseline """
+    def log(self, level: str, message: str, context: typing.Optional[dict] = None) -> None:
+        record = collections.OrderedDict(
+            date=datetime.datetime.now(),
+            channel=self._name,
+            level=level,
+            message=message,
+            context=context or collections.OrderedDict(),
+            extra=collections.OrderedDict(),
+        )
+        for patch in self._patch_list:
+            patch.patch(record=record)
+        for keep in self._keep_list:
+            keep.keep(record=record)
+
+
+class NullKeep(md.log.KeepInterface):
+    def keep(self, record: typing.Dict[str, typing.Any]) -> None:
+        pass
+
+
+class CaptureKeep(md.log.KeepInterface):
+    def keep(self, record: typing.Dict[str, typing.Any]) -> None:
+        self.record = record
+
+
+class PreformattedFormat(md.log.FormatInterface):
+    """ Returns the same line, so keep benchmarks measure write path only """
+    def __init__(self) -> None:
+        self._line = md.log.Format().format(make_record())
+
+    def format(self, record: typing.Dict[str, typing.Any]) -> str:
+        return self._line
+
+
+class SlowStream(io.StringIO):
+    """ Stream, that simulates slow disk or pipe """
+    def flush(self) -> None:
+        time.sleep(0.0005)
+
+
+# Measurement
+def measure_speed(function: typing.Callable[[], typing.Any], number: int) -> Result:
+    """ Measures calls per second and nanoseconds per call (best of 5 runs) """
+    duration = min(timeit.repeat(function, number=number, repeat=5))
+    return {'calls_per_sec': number / duration, 'ns_per_call': duration / number * 1e9}
+
+
+def measure_allocation(function: typing.Callable[[], typing.Any], number: int = 1000) -> Result:
+    """ Measures memory blocks and bytes allocated per call and retained by call result """
+    function()  # warm up caches
+    gc.collect()
+    gc.disable()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        retained = [function() for _ in range(number)]
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    del retained
+    statistic_list = after.compare_to(before, 'filename')
+    return {
+        'bytes_per_call': sum(statistic.size_diff for statistic in statistic_list) / number,
+        'blocks_per_call': sum(statistic.count_diff for statistic in statistic_list) / number,
+    }
+
+
+def measure_latency(function: typing.Callable[[], typing.Any], number: int, thread_count: int = 1) -> Result:
+    """ Measures per call latency percentiles, while function is called concurrently by threads """
+    latency_list: typing.List[int] = []
+    barrier = threading.Barrier(thread_count)
+
+    def run() -> None:
+        thread_latency_list = []
+        clock = time.perf_counter_ns
+        barrier.wait()
+        for _ in range(number):
+            start = clock()
+            function()
+            thread_latency_list.append(clock() - start)
+        latency_list.extend(thread_latency_list)
+
+    start = time.perf_counter()
+    thread_list = [threading.Thread(target=run) for _ in range(thread_count)]
+    for thread in thread_list:
+        thread.start()
+    for thread in thread_list:
+        thread.join()
+    duration = time.perf_counter() - start
+
+    return {
+        'calls_per_sec': number * thread_count / duration,
+        'p50_ns': percentile(latency_list, 0.5),
+        'p99_ns': percentile(latency_list, 0.99),
+    }
+
+
+def percentile(value_list: typing.Sequence[float], rank: float) -> float:
+    value_list = sorted(value_list)
+    return value_list[min(len(value_list) - 1, int(len(value_list) * rank))]
+
+
+# Stage
+@benchmark('stage.logger')
+def bench_logger(scale: int) -> typing.List[Result]:
+    result_list = []
+    for case, logger in [
+        ('enabled', md.log.Logger(keep_list=[NullKeep()])),
+        ('disabled level', md.log.Logger(keep_list=[NullKeep()], level=psr.log.LEVEL_WARNING)),
+        ('enabled, legacy OrderedDict record', LegacyLogger(keep_list=[NullKeep()])),
+        ('enabled, metrics', md.log.Logger(keep_list=[NullKeep()], metrics=md.log.Metrics())),
+        ('enabled, child with bound context', md.log.Logger(keep_list=[NullKeep()]).child('http').bind({'request': 1})),
+        ('disabled level by level_map, child', md.log.Logger(
+            keep_list=[NullKeep()],
+            level_map={'app.http': psr.log.LEVEL_WARNING},
+        ).child('http')),
+    ]:
+        result_list.append({
+            'case': case,
+            **measure_speed(lambda: logger.info('Request handled', {'status': 200}), 200000 // scale),
+        })
+
+    for case, logger_class in [('Record', md.log.Logger), ('legacy OrderedDict record', LegacyLogger)]:
+        keep = CaptureKeep()
+        logger = logger_class(keep_list=[keep])
+
+        def log_and_retain() -> typing.Any:
+            logger.info('Request handled')
+            return keep.record
+
+        result_list.append({'case': f'allocation, {case}', **measure_allocation(log_and_retain)})
+    return result_list
+
+
+@benchmark('stage.format')
+def bench_format(scale: int) -> typing.List[Result]:
+    result_list = []
+    record = make_record()
+    for case, record_format in [
+        ('default', None),
+        ('without context and extra', '[{date!s}] {channel!s}.{level!s}: {message!s}'),
+        ('level and message', '{level!s}: {message!s}'),
+        ('date', '{date!s}'),
+    ]:
+        for implementation, format_ in [
+            ('', md.log.Format(record_format=record_format)),
+            (', legacy', LegacyFormat(record_format=record_format)),
+        ]:
+            result_list.append({
+                'case': case + implementation,
+                **measure_speed(lambda: format_.format(record), 100000 // scale),
+            })
+    return result_list
+
+
+@benchmark('stage.serialization_format')
+def bench_serialization_format(scale: int) -> typing.List[Result]:
+    result_list = []
+    record = make_record()
+    case_list = [('json.dumps serializer', md.log.SerializationFormat(serializer=json.dumps))]
+    for backend in md.log.JsonSerializer._BACKEND_TUPLE:
+        try:
+            for binary in [False, True]:
+                serializer = md.log.JsonSerializer(backend=backend, binary=binary)
+                case_list.append((f'{serializer!r}', md.log.SerializationFormat(serializer=serializer)))
+        except ImportError:
+            continue  # optional backend is not installed
+
+    for case, format_ in case_list:
+        result_list.append({'case': case, **measure_speed(lambda: format_.format(record), 100000 // scale)})
+    return result_list
+
+
+@benchmark('stage.static_extra_patch')
+def bench_static_extra_patch(scale: int) -> typing.List[Result]:
+    result_list = []
+    record = make_record()
+    for case, patch_list in [
+        ('PidPatch + ThreadPidPatch', [md.log.PidPatch(), md.log.ThreadPidPatch()]),
+        ('StaticExtraPatch (pid, thread)', [md.log.StaticExtraPatch()]),
+        ('StaticExtraPatch (pid, host, thread)', [
+            md.log.StaticExtraPatch(process_map={'pid': os.getpid, 'host': socket.gethostname}),
+        ]),
+    ]:
+        def patch_record(patch_list: typing.List[md.log.PatchInterface] = patch_list) -> None:
+            for patch in patch_list:
+                patch.patch(record)
+
+        result_list.append({'case': case, **measure_speed(patch_record, 100000 // scale)})
+    return result_list
+
+
+@benchmark('stage.format_exception_patch')
+def bench_format_exception_patch(scale: int) -> typing.List[Result]:
+    def fail(depth: int) -> None:
+        if depth == 0:
+            raise RuntimeError('exception message')
+        fail(depth - 1)
+
+    try:
+        fail(10)
+    except RuntimeError as e:
+        exception = e
+
+    result_list = []
+    for case, patch in [
+        ('traceback of depth 10, not cached', md.log.FormatExceptionPatch(cache=False)),
+        ('traceback of depth 10, cached', md.log.FormatExceptionPatch(cache=True)),
+        ('traceback of depth 10, lazy (never formatted)', md.log.FormatExceptionPatch(cache=False, lazy=True)),
+    ]:
+        def patch_record(patch: md.log.FormatExceptionPatch = patch) -> None:
+            record = make_record()
+            record['context']['exception'] = exception
+            patch.patch(record)
+
+        result_list.append({'case': case, **measure_speed(patch_record, 20000 // scale)})
+    return result_list
+
+
+@benchmark('stage.keep_stream')
+def bench_keep_stream(scale: int) -> typing.List[Result]:
+    result_list = []
+    record = make_record()
+    format_ = md.log.Format()
+    with tempfile.TemporaryDirectory() as directory:
+        for case, durability in [
+            ('record', md.log.DURABILITY_RECORD),
+            ('batch', md.log.DURABILITY_BATCH),
+        ]:
+            for sink in ['memory', 'disk']:
+                if sink == 'memory':
+                    stream_list: typing.List[typing.IO] = [io.StringIO()]
+                else:
+                    stream_list = [open(os.path.join(directory, f'{case}.log'), 'a')]
+                keep = md.log.KeepStream(stream_list=stream_list, format_=format_, durability=durability)
+                result_list.append({
+                    'case': f'{sink}, durability {case}',
+                    **measure_speed(lambda: keep.keep(record), 50000 // scale),
+                })
+                keep.close()
+    return result_list
+
+
+# End-to-end
+def _make_end_to_end_logger(case: str, directory: str) -> md.log.Logger:
+    filename = os.path.join(directory, f'{case}.log')
+    if case == 'text to memory':
+        keep: md.log.KeepInterface = md.log.KeepStream(stream_list=[io.StringIO()])
+    elif case == 'text to disk':
+        keep = md.log.KeepStream.from_file(filename_list=[filename])
+    elif case == 'json to disk, batch':
+        keep = md.log.KeepStream.from_file(
+            filename_list=[filename],
+            format_=md.log.SerializationFormat(serializer=json.dumps),
+            durability=md.log.DURABILITY_BATCH,
+        )
+    elif case == 'text to disk, queue':
+        keep = md.log.KeepQueue(keep_list=[md.log.KeepStream.from_file(filename_list=[filename])])
+    else:
+        raise ValueError(case)
+    return md.log.Logger(keep_list=[keep], patch_list=[md.log.PidPatch(), md.log.FormatExceptionPatch()])
+
+
+END_TO_END_CASE_LIST = ['text to memory', 'text to disk', 'json to disk, batch', 'text to disk, queue']
+
+
+@benchmark('end_to_end')
+def bench_end_to_end(scale: int) -> typing.List[Result]:
+    result_list = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case in END_TO_END_CASE_LIST:
+            logger = _make_end_to_end_logger(case, directory)
+            log = lambda: logger.info('Request handled', {'method': 'GET', 'status': 200})  # noqa: E731
+            result_list.append({'case': case, **measure_speed(log, 20000 // scale)})
+            result_list.append({'case': f'{case}, latency', **measure_latency(log, 20000 // scale)})
+            for keep in logger._keep_list:
+                getattr(keep, 'close', lambda: None)()
+    return result_list
+
+
+@benchmark('end_to_end.contention')
+def bench_contention(scale: int) -> typing.List[Result]:
+    result_list = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case in ['text to disk', 'text to disk, queue']:
+            for thread_count in [1, 4, 16]:
+                logger = _make_end_to_end_logger(case, directory)
+                log = lambda: logger.info('Request handled', {'method': 'GET', 'status': 200})  # noqa: E731
+                result_list.append({
+                    'case': f'{case}, {thread_count} thread(s)',
+                    **measure_latency(log, 20000 // scale // thread_count, thread_count=thread_count),
+                })
+                for keep in logger._keep_list:
+                    getattr(keep, 'close', lambda: None)()
+    return result_list
+
+
+@benchmark('end_to_end.fan_out')
+def bench_fan_out(scale: int) -> typing.List[Result]:
+    result_list = []
+    for keep_count in [1, 2, 4, 8]:
+        for case, cache_key in [('formatted once', ...), ('formatted per keep', None)]:
+            keep_list: typing.List[md.log.KeepInterface] = []
+            for _ in range(keep_count):
+                format_ = md.log.Format()  # equivalent, but separate format instances
+                if cache_key is None:
+                    format_.cache_key = None
+                keep_list.append(md.log.KeepStream(stream_list=[io.StringIO()], format_=format_))
+            logger = md.log.Logger(keep_list=keep_list)
+            result_list.append({
+                'case': f'{keep_count} keep(s), {case}',
+                **measure_speed(lambda: logger.info('Request handled', {'status': 200}), 50000 // scale),
+            })
+    return result_list
+
+
+# Component
+@benchmark('component.keep_stream.contention')
+def bench_keep_stream_contention(scale: int) -> typing.List[Result]:
+    result_list = []
+    record = make_record()
+    with tempfile.TemporaryDirectory() as directory:
+        for case, durability in [('record', md.log.DURABILITY_RECORD), ('batch', md.log.DURABILITY_BATCH)]:
+            for thread_count in [1, 2, 4, 8, 16, 32, 64]:
+                keep = md.log.KeepStream(
+                    stream_list=[open(os.path.join(directory, f'{case}-{thread_count}.log'), 'a')],
+                    format_=PreformattedFormat(),
+                    durability=durability,
+                )
+                result_list.append({
+                    'case': f'durability {case}, {thread_count} thread(s)',
+                    **measure_latency(lambda: keep.keep(record), 64000 // scale // thread_count, thread_count),
+                })
+                keep.close()
+    return result_list
+
+
+@benchmark('component.binary_read')
+def bench_binary_read(scale: int) -> typing.List[Result]:
+    number = 100000 // scale
+    record_list = []
+    for i in range(number):
+        record = make_record()
+        record['level'] = 'error' if i % 100 == 0 else 'info'
+        record_list.append(record)
+
+    json_format = md.log.SerializationFormat(serializer=json.dumps)
+    json_data = '\n'.join(json_format.format(record) for record in record_list)
+    binary_format = md.log.BinaryFormat()
+    binary_data = b''.join(binary_format.format(record) for record in record_list)
+
+    start = time.perf_counter()
+    json_result = [record for record in map(json.loads, json_data.splitlines()) if record['level'] == 'error']
+    json_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    binary_result = list(md.log.BinaryReader(io.BytesIO(binary_data)).read(level_set={'error'}))
+    binary_duration = time.perf_counter() - start
+
+    assert len(json_result) == len(binary_result)
+    return [
+        {'case': 'JSON lines, filter by level', 'records_per_sec': number / json_duration, 'bytes': len(json_data)},
+        {'case': 'binary, filter by level', 'records_per_sec': number / binary_duration, 'bytes': len(binary_data)},
+    ]
+
+
+@benchmark('component.indexed_read')
+def bench_indexed_read(scale: int) -> typing.List[Result]:
+    number = 200000 // scale
+    date = datetime.datetime(2023, 1, 18, 16, 45, 43, 481516)
+    since = date + datetime.timedelta(seconds=number // 2)
+    until = since + datetime.timedelta(seconds=600)  # ten minutes window
+    result_list = []
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'md.log')
+        with open(filename, 'w') as stream:
+            keep = md.log.KeepStream(stream_list=[stream], durability=md.log.DURABILITY_BATCH)
+            for i in range(number):
+                record = make_record()
+                record['date'] = date + datetime.timedelta(seconds=i)
+                keep.keep(record)
+            keep.close()
+        reader = md.log.IndexedReader(filename)
+
+        start = time.perf_counter()
+        scan_count = sum(
+            1 for record in map(reader._parse_text, open(filename, 'rb'))
+            if record is not None and since <= record['date'] < until
+        )
+        result_list.append({'case': 'full scan', 'duration_ms': (time.perf_counter() - start) * 1000})
+
+        start = time.perf_counter()
+        reader.index()
+        result_list.append({
+            'case': 'index build',
+            'duration_ms': (time.perf_counter() - start) * 1000,
+            'bytes': os.path.getsize(f'{filename}.idx'),
+        })
+
+        start = time.perf_counter()
+        count = sum(1 for _ in reader.read(since=since, until=until))
+        result_list.append({'case': 'indexed range query', 'duration_ms': (time.perf_counter() - start) * 1000})
+        assert count == scan_count
+    return result_list
+
+
+@benchmark('component.compressed_file')
+def bench_compressed_file(scale: int) -> typing.List[Result]:
+    number = 200000 // scale
+    record_list = []
+    for i in range(number):
+        record = make_record()
+        record['context']['path'] = f'/api/v1/item/{random.randrange(100000)}'
+        record['context']['duration'] = random.random()
+        record_list.append(record)
+
+    result_list = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case, keep_factory in [
+            ('KeepStream, durability record', lambda filename: md.log.KeepStream.from_file([filename])),
+            ('KeepStream, durability batch', lambda filename: md.log.KeepStream.from_file(
+                [filename], durability=md.log.DURABILITY_BATCH,
+            )),
+        ] + [
+            (f'KeepCompressedFile, {codec}', lambda filename, codec=codec: md.log.KeepCompressedFile(
+                filename=filename, codec=codec,
+            ))
+            for codec in [
+                md.log.KeepCompressedFile.CODEC_GZIP,
+                md.log.KeepCompressedFile.CODEC_LZMA,
+                md.log.KeepCompressedFile.CODEC_BZ2,
+            ]
+        ]:
+            filename = os.path.join(directory, case)
+            start = time.perf_counter()
+            keep = keep_factory(filename)
+            for record in record_list:
+                keep.keep(record)
+            caller_duration = time.perf_counter() - start
+            keep.close()  # waits until compressed
+            duration = time.perf_counter() - start
+            result_list.append({
+                'case': case,
+                'records_per_sec': number / duration,
+                'ns_per_call': caller_duration / number * 1e9,  # caller thread
+                'bytes': os.path.getsize(filename),
+            })
+    return result_list
+
+
+@benchmark('component.mapped_file')
+def bench_mapped_file(scale: int) -> typing.List[Result]:
+    result_list = []
+    record = make_record()
+    format_ = PreformattedFormat()
+    with tempfile.TemporaryDirectory() as directory:
+        for case, keep in [
+            ('KeepStream, durability record', md.log.KeepStream(
+                stream_list=[open(os.path.join(directory, 'stream.log'), 'a')], format_=format_,
+            )),
+            ('KeepStream, durability batch', md.log.KeepStream(
+                stream_list=[open(os.path.join(directory, 'batch.log'), 'a')], format_=format_,
+                durability=md.log.DURABILITY_BATCH,
+            )),
+            ('KeepMappedFile', md.log.KeepMappedFile(
+                filename=os.path.join(directory, 'mapped.log'), format_=format_, segment_size=16 * 1024 * 1024,
+            )),
+        ]:
+            result_list.append({'case': case, **measure_speed(lambda: keep.keep(record), 100000 // scale)})
+            keep.close()
+
+        start = time.perf_counter()
+        count = sum(1 for _ in md.log.MappedFileReader(os.path.join(directory, 'mapped.log')))
+        result_list.append({'case': 'MappedFileReader', 'records_per_sec': count / (time.perf_counter() - start)})
+    return result_list
+
+
+@benchmark('component.ring_buffer')
+def bench_ring_buffer(scale: int) -> typing.List[Result]:
+    result_list = []
+    for case, level, keep_factory in [
+        ('debug disabled', psr.log.LEVEL_INFO, lambda keep: keep),
+        ('debug formatted and kept', None, lambda keep: keep),
+        ('debug buffered by KeepRingBuffer', None, lambda keep: md.log.KeepRingBuffer(keep_list=[keep])),
+        (
+            'debug buffered by KeepRingBuffer, per thread',
+            None,
+            lambda keep: md.log.KeepRingBuffer(keep_list=[keep], per_thread=True),
+        ),
+    ]:
+        keep = keep_factory(md.log.KeepStream(stream_list=[io.StringIO()]))
+        logger = md.log.Logger(keep_list=[keep], level=level)
+        result_list.append({
+            'case': case,
+            **measure_speed(lambda: logger.debug('Query executed', {'rows': 42}), 100000 // scale),
+        })
+    return result_list
+
+
+@benchmark('component.async')
+def bench_async(scale: int) -> typing.List[Result]:
+    number = 2000 // scale
+
+    async def run(logger: md.log.Logger) -> typing.List[float]:
+        lag_list = []
+        done = False
+
+        async def tick() -> None:
+            loop = asyncio.get_running_loop()
+            while not done:
+                start = loop.time()
+                await asyncio.sleep(0.001)
+                lag_list.append((loop.time() - start - 0.001) * 1e9)
+
+        ticker = asyncio.ensure_future(tick())
+        for i in range(number):
+            if isinstance(logger, md.log.AsyncLogger):
+                await logger.ainfo('Request handled', {'i': i})
+            else:
+                logger.info('Request handled', {'i': i})
+            if i % 10 == 0:
+                await asyncio.sleep(0)
+        if isinstance(logger, md.log.AsyncLogger):
+            await logger.aclose()
+        done = True
+        await ticker
+        return lag_list
+
+    result_list = []
+    for case, logger in [
+        ('Logger, KeepStream into slow stream', md.log.Logger(keep_list=[
+            md.log.KeepStream(stream_list=[SlowStream()]),
+        ])),
+        ('AsyncLogger, KeepAsync into slow stream', md.log.AsyncLogger(keep_list=[
+            md.log.KeepAsync(keep_list=[md.log.KeepStream(stream_list=[SlowStream()])]),
+        ])),
+    ]:
+        lag_list = asyncio.run(run(logger))
+        result_list.append({
+            'case': f'event loop lag, {case}',
+            'p50_ns': percentile(lag_list, 0.5),
+            'p99_ns': percentile(lag_list, 0.99),
+        })
+    return result_list
+
+
+@benchmark('component.rate_limit')
+def bench_rate_limit(scale: int) -> typing.List[Result]:
+    result_list = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case in ['KeepStream', 'KeepRateLimit', 'KeepSample 1%']:
+            keep: md.log.KeepInterface = md.log.KeepStream.from_file(filename_list=[os.path.join(directory, 'md.log')])
+            if case == 'KeepRateLimit':
+                keep = md.log.KeepRateLimit(keep_list=[keep])
+            elif case == 'KeepSample 1%':
+                keep = md.log.KeepSample(keep_list=[keep], rate=0.01, exempt_level=None)
+            logger = md.log.Logger(keep_list=[keep])
+            log = lambda: logger.error('Connection failed', {'host': 'db'})  # noqa: E731
+            result_list.append({'case': f'log storm, {case}', **measure_speed(log, 50000 // scale)})
+    return result_list
+
+
+def _keep_process(keep: typing.Optional[md.log.KeepInterface], filename: str, number: int) -> None:
+    if keep is None:  # each process appends to file directly
+        keep = md.log.KeepStream.from_file(filename_list=[filename])
+    logger = md.log.Logger(keep_list=[keep])
+    for _ in range(number):
+        logger.info('Request handled', {'method': 'GET', 'path': '/api/v1/item/42', 'status': 200})
+    if isinstance(keep, md.log.KeepCollector):
+        keep.close()
+
+
+@benchmark('component.collector')
+def bench_collector(scale: int) -> typing.List[Result]:
+    number = 20000 // scale
+    result_list = []
+    context = multiprocessing.get_context('fork')
+    for process_count in [1, 2, 4, 8]:
+        for case in ['direct', 'collector']:
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, 'md.log')
+                keep = md.log.KeepCollector(filename_list=[filename]) if case == 'collector' else None
+                start = time.perf_counter()
+                process_list = [
+                    context.Process(target=_keep_process, args=(keep, filename, number))
+                    for _ in range(process_count)
+                ]
+                for process in process_list:
+                    process.start()
+                for process in process_list:
+                    process.join()
+                if keep is not None:
+                    keep.close()
+                result_list.append({
+                    'case': f'{case}, {process_count} process(es)',
+                    'records_per_sec': process_count * number / (time.perf_counter() - start),
+                })
+    return result_list
+
+
+# Report
+def describe(result: Result) -> str:
+    metric_list = []
+    for key, template in [
+        ('calls_per_sec', '{:,.0f} calls/sec'),
+        ('records_per_sec', '{:,.0f} records/sec'),
+        ('ns_per_call', '{:,.0f} ns/call'),
+        ('p50_ns', 'p50 {:,.0f} ns'),
+        ('p99_ns', 'p99 {:,.0f} ns'),
+        ('bytes_per_call', '{:,.0f} bytes/call'),
+        ('blocks_per_call', '{:.1f} blocks/call'),
+        ('duration_ms', '{:,.1f} ms'),
+        ('bytes', '{:,} bytes'),
+    ]:
+        if key in result:
+            metric_list.append(template.format(result[key]))
+    return f'{result["benchmark"]} [{result["case"]}]: {", ".join(metric_list)}'
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='md.log performance benchmark suite')
+    parser.add_argument('-k', dest='filter_list', action='append', default=[], help='run benchmarks containing substring')
+    parser.add_argument('--quick', action='store_true', help='use 10 times fewer iterations')
+    parser.add_argument('--json', dest='json_filename', help='write results as JSON into file (`-` for stdout)')
+    argument = parser.parse_args(argv)
+
+    scale = 10 if argument.quick else 1
+    result_list = []
+    for name, function in BENCHMARK_MAP.items():
+        if argument.filter_list and not any(filter_ in name for filter_ in argument.filter_list):
+            continue
+        for result in function(scale):
+            result = {'benchmark': name, **result}
+            result_list.append(result)
+            print(describe(result), file=sys.stderr if argument.json_filename == '-' else sys.stdout)
+
+    if argument.json_filename:
+        report = {
+            'md.log': md.log.__version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'date': datetime.datetime.now().isoformat(),
+            'quick': argument.quick,
+            'result_list': result_list,
+        }
+        if argument.json_filename == '-':
+            json.dump(report, sys.stdout, indent=2)
+        else:
+            with open(argument.json_filename, 'w') as stream:
+                json.dump(report, stream, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,26 @@
+import asyncio
+import bz2
 import collections
 import datetime
+import decimal
+import enum
+import gc
+import gzip
+import io
+import json
+import linecache
+import lzma
+import multiprocessing
+import os
+import pathlib
+import threading
+import time
+import traceback
+import typing
+import uuid
+import warnings
+import weakref
+import zlib
 
 import pytest
 import unittest.mock
@@ -8,6 +29,49 @@ import psr.log
 import md.log
 
 
+class TestRecord:
+    def test_mapping(self) -> None:
+        # arrange
+        date = datetime.datetime.now()
+        context = {'foo': 'bar'}
+
+        # act
+        record = md.log.Record(date=date, channel='request', level='info', message='log act', context=context)
+        record['extra']['pid'] = 42
+        record['message'] = 'log act 2'
+        record['custom'] = 'value'
+
+        # assert
+        assert record == collections.OrderedDict(
+            date=date,
+            channel='request',
+            level='info',
+            message='log act 2',
+            context=context,
+            extra={'pid': 42},
+            custom='value',
+        )
+        assert record.message == 'log act 2'
+        assert list(record) == ['date', 'channel', 'level', 'message', 'context', 'extra', 'custom']
+        assert 'custom' in record and 'unknown' not in record
+        assert record.copy() == record
+        del record['custom']
+        assert len(record) == 6
+        with pytest.raises(KeyError):
+            del record['message']
+        with pytest.raises(KeyError):
+            record['unknown']
+
+    def test_lazy_context_and_extra(self) -> None:
+        # act
+        record = md.log.Record(date=datetime.datetime.now(), channel='request', level='info', message='log act')
+
+        # assert
+        assert record._context is None and record._extra is None
+        assert record['context'] == {} and record['extra'] == {}
+        assert record._context is not None and record._extra is not None
+
+
 class TestPidPatch:
     def test_patch(self) -> None:
         # arrange
@@ -40,6 +104,58 @@ class TestThreadPidPatch:
         assert record['extra']['thread'] == 42
 
 
+class TestStaticExtraPatch:
+    def test_patch(self) -> None:  # white/positive
+        # arrange
+        record = {'extra': {'foo': 'bar'}}
+        static_extra_patch = md.log.StaticExtraPatch()
+
+        # act
+        static_extra_patch.patch(record=record)
+
+        # assert
+        assert record['extra'] == {'foo': 'bar', 'pid': os.getpid(), 'thread': threading.get_native_id()}
+
+    def test_patch_computes_once_per_thread(self) -> None:  # white/positive
+        # arrange
+        process_mock = unittest.mock.Mock(return_value='host')
+        thread_mock = unittest.mock.Mock(side_effect=['main', 'worker'])
+        static_extra_patch = md.log.StaticExtraPatch(process_map={'host': process_mock}, thread_map={'thread': thread_mock})
+        record_list = [{'extra': {}} for _ in range(4)]
+
+        # act
+        static_extra_patch.patch(record=record_list[0])
+        static_extra_patch.patch(record=record_list[1])
+        thread = threading.Thread(target=lambda: [static_extra_patch.patch(record=record) for record in record_list[2:]])
+        thread.start()
+        thread.join()
+
+        # assert
+        process_mock.assert_called_once_with()
+        assert thread_mock.call_count == 2
+        assert [record['extra'] for record in record_list] == [
+            {'host': 'host', 'thread': 'main'},
+            {'host': 'host', 'thread': 'main'},
+            {'host': 'host', 'thread': 'worker'},
+            {'host': 'host', 'thread': 'worker'},
+        ]
+
+    def test_patch_after_fork(self) -> None:  # white/positive
+        # arrange
+        pid_mock = unittest.mock.Mock(side_effect=[1, 2])
+        static_extra_patch = md.log.StaticExtraPatch(process_map={'pid': pid_mock}, thread_map={})
+        record_list = [{'extra': {}} for _ in range(3)]
+
+        # act
+        static_extra_patch.patch(record=record_list[0])
+        static_extra_patch.patch(record=record_list[1])
+        md.log._log._increment_fork_generation()  # as `os.register_at_fork` hook does in child process
+        static_extra_patch.patch(record=record_list[2])
+
+        # assert
+        assert [record['extra'] for record in record_list] == [{'pid': 1}, {'pid': 1}, {'pid': 2}]
+
+
 class TestFormatExceptionPatch:
     def test_patch(self) -> None:  # white/positive
         # arrange
@@ -133,6 +249,138 @@ class TestFormatExceptionPatch:
         traceback_format_exception_mock.assert_not_called()
         assert record['context'] == {}  # not changed
 
+    def test_patch_lazy(self) -> None:  # white/positive
+        # arrange
+        try:
+            raise RuntimeError('exception message')
+        except RuntimeError as e:
+            exception = e
+
+        record = md.log.Record(
+            date=datetime.datetime(2020, 1, 1),
+            channel='app',
+            level=psr.log.LEVEL_ERROR,
+            message='Failed',
+            context={'exception': exception},
+        )
+        format_ = md.log.Format(record_format='{context!s}')
+
+        # act
+        with unittest.mock.patch('traceback.format_exception') as traceback_format_exception_mock:
+            traceback_format_exception_mock.return_value = ['RuntimeError: exception message\n']
+            format_exception_patch = md.log.FormatExceptionPatch(lazy=True)
+            format_exception_patch.patch(record=record)
+            traceback_format_exception_mock.assert_not_called()  # not rendered until format
+            formatted = format_.format(record)
+
+        # assert
+        assert isinstance(record['context']['exception'], md.log.LazyTraceback)
+        traceback_format_exception_mock.assert_called_once_with(RuntimeError, exception, exception.__traceback__)
+        assert json.loads(formatted) == {'exception': ['RuntimeError: exception message\n']}
+        assert record['context']['exception'] == ['RuntimeError: exception message\n']
+
+    def test_patch_cache(self) -> None:  # white/positive
+        # arrange
+        try:
+            try:
+                raise ValueError('cause')
+            except ValueError as e:
+                raise RuntimeError('exception message') from e
+        except RuntimeError as e:
+            exception = e
+
+        record_list = [{'level': psr.log.LEVEL_ERROR, 'context': {'exception': exception}} for _ in range(3)]
+
+        # act
+        with unittest.mock.patch('linecache.getline', wraps=linecache.getline) as getline_mock:  # per stack entry
+            format_exception_patch = md.log.FormatExceptionPatch(cache=True)
+            for record in record_list:
+                format_exception_patch.patch(record=record)
+
+        # assert
+        assert getline_mock.call_count == 2  # entries of exception and its cause are extracted once, then reused
+        expected = traceback.format_exception(type(exception), exception, exception.__traceback__)
+        assert [record['context']['exception'] for record in record_list] == [expected] * 3
+
+    def test_patch_cache_reraised(self) -> None:  # white/positive
+        # arrange
+        format_exception_patch = md.log.FormatExceptionPatch(cache=True)
+        logged_list = []
+
+        def fail() -> None:
+            raise RuntimeError()
+
+        def layer(depth: int) -> None:  # each layer logs exception and propagates it
+            try:
+                layer(depth - 1) if depth else fail()
+            except RuntimeError as e:
+                record = format_exception_patch.patch(record={'level': psr.log.LEVEL_ERROR, 'context': {'exception': e}})
+                logged_list.append((record, e, e.__traceback__))
+                raise
+
+        # act
+        with unittest.mock.patch('linecache.getline', wraps=linecache.getline) as getline_mock:  # per stack entry
+            with pytest.raises(RuntimeError):
+                layer(2)
+
+        # assert
+        assert getline_mock.call_count == 2 + 1 + 1  # outer layers extract their own entries only
+        assert [record['context']['exception'] for record, _, _ in logged_list] == [
+            traceback.format_exception(type(exception), exception, traceback_)  # as not cached
+            for _, exception, traceback_ in logged_list
+        ]
+        assert [sum('in layer' in line for line in record['context']['exception']) for record, _, _ in logged_list] == [
+            1, 2, 3,  # frames of outer layers are rendered
+        ]
+
+    def test_patch_cache_not_retained(self) -> None:  # white/positive
+        # arrange
+        class Local:
+            pass
+
+        format_exception_patch = md.log.FormatExceptionPatch(cache=True)
+
+        def fail() -> None:
+            local = Local()  # noqa: F841  # referred by frame of traceback
+            raise RuntimeError()
+
+        def log() -> weakref.ref:
+            try:
+                fail()
+            except RuntimeError as e:
+                format_exception_patch.patch(record={'level': psr.log.LEVEL_ERROR, 'context': {'exception': e}})
+                return weakref.ref(e.__traceback__.tb_next.tb_frame.f_locals['local'])
+            raise AssertionError()
+
+        # act
+        local_ref = log()
+        gc.collect()
+
+        # assert
+        assert local_ref() is None  # patch doesn't keep exception, its traceback and frames alive
+
+    def test_patch_limit(self) -> None:  # white/positive
+        # arrange
+        try:
+            raise RuntimeError()
+        except RuntimeError as e:
+            exception = e
+
+        record = {'level': psr.log.LEVEL_ERROR, 'context': {'exception': exception}}
+
+        # act
+        with unittest.mock.patch('traceback.format_exception') as traceback_format_exception_mock:
+            format_exception_patch = md.log.FormatExceptionPatch(cache=False, limit=5)
+            format_exception_patch.patch(record=record)
+
+        # assert
+        traceback_format_exception_mock.assert_called_once_with(
+            RuntimeError,
+            exception,
+            exception.__traceback__,
+            limit=5,
+        )
+
 
 class TestFormat:
     @pytest.mark.parametrize(
@@ -171,6 +419,142 @@ class TestFormat:
         assert log == f'[{now_datetime_scalar!s}] {channel!s}.{level!s}: {message!s}' + ' {"foo": "bar"} {"bar": "baz"}'
 
 
+    def test_format_renders_referenced_fields_only(self) -> None:
+        # arrange
+        date_mock = unittest.mock.Mock(spec=datetime.datetime)
+        record = dict(date=date_mock, channel='request', level='info', message='log act', context={'foo': 'bar'}, extra={})
+
+        # act
+        format_ = md.log.Format(record_format='{channel!s}.{level!s:>6}: {message!s} {{literal}}')
+        with unittest.mock.patch('json.dumps') as json_dumps_mock:
+            log = format_.format(record=record)
+
+        # assert
+        assert log == 'request.  info: log act {literal}'
+        date_mock.strftime.assert_not_called()
+        json_dumps_mock.assert_not_called()
+
+    @pytest.mark.parametrize('record_format,expected_log', [
+        ('{message[0]}', 'l'),  # item of field
+        ('{message!s:{level}}', 'log act'),  # nested field
+    ])
+    def test_format_not_compiled_format(self, record_format: str, expected_log: str) -> None:  # white/negative
+        # arrange
+        record = dict(
+            date=datetime.datetime.now(), channel='request', level='', message='log act', context={'foo': 'bar'}, extra={}
+        )
+
+        # act
+        log = md.log.Format(record_format=record_format).format(record=record)
+
+        # assert
+        assert log == expected_log
+
+
+    @pytest.mark.parametrize('date_format', [
+        '%Y-%m-%d %H:%M:%S.%f',
+        '%Y-%m-%dT%H:%M:%S',
+        '%H:%M:%S.%f %%f %f',
+        '%f',
+    ])
+    def test_format_date(self, date_format: str) -> None:
+        # arrange
+        date_list = [
+            datetime.datetime(2023, 1, 18, 16, 45, 43, 481516),
+            datetime.datetime(2023, 1, 18, 16, 45, 43, 7),  # same second
+            datetime.datetime(2023, 1, 18, 16, 45, 44, 0),
+            datetime.datetime(2023, 1, 18, 16, 45, 44, 0, tzinfo=datetime.timezone.utc),
+        ]
+        format_ = md.log.Format(record_format='{date!s}', date_format=date_format)
+
+        # act
+        log_list = [
+            format_.format(record=dict(date=date, channel='', level='', message='', context={}, extra={}))
+            for date in date_list
+        ]
+
+        # assert
+        assert log_list == [date.strftime(date_format) for date in date_list]
+
+    def test_format_date_fold(self) -> None:
+        # arrange
+        class Timezone(datetime.tzinfo):  # e.g. Europe/Berlin on DST fall-back
+            def utcoffset(self, dt: typing.Optional[datetime.datetime]) -> datetime.timedelta:
+                return datetime.timedelta(hours=1 if dt is not None and dt.fold else 2)
+
+            def dst(self, dt: typing.Optional[datetime.datetime]) -> datetime.timedelta:
+                return datetime.timedelta(hours=0 if dt is not None and dt.fold else 1)
+
+            def tzname(self, dt: typing.Optional[datetime.datetime]) -> str:
+                return 'CET' if dt is not None and dt.fold else 'CEST'
+
+        date_format = '%Y-%m-%d %H:%M:%S.%f %z %Z'
+        timezone = Timezone()
+        date_list = [
+            datetime.datetime(2023, 10, 29, 2, 30, 0, 100, tzinfo=timezone),
+            datetime.datetime(2023, 10, 29, 2, 30, 0, 200, tzinfo=timezone, fold=1),  # the same wall time repeated
+        ]
+        format_ = md.log.Format(record_format='{date!s}', date_format=date_format)
+
+        # act
+        log_list = [
+            format_.format(record=dict(date=date, channel='', level='', message='', context={}, extra={}))
+            for date in date_list
+        ]
+
+        # assert
+        assert log_list == ['2023-10-29 02:30:00.000100 +0200 CEST', '2023-10-29 02:30:00.000200 +0100 CET']
+
+
+    @pytest.mark.parametrize('record_format', [None, '{level!s}: {message!s} {context!s} {extra!s}', '{message[0]}'])
+    def test_format_record(self, record_format: typing.Optional[str]) -> None:
+        # arrange
+        field_map = dict(
+            date=datetime.datetime.now(), channel='request', level='info', message='log act', context={'foo': 'bar'}
+        )
+        format_ = md.log.Format(record_format=record_format)
+
+        # act
+        log = format_.format(record=md.log.Record(**field_map))
+
+        # assert
+        assert log == format_.format(record=dict(field_map, extra={}))
+
+    def test_cache_key(self) -> None:  # white/positive
+        # assert
+        assert md.log.Format().cache_key == md.log.Format().cache_key
+        assert md.log.Format().cache_key != md.log.Format(record_format='{message!s}').cache_key
+        assert md.log.Format().cache_key != md.log.Format(date_format='%Y').cache_key
+        assert md.log.SerializationFormat().cache_key == md.log.SerializationFormat().cache_key
+        assert md.log.SerializationFormat(serializer=json.dumps).cache_key != md.log.SerializationFormat().cache_key
+        assert md.log.BinaryFormat().cache_key is None  # stateful, never cached
+
+    def test_cache_key_subclass(self) -> None:  # white/positive
+        # arrange
+        class PrefixFormat(md.log.Format):
+            def __init__(self, prefix: str) -> None:
+                super().__init__(record_format='{message!s}')
+                self._prefix = prefix
+
+            def format(self, record: typing.Dict[str, typing.Any]) -> str:
+                return self._prefix + super().format(record=record)
+
+        record = md.log.Record(date=datetime.datetime.now(), channel='app', level='info', message='log act')
+        stream_list = [io.StringIO(), io.StringIO()]
+
+        # act
+        keep_list = [
+            md.log.KeepStream(stream_list=[stream], format_=PrefixFormat(prefix))
+            for stream, prefix in zip(stream_list, ['A ', 'B '])
+        ]
+        for keep in keep_list:
+            keep.keep(record=record)
+
+        # assert
+        assert PrefixFormat('A ').cache_key is None  # subclass opts in explicitly
+        assert [stream.getvalue() for stream in stream_list] == ['A log act\n', 'B log act\n']
+
+
 class TestSerializationFormat:
     @pytest.mark.parametrize(
         'level', ['emergency', 'alert', 'critical', 'error', 'warning', 'notice', 'info', 'debug', 'custom-level']
@@ -214,117 +598,1943 @@ class TestSerializationFormat:
         now_datetime_mock.strftime.assert_called_once_with(date_format)
         assert log == '{"date": "2023-01-25 15:39:50.084948", "channel": "app", "level": "debug", "message": "example message", "context": {}, "extra": {}}'  # dirty a bit
 
+    @pytest.mark.parametrize('binary', [False, True])
+    def test_format_default_serializer(self, binary: bool) -> None:  # white/positive
+        # arrange
+        record = md.log.Record(
+            date=datetime.datetime(2023, 1, 25, 14, 45, 43, 481516),
+            channel='app',
+            level=psr.log.LEVEL_INFO,
+            message='log act',
+            context={'at': datetime.datetime(2023, 1, 25), 'tag_set': {'a'}},
+        )
 
-class TestKeepStream:
-    @pytest.mark.parametrize(
-        'level', ['emergency', 'alert', 'critical', 'error', 'warning', 'notice', 'info', 'debug', 'custom-level']
-    )
-    def test_handle(self, level: str) -> None:
+        # act
+        format_ = md.log.SerializationFormat(serializer=md.log.JsonSerializer(binary=binary))
+        log = format_.format(record=record)
+
+        # assert
+        assert isinstance(log, bytes if binary else str)
+        assert json.loads(log) == {
+            'date': '2023-01-25 14:45:43.481516',
+            'channel': 'app',
+            'level': 'info',
+            'message': 'log act',
+            'context': {'at': '2023-01-25T00:00:00', 'tag_set': ['a']},
+            'extra': {},
+        }
+
+
+class TestJsonDefault:
+    def test_call(self) -> None:  # white/positive
         # arrange
-        filename = '/tmp/md.log'
-        channel = 'request'
-        context = {'foo': 'bar'}
-        extra = {'bar': 'baz'}
-        message = 'log act'
+        class Color(enum.Enum):
+            RED = 'red'
 
-        now_datetime_scalar = '2023-01-18 16:45:43.481516'
-        now_datetime_mock = unittest.mock.Mock(spec=datetime.datetime)
+        class Custom:
+            def __repr__(self) -> str:
+                return 'Custom()'
 
-        result_log = (  # actually, dummy example
-            f'[{now_datetime_scalar!s}] {channel!s}.{level.upper()!s}: {message!s}'
-            ' {"foo": "bar"} {"bar": "baz"}'
-        )
+        json_default = md.log.JsonDefault(converter_map={Custom: lambda value: 'custom'})
+        value = {
+            'datetime': datetime.datetime(2023, 1, 25, 14, 45, 43),
+            'date': datetime.date(2023, 1, 25),
+            'decimal': decimal.Decimal('1.10'),
+            'uuid': uuid.UUID(int=1),
+            'set': frozenset(['a']),
+            'bytes': b'a\xff',
+            'exception': ValueError('wrong value'),
+            'enum': Color.RED,
+            'custom': Custom(),
+            'object': object.__new__(type('Unknown', (), {'__repr__': lambda self: 'Unknown()'})),
+        }
 
-        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
-        format_.format.return_value = result_log
+        # act
+        serialized = json.loads(json.dumps(value, default=json_default))
+
+        # assert
+        assert serialized == {
+            'datetime': '2023-01-25T14:45:43',
+            'date': '2023-01-25',
+            'decimal': '1.10',
+            'uuid': '00000000-0000-0000-0000-000000000001',
+            'set': ['a'],
+            'bytes': 'a\\xff',
+            'exception': 'ValueError: wrong value',
+            'enum': 'red',
+            'custom': 'custom',
+            'object': 'Unknown()',  # `repr` fallback
+        }
+
+    def test_call_cache(self) -> None:  # white/positive
+        # arrange
+        json_default = md.log.JsonDefault()
 
         # act
-        with unittest.mock.patch('builtins.open') as open_mock:
-            default_keep = md.log.KeepStream.from_file(
-                filename_list=[filename],
-                format_=format_,
-            )
-            default_keep.keep(record=dict(
-                date=now_datetime_mock,
-                channel=channel,
-                level=level,
-                message=message,
-                context=context,
-                extra=extra,
-            ))
+        with unittest.mock.patch.object(json_default, '_resolve', wraps=json_default._resolve) as resolve_mock:
+            for _ in range(3):
+                json_default(decimal.Decimal('1'))
 
         # assert
-        open_mock.assert_called_once_with(filename, 'a')
-        open_mock.return_value.write.assert_called_once_with(result_log + '\n')
-        open_mock.return_value.flush.assert_called_once()
+        resolve_mock.assert_called_once_with(decimal.Decimal)  # resolved once per type
 
 
-class TestLogger:
-    @pytest.mark.parametrize('method,level', [
-        ('emergency', 'emergency'),
-        ('alert', 'alert'),
-        ('critical', 'critical'),
-        ('error', 'error'),
-        ('warning', 'warning'),
-        ('notice', 'notice'),
-        ('info', 'info'),
-        ('debug', 'debug'),
-        ('log', 'custom-level'),
+class TestJsonSerializer:
+    @pytest.mark.parametrize('backend', [
+        md.log.JsonSerializer.BACKEND_ORJSON,
+        md.log.JsonSerializer.BACKEND_UJSON,
+        md.log.JsonSerializer.BACKEND_JSON,
     ])
-    def test_log(self, method: str, level: str) -> None:
+    def test_call(self, backend: str) -> None:  # white/positive
         # arrange
-        channel = 'request'
-        context = {'foo': 'bar'}
-        message = 'log act'
+        pytest.importorskip(backend)
+        record = {'message': 'log act', 'context': {'at': datetime.date(2023, 1, 25), 'id': uuid.UUID(int=1)}}
 
-        def process_1(record: dict) -> None:
-            record['extra']['foo'] = 'bar'
+        # act
+        serializer = md.log.JsonSerializer(backend=backend)
+        binary_serializer = md.log.JsonSerializer(backend=backend, binary=True)
 
-        patch_1 = unittest.mock.Mock(spec=md.log.PatchInterface)
-        patch_1.patch = process_1
-        patch_2 = unittest.mock.Mock(spec=md.log.PatchInterface)
-        patch_3 = unittest.mock.Mock(spec=md.log.PatchInterface)
-        keep_1 = unittest.mock.Mock(spec=md.log.KeepInterface)
-        keep_2 = unittest.mock.Mock(spec=md.log.KeepInterface)
-        keep_3 = unittest.mock.Mock(spec=md.log.KeepInterface)
+        # assert
+        assert serializer.backend == backend
+        assert json.loads(serializer(record)) == json.loads(binary_serializer(record).decode('utf-8')) == {
+            'message': 'log act',
+            'context': {'at': '2023-01-25', 'id': '00000000-0000-0000-0000-000000000001'},
+        }
 
-        patch_list = [patch_1, patch_2, patch_3]
-        keep_list = [keep_1, keep_2, keep_3]
+    @pytest.mark.parametrize('backend', [
+        md.log.JsonSerializer.BACKEND_ORJSON,
+        md.log.JsonSerializer.BACKEND_UJSON,
+        md.log.JsonSerializer.BACKEND_JSON,
+    ])
+    @pytest.mark.parametrize('binary', [False, True])
+    def test_call_big_integer(self, backend: str, binary: bool) -> None:  # white/positive
+        # arrange
+        pytest.importorskip(backend)
+        record = {'message': 'log act', 'context': {'n': 2 ** 70}}
 
-        now_datetime_scalar = '2023-01-18 16:45:43.481516'
-        now_datetime_mock = unittest.mock.Mock(spec=datetime.datetime)
-        now_datetime_mock.strftime.return_value = now_datetime_scalar
+        # act
+        data = md.log.JsonSerializer(backend=backend, binary=binary)(record)
 
-        record = collections.OrderedDict(
-            date=now_datetime_mock,
-            channel=channel,
-            level=level,
-            message=message,
-            context=context,
-            extra=collections.OrderedDict(foo='bar'),
-        )
+        # assert
+        assert isinstance(data, bytes if binary else str)
+        assert json.loads(data) == record  # encoded by builtin `json`, when backend could not encode it
 
+    def test_backend_fallback(self) -> None:  # white/positive
         # act
-        logger = md.log.Logger(
-            name=channel,
-            keep_list=keep_list,
-            patch_list=patch_list,
-        )
+        with unittest.mock.patch.dict('sys.modules', {'orjson': None, 'ujson': None}):  # not installed
+            serializer = md.log.JsonSerializer()
 
-        assert hasattr(logger, method)
-        logging_method = getattr(logger, method)
-
-        kw = dict(message=message, context=context)
-        if method == 'log':
-            kw['level'] = level  # ... a lit bit dirty, but ok
+        # assert
+        assert serializer.backend == md.log.JsonSerializer.BACKEND_JSON
 
-        with unittest.mock.patch('datetime.datetime') as datetime_datetime_mock:
-            datetime_datetime_mock.now.return_value = now_datetime_mock
-            logging_method(**kw)
 
-        # assert
-        for keep in keep_list:
+class TestBinaryFormat:
+    def test_format(self) -> None:
+        # arrange
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43, 481516)
+        record_list = [
+            collections.OrderedDict(
+                date=date + datetime.timedelta(seconds=i),
+                channel=channel,
+                level=level,
+                message=f'log act {i}',
+                context=collections.OrderedDict(foo=i),
+                extra=collections.OrderedDict(),
+            )
+            for i, (channel, level) in enumerate([
+                ('request', psr.log.LEVEL_INFO),
+                ('request', psr.log.LEVEL_ERROR),
+                ('db', psr.log.LEVEL_INFO),
+                ('request', psr.log.LEVEL_INFO),
+            ])
+        ]
+        stream = io.BytesIO()
+
+        # act
+        keep_stream = md.log.KeepStream(stream_list=[stream], format_=md.log.BinaryFormat(), terminator=b'')
+        for record in record_list:
+            keep_stream.keep(record=record)
+        data = stream.getvalue()
+
+        # assert
+        assert list(md.log.BinaryReader(io.BytesIO(data))) == record_list
+        assert list(md.log.BinaryReader(io.BytesIO(data + data[:-3]))) == record_list + record_list[:3]  # truncated frame ignored
+        assert data.count(b'request') == 1  # interned
+        assert list(md.log.BinaryReader(io.BytesIO(data)).read(
+            level_set={psr.log.LEVEL_INFO},
+            channel_set={'request'},
+        )) == [record_list[0], record_list[3]]
+        assert list(md.log.BinaryReader(io.BytesIO(data)).read(
+            since=date + datetime.timedelta(seconds=1),
+            until=date + datetime.timedelta(seconds=3),
+        )) == record_list[1:3]
+
+    def test_format_concurrent(self) -> None:  # white/positive
+        # arrange
+        stream = io.BytesIO()
+        keep_stream = md.log.KeepStream(stream_list=[stream], format_=md.log.BinaryFormat(), terminator=b'')
+
+        # act
+        def write(thread_index: int) -> None:
+            for i in range(200):  # each record defines its own channel string
+                keep_stream.keep(record=dict(
+                    date=datetime.datetime.now(), channel=f'app.{thread_index}.{i}', level='info',
+                    message='log act', context={}, extra={},
+                ))
+
+        thread_list = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+        for thread in thread_list:
+            thread.start()
+        for thread in thread_list:
+            thread.join()
+
+        # assert
+        assert sorted(record['channel'] for record in md.log.BinaryReader(io.BytesIO(stream.getvalue()))) == sorted(
+            f'app.{t}.{i}' for t in range(4) for i in range(200)
+        )
+
+    @pytest.mark.parametrize('durability', [md.log.DURABILITY_BATCH, md.log.DURABILITY_FSYNC])
+    def test_format_concurrent_batch(self, tmp_path: pathlib.Path, durability: str) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.bin')
+        keep_stream = md.log.KeepStream.from_file(
+            [filename], mode='ab', format_=md.log.BinaryFormat(), terminator=b'', durability=durability, batch_size=2,
+        )
+
+        # act
+        def write(channel_list: typing.List[str]) -> None:
+            for channel in channel_list:
+                keep_stream.keep(record=dict(
+                    date=datetime.datetime.now(), channel=channel, level='info', message='log act', context={}, extra={},
+                ))
+
+        for channel_list in [['app'], ['db', 'db']]:  # `info` level is defined by the first thread, used by the second
+            thread = threading.Thread(target=write, args=(channel_list,))
+            thread.start()
+            thread.join()
+        keep_stream.close()
+
+        # assert
+        with open(filename, 'rb') as stream:
+            assert [record['channel'] for record in md.log.BinaryReader(stream)] == ['app', 'db', 'db']
+
+    def test_format_shared(self) -> None:  # white/negative
+        # arrange
+        format_ = md.log.BinaryFormat()
+        record = dict(date=datetime.datetime.now(), channel='app', level='info', message='log act', context={}, extra={})
+        stream_1 = io.BytesIO()
+        stream_2 = io.BytesIO()
+
+        # act
+        keep_stream_1 = md.log.KeepStream(stream_list=[stream_1], format_=format_, terminator=b'')
+        keep_stream_1.keep(record=record)
+        data_1 = stream_1.getvalue()  # stream is closed, when keep is collected
+        with pytest.raises(ValueError):  # e.g. file keep and shipper keep, strings would be defined in one stream
+            md.log.KeepStream(stream_list=[io.BytesIO()], format_=format_, terminator=b'')
+        del keep_stream_1
+        gc.collect()
+        keep_stream_2 = md.log.KeepStream(stream_list=[stream_2], format_=format_, terminator=b'')
+        keep_stream_2.keep(record=record)
+
+        # assert
+        assert list(md.log.BinaryReader(io.BytesIO(data_1))) == [record]
+        assert list(md.log.BinaryReader(io.BytesIO(stream_2.getvalue()))) == [record]  # strings are defined again
+
+    def test_read_undefined_string(self) -> None:  # white/negative
+        # arrange
+        stream = io.BytesIO()
+        format_ = md.log.BinaryFormat()
+        for level, channel in [('debug', 'app'), ('info', 'db')]:
+            stream.write(format_.format(record=dict(
+                date=datetime.datetime.now(), channel=channel, level=level, message='log act', context={}, extra={}
+            )))
+        data = stream.getvalue()
+        first_frame_length = 5 + 4 + len(b'debug')  # string definition frame of `debug` level is lost
+
+        # act
+        record_list = list(md.log.BinaryReader(io.BytesIO(data[first_frame_length:])))
+
+        # assert
+        assert [(record['level'], record['channel']) for record in record_list] == [('info', 'db')]
+
+    def test_format_skipped_payload_not_decoded(self) -> None:
+        # arrange
+        stream = io.BytesIO()
+        format_ = md.log.BinaryFormat()
+        for level in [psr.log.LEVEL_DEBUG, psr.log.LEVEL_ERROR]:
+            stream.write(format_.format(record=dict(
+                date=datetime.datetime.now(), channel='app', level=level, message='log act', context={}, extra={}
+            )))
+        stream.seek(0)
+
+        # act
+        with unittest.mock.patch('json.loads', wraps=json.loads) as json_loads_mock:
+            record_list = list(md.log.BinaryReader(stream).read(level_set={psr.log.LEVEL_ERROR}))
+
+        # assert
+        assert [record['level'] for record in record_list] == [psr.log.LEVEL_ERROR]
+        json_loads_mock.assert_called_once()
+
+
+    def test_format_record(self) -> None:
+        # arrange
+        date = datetime.datetime(2023, 1, 25, 14, 45, 43, 481516)
+        serializer_mock = unittest.mock.Mock()
+
+        # act
+        format_ = md.log.SerializationFormat(serializer=serializer_mock)
+        format_.format(record=md.log.Record(date=date, channel='request', level='info', message='log act'))
+
+        # assert
+        serializer_mock.assert_called_once_with(collections.OrderedDict(
+            date='2023-01-25 14:45:43.481516',
+            channel='request',
+            level='info',
+            message='log act',
+            context={},
+            extra={},
+        ))
+
+
+class TestIndexedReader:
+    @staticmethod
+    def _write(filename: str, format_: md.log.FormatInterface, record_list: typing.List[dict]) -> None:
+        with open(filename, 'a') as stream:
+            keep_stream = md.log.KeepStream(stream_list=[stream], format_=format_)
+            for record in record_list:
+                keep_stream.keep(record=record)
+
+    @staticmethod
+    def _record_list(date: datetime.datetime, count: int) -> typing.List[dict]:
+        return [
+            collections.OrderedDict(
+                date=date + datetime.timedelta(seconds=i),
+                channel='app.request',
+                level=psr.log.LEVEL_ERROR if i % 10 == 0 else psr.log.LEVEL_INFO,
+                message=f'log act {i} {{ : x.y',
+                context=collections.OrderedDict(foo=i, bar=collections.OrderedDict(baz=' {')),
+                extra=collections.OrderedDict(),
+            )
+            for i in range(count)
+        ]
+
+    def test_read(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43, 481516)
+        record_list = self._record_list(date, 100)
+        self._write(filename, md.log.Format(), record_list)
+
+        # act
+        reader = md.log.IndexedReader(filename, block_size=512)
+
+        # assert
+        assert list(reader) == record_list
+        assert len(reader.index()) > 10
+        with unittest.mock.patch.object(reader, '_parse', wraps=reader._parse) as parse_mock:
+            assert list(reader.read(
+                since=date + datetime.timedelta(seconds=50),
+                until=date + datetime.timedelta(seconds=55),
+            )) == record_list[50:55]
+        assert parse_mock.call_count < 40  # only blocks in time range are parsed
+        assert list(reader.read(level_set={psr.log.LEVEL_ERROR})) == record_list[::10]
+        assert list(reader.read(channel_set={'app'})) == []
+
+    def test_read_multiline(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43, 481516)
+        record_list = self._record_list(date, 60)
+        for record in record_list[::3]:
+            record['message'] = f'{record["message"]}\nTraceback (most recent call last):\n  File "app.py", line 1'
+        self._write(filename, md.log.Format(), record_list[:30])
+        md.log.IndexedReader(filename, block_size=512).index()
+        with open(filename, 'a') as stream:  # continuation lines are appended after index is built
+            stream.write('[2023-01-18 16:46:13.481516] app.request.error: log act 30 {\n')
+        md.log.IndexedReader(filename, block_size=512).index()
+        with open(filename, 'a') as stream:
+            stream.write(' : x.y {"foo": 30, "bar": {"baz": " {"}} {}\n')
+        self._write(filename, md.log.Format(), record_list[31:])
+        record_list[30]['message'] = 'log act 30 {\n : x.y'
+
+        # act
+        reader = md.log.IndexedReader(filename, block_size=512)
+
+        # assert
+        assert list(reader) == record_list
+        assert list(reader.read(since=date + datetime.timedelta(seconds=30))) == record_list[30:]
+        os.remove(f'{filename}.idx')
+        with open(filename, 'rb') as stream:
+            data = stream.read()
+        assert all(
+            data[offset:offset + 1] == b'['
+            for offset, *_ in reader.index()
+        )  # index built at once splits blocks on record lines
+        assert list(reader) == record_list
+
+    def test_read_json(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43, 481516)
+        record_list = self._record_list(date, 20)
+        self._write(filename, md.log.SerializationFormat(serializer=json.dumps), record_list)
+
+        # act
+        reader = md.log.IndexedReader(filename, format_=md.log.IndexedReader.FORMAT_JSON, block_size=256)
+
+        # assert
+        assert list(reader.read(since=date + datetime.timedelta(seconds=15))) == record_list[15:]
+
+    def test_index_extended(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43, 481516)
+        record_list = self._record_list(date, 40)
+        self._write(filename, md.log.Format(), record_list[:20])
+        block_list = md.log.IndexedReader(filename, block_size=512).index()
+
+        # act
+        with open(filename, 'a') as stream:
+            stream.write('[2023-01-18 16:46:03.4')  # incomplete line, e.g. being written
+        incomplete_list = list(md.log.IndexedReader(filename, block_size=512))
+        with open(filename, 'a') as stream:
+            stream.write('81516] app.request.error: log act 20 { : x.y {"foo": 20, "bar": {"baz": " {"}} {}\n')
+        self._write(filename, md.log.Format(), record_list[21:])
+        reader = md.log.IndexedReader(filename, block_size=512)
+        with unittest.mock.patch.object(reader, '_parse', wraps=reader._parse) as parse_mock:
+            extended_block_list = reader.index()
+
+        # assert
+        assert incomplete_list == record_list[:20]
+        assert extended_block_list[:len(block_list)] == block_list
+        assert parse_mock.call_count == 20  # only appended lines are parsed
+        assert list(reader) == record_list
+
+    def test_index_rebuilt(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43, 481516)
+        self._write(filename, md.log.Format(), self._record_list(date, 20))
+        md.log.IndexedReader(filename, block_size=512).index()
+        record_list = self._record_list(date + datetime.timedelta(days=1), 30)
+
+        # act
+        os.rename(filename, f'{filename}.1')  # rotated
+        self._write(filename, md.log.Format(), record_list)
+
+        # assert
+        assert list(md.log.IndexedReader(filename, block_size=512)) == record_list
+
+
+def _keep_stream_worker(keep_stream: md.log.KeepStream, filename: str) -> None:
+    keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG})
+    deadline = time.monotonic() + 5
+    while os.path.getsize(filename) == 0:
+        assert time.monotonic() < deadline, 'Not flushed'
+        time.sleep(0.01)
+
+
+class TestKeepStream:
+    def test_keep_formats_once(self) -> None:  # white/positive
+        # arrange
+        record = md.log.Record(
+            date=datetime.datetime(2023, 1, 25, 14, 45, 43, 481516), channel='app', level='info', message='log act'
+        )
+        format_list = [md.log.Format(), md.log.Format(), md.log.Format(record_format='{message!s}')]
+        for format_ in format_list:
+            format_.format = unittest.mock.Mock(wraps=format_.format)  # type: ignore[method-assign]
+        stream_list = [io.StringIO() for _ in format_list]
+        keep_list = [
+            md.log.KeepStream(stream_list=[stream], format_=format_) for stream, format_ in zip(stream_list, format_list)
+        ]
+
+        # act
+        for keep in keep_list:
+            keep.keep(record=record)
+
+        # assert
+        assert [format_.format.call_count for format_ in format_list] == [1, 0, 1]  # equivalent format reuses output
+        assert [stream.getvalue() for stream in stream_list] == [
+            '[2023-01-25 14:45:43.481516] app.info: log act {} {}\n',
+            '[2023-01-25 14:45:43.481516] app.info: log act {} {}\n',
+            'log act\n',
+        ]
+
+    def test_keep_formats_changed_record(self) -> None:  # white/positive
+        # arrange
+        record = md.log.Record(
+            date=datetime.datetime(2023, 1, 25, 14, 45, 43, 481516), channel='app', level='info', message='secret'
+        )
+        format_ = md.log.Format(record_format='{message!s} {context!s} {extra!s}')
+        stream_list = [io.StringIO() for _ in range(4)]
+        keep_list = [md.log.KeepStream(stream_list=[stream], format_=format_) for stream in stream_list]
+
+        # act
+        keep_list[0].keep(record=record)
+        record['message'] = '***'  # e.g. redacted by keep wrapper
+        keep_list[1].keep(record=record)
+        record['context'] = {'password': '***'}
+        keep_list[2].keep(record=record)
+        record['extra'] = {'pid': 42}
+        keep_list[3].keep(record=record)
+
+        # assert
+        assert [stream.getvalue() for stream in stream_list] == [
+            'secret {} {}\n',
+            '*** {} {}\n',
+            '*** {"password": "***"} {}\n',
+            '*** {"password": "***"} {"pid": 42}\n',
+        ]
+
+    @pytest.mark.parametrize(
+        'level', ['emergency', 'alert', 'critical', 'error', 'warning', 'notice', 'info', 'debug', 'custom-level']
+    )
+    def test_handle(self, level: str) -> None:
+        # arrange
+        filename = '/tmp/md.log'
+        channel = 'request'
+        context = {'foo': 'bar'}
+        extra = {'bar': 'baz'}
+        message = 'log act'
+
+        now_datetime_scalar = '2023-01-18 16:45:43.481516'
+        now_datetime_mock = unittest.mock.Mock(spec=datetime.datetime)
+
+        result_log = (  # actually, dummy example
+            f'[{now_datetime_scalar!s}] {channel!s}.{level.upper()!s}: {message!s}'
+            ' {"foo": "bar"} {"bar": "baz"}'
+        )
+
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.return_value = result_log
+
+        # act
+        with unittest.mock.patch('builtins.open') as open_mock:
+            default_keep = md.log.KeepStream.from_file(
+                filename_list=[filename],
+                format_=format_,
+            )
+            default_keep.keep(record=dict(
+                date=now_datetime_mock,
+                channel=channel,
+                level=level,
+                message=message,
+                context=context,
+                extra=extra,
+            ))
+
+        # assert
+        open_mock.assert_called_once_with(filename, 'a')
+        open_mock.return_value.write.assert_called_once_with(result_log + '\n')
+        open_mock.return_value.flush.assert_called_once()
+
+
+    @pytest.mark.parametrize('level,is_kept', [
+        (psr.log.LEVEL_ERROR, True),
+        (psr.log.LEVEL_WARNING, True),
+        (psr.log.LEVEL_NOTICE, False),
+        (psr.log.LEVEL_DEBUG, False),
+        ('custom-level', True),
+    ])
+    def test_keep_level(self, level: str, is_kept: bool) -> None:
+        # arrange
+        stream = io.StringIO()
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.return_value = 'log act'
+
+        # act
+        keep_stream = md.log.KeepStream(stream_list=[stream], format_=format_, level=psr.log.LEVEL_WARNING)
+        keep_stream.keep(record={'level': level})
+
+        # assert
+        assert stream.getvalue() == ('log act\n' if is_kept else '')
+        assert format_.format.called == is_kept
+
+    @pytest.mark.parametrize('durability', [md.log.DURABILITY_BATCH, md.log.DURABILITY_FSYNC])
+    def test_keep_batch(self, durability: str) -> None:
+        # arrange
+        stream = unittest.mock.Mock(closed=False)
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep_stream = md.log.KeepStream(
+            stream_list=[stream],
+            format_=format_,
+            durability=durability,
+            batch_size=3,
+            flush_interval=None,
+        )
+        with unittest.mock.patch('os.fsync') as fsync_mock:
+            for message in ['a', 'b', 'c', 'd']:
+                keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+            stream_write_call_list = list(stream.write.call_args_list)
+            keep_stream.close()
+
+        # assert
+        assert stream_write_call_list == [unittest.mock.call('a\nb\nc\n')]
+        stream.write.assert_called_with('d\n')
+        assert stream.flush.call_count == 2
+        stream.close.assert_called_once()
+        if durability == md.log.DURABILITY_FSYNC:
+            assert fsync_mock.call_count == 2
+        else:
+            fsync_mock.assert_not_called()
+
+    def test_keep_batch_buffer_size(self) -> None:
+        # arrange
+        stream = io.StringIO()
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.return_value = 'x' * 9
+
+        # act
+        keep_stream = md.log.KeepStream(
+            stream_list=[stream],
+            format_=format_,
+            durability=md.log.DURABILITY_BATCH,
+            buffer_size=20,
+            flush_interval=None,
+        )
+        keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG})
+        assert stream.getvalue() == ''
+        keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG})
+
+        # assert
+        assert stream.getvalue() == ('x' * 9 + '\n') * 2
+        keep_stream.close()
+
+    def test_keep_batch_flush_interval(self) -> None:
+        # arrange
+        stream = io.StringIO()
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.return_value = 'log act'
+
+        # act
+        keep_stream = md.log.KeepStream(
+            stream_list=[stream],
+            format_=format_,
+            durability=md.log.DURABILITY_BATCH,
+            flush_interval=0.01,
+        )
+        keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG})
+        deadline = time.monotonic() + 5
+        while not stream.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # assert
+        assert stream.getvalue() == 'log act\n'
+        keep_stream.close()
+
+    def test_keep_batch_flush_interval_fork(self, tmp_path: pathlib.Path) -> None:
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.return_value = 'log act'
+
+        # act
+        keep_stream = md.log.KeepStream.from_file(
+            filename_list=[filename],
+            format_=format_,
+            durability=md.log.DURABILITY_BATCH,
+            flush_interval=0.01,
+        )
+        worker = multiprocessing.get_context('fork').Process(target=_keep_stream_worker, args=(keep_stream, filename))
+        worker.start()
+        worker.join(timeout=10)
+        keep_stream.close()
+
+        # assert
+        assert worker.exitcode == 0  # flushed by flush thread, worker exits without `atexit` hooks
+        with open(filename) as stream:
+            assert stream.read() == 'log act\n'
+
+    @pytest.mark.parametrize('durability', [md.log.DURABILITY_RECORD, md.log.DURABILITY_BATCH])
+    def test_keep_closed(self, durability: str) -> None:  # white/negative
+        # arrange
+        stream = io.StringIO()
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        value_list = []
+        stream.close = lambda: value_list.append(stream.getvalue())  # value is available after close
+
+        # act
+        keep_stream = md.log.KeepStream(stream_list=[stream], format_=format_, durability=durability)
+        keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 1'})
+        keep_stream.close()
+        for message in ['log 2', 'log 3']:  # e.g. by other `atexit` hook
+            keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        keep_stream.flush()
+        dropped_count = keep_stream.dropped_count
+        del keep_stream  # buffered log messages are not written into closed stream
+        gc.collect()
+
+        # assert
+        assert dropped_count == 2
+        assert set(value_list) == {'log 1\n'}
+
+    def test_keep_batch_collected(self) -> None:  # white/positive
+        # arrange
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.return_value = 'log act'
+        thread_count = threading.active_count()
+
+        # act
+        keep_stream_ref_list = []
+        for _ in range(20):
+            keep_stream = md.log.KeepStream(
+                stream_list=[io.StringIO()],
+                format_=format_,
+                durability=md.log.DURABILITY_BATCH,
+                flush_interval=0.01,
+            )
+            keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG})
+            keep_stream_ref_list.append(weakref.ref(keep_stream))
+        del keep_stream
+        gc.collect()
+        deadline = time.monotonic() + 5
+        while threading.active_count() > thread_count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        # assert
+        assert [keep_stream_ref() for keep_stream_ref in keep_stream_ref_list] == [None] * 20
+        assert threading.active_count() <= thread_count  # flush threads are stopped
+
+    def test_keep_concurrent(self) -> None:  # white/positive
+        # arrange
+        class PartialStream(io.StringIO):
+            """ Stream, that writes line by parts, so other thread could write in between """
+            def write(self, data: str) -> int:
+                for part in [data[:3], data[3:]]:
+                    super().write(part)
+                    time.sleep(0)
+                return len(data)
+
+        stream = PartialStream()
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep_stream = md.log.KeepStream(stream_list=[stream], format_=format_)
+        message_list = [f'thread {i} log {j}' for i in range(8) for j in range(100)]
+
+        # act
+        def keep(thread_number: int) -> None:
+            for message in message_list[thread_number * 100:(thread_number + 1) * 100]:
+                keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+
+        thread_list = [threading.Thread(target=keep, args=(i,)) for i in range(8)]
+        for thread in thread_list:
+            thread.start()
+        for thread in thread_list:
+            thread.join()
+
+        # assert
+        assert sorted(stream.getvalue().splitlines()) == sorted(message_list)  # lines are not interleaved
+
+    def test_keep_batch_concurrent(self) -> None:  # white/positive
+        # arrange
+        stream = io.StringIO()
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep_stream = md.log.KeepStream(
+            stream_list=[stream],
+            format_=format_,
+            durability=md.log.DURABILITY_BATCH,
+            batch_size=7,
+            flush_interval=None,
+        )
+        message_list = [f'thread {i} log {j}' for i in range(8) for j in range(100)]
+
+        # act
+        def keep(thread_number: int) -> None:
+            for message in message_list[thread_number * 100:(thread_number + 1) * 100]:
+                keep_stream.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+
+        thread_list = [threading.Thread(target=keep, args=(i,)) for i in range(8)]
+        for thread in thread_list:
+            thread.start()
+        for thread in thread_list:
+            thread.join()
+        keep_stream.flush()  # merges buffers of all (finished) threads
+
+        # assert
+        assert sorted(stream.getvalue().splitlines()) == sorted(message_list)
+        assert keep_stream._buffer_list == []  # buffers of finished threads are forgotten
+        keep_stream.close()
+
+
+def _keep_queue_worker(keep_queue: md.log.KeepQueue, count: int) -> None:
+    for i in range(count):
+        keep_queue.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': f'log {i}'})
+    keep_queue.close()
+
+
+class TestKeepQueue:
+    def test_keep_fork(self, tmp_path: pathlib.Path) -> None:
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep_stream = md.log.KeepStream.from_file(filename_list=[filename], format_=format_)
+
+        # act
+        keep_queue = md.log.KeepQueue(keep_list=[keep_stream], size=10)
+        worker = multiprocessing.get_context('fork').Process(target=_keep_queue_worker, args=(keep_queue, 50))
+        worker.start()
+        worker.join(timeout=10)
+        if worker.is_alive():  # worker blocked on full queue
+            worker.kill()
+            worker.join()
+        keep_queue.close()
+
+        # assert
+        assert worker.exitcode == 0
+        with open(filename) as stream:
+            assert stream.read().splitlines() == [f'log {i}' for i in range(50)]
+
+    def test_keep_collected(self) -> None:  # white/positive
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+
+        # act
+        keep_queue = md.log.KeepQueue(keep_list=[keep])
+        keep_queue.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log act'})
+        keep_queue_ref = weakref.ref(keep_queue)
+        thread = keep_queue._thread
+        del keep_queue
+        gc.collect()
+        thread.join(timeout=5)
+
+        # assert
+        assert keep_queue_ref() is None  # not kept alive by `atexit` and worker thread
+        assert not thread.is_alive()
+        keep.keep.assert_called_once_with(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log act'})
+
+    def test_keep(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = {'level': psr.log.LEVEL_DEBUG, 'message': 'log act'}
+
+        # act
+        keep_queue = md.log.KeepQueue(keep_list=[keep])
+        keep_queue.keep(record=record)
+        keep_queue.close()
+
+        # assert
+        keep.keep.assert_called_once_with(record=record)
+        assert keep_queue.dropped_count == 0
+
+    @pytest.mark.parametrize('overflow,expected_message_list,expected_dropped_count', [
+        (md.log.OVERFLOW_DROP_NEWEST, ['0', '1'], 3),
+        (md.log.OVERFLOW_DROP_OLDEST, ['3', '4'], 3),
+        (md.log.OVERFLOW_SAMPLE, ['1', '4'], 3),
+    ])
+    def test_keep_overflow(self, overflow: str, expected_message_list: list, expected_dropped_count: int) -> None:
+        # arrange
+        release = threading.Event()
+        message_list = []
+
+        def keep_1(record: dict) -> None:
+            release.wait()
+            message_list.append(record['message'])
+
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep.keep = keep_1
+
+        # act
+        keep_queue = md.log.KeepQueue(keep_list=[keep], size=2, overflow=overflow, sample_rate=3)
+        keep_queue.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'blocker'})
+        while keep_queue._queue.qsize():  # wait until worker takes blocker record
+            time.sleep(0.001)
+
+        for i in range(5):
+            keep_queue.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': str(i)})
+
+        release.set()
+        keep_queue.close()
+
+        # assert
+        assert message_list == ['blocker'] + expected_message_list
+        assert keep_queue.dropped_count == expected_dropped_count
+
+    def test_keep_after_close(self) -> None:  # white/negative
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+
+        # act
+        keep_queue = md.log.KeepQueue(keep_list=[keep])
+        keep_queue.close()
+        keep_queue.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log act'})
+
+        # assert
+        keep.keep.assert_not_called()
+        assert keep_queue.dropped_count == 1
+
+
+class TestKeepRotatingFile:
+    @pytest.mark.parametrize('compress', [True, False])
+    def test_keep_rotate_by_size(self, tmp_path: pathlib.Path, compress: bool) -> None:
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep = md.log.KeepRotatingFile(
+            filename=filename, format_=format_, max_bytes=12, backup_count=2, compress=compress
+        )
+        for message in ['log 1', 'log 2', 'log 3', 'log 4', 'log 5', 'log 6', 'log 7']:
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        keep.close()
+
+        # assert
+        def read(filename_: str) -> str:
+            with (gzip.open(filename_, 'rt') if compress else open(filename_)) as stream:
+                return stream.read()
+
+        suffix = '.gz' if compress else ''
+        assert sorted(os.listdir(tmp_path)) == ['md.log', f'md.log.1{suffix}', f'md.log.2{suffix}']
+        with open(filename) as stream:
+            assert stream.read() == 'log 7\n'
+        assert read(f'{filename}.1{suffix}') == 'log 5\nlog 6\n'
+        assert read(f'{filename}.2{suffix}') == 'log 3\nlog 4\n'
+
+    def test_keep_rotate_by_interval(self, tmp_path: pathlib.Path) -> None:
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        with unittest.mock.patch('time.time') as time_mock:
+            time_mock.return_value = 3600 * 10.5
+            keep = md.log.KeepRotatingFile(filename=filename, format_=format_, interval=3600, compress=False)
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 1'})
+            time_mock.return_value = 3600 * 10.9
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 2'})
+            time_mock.return_value = 3600 * 11
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 3'})
+        keep.close()
+
+        # assert
+        with open(f'{filename}.1') as stream:
+            assert stream.read() == 'log 1\nlog 2\n'
+        with open(filename) as stream:
+            assert stream.read() == 'log 3\n'
+
+    def test_reopen(self, tmp_path: pathlib.Path) -> None:
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep = md.log.KeepRotatingFile(filename=filename, format_=format_)
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 1'})
+        os.rename(filename, f'{filename}.external')  # e.g. by logrotate
+        keep.reopen()
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 2'})
+        keep.close()
+
+        # assert
+        with open(f'{filename}.external') as stream:
+            assert stream.read() == 'log 1\n'
+        with open(filename) as stream:
+            assert stream.read() == 'log 2\n'
+
+    def test_keep_closed(self, tmp_path: pathlib.Path) -> None:  # white/negative
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep = md.log.KeepRotatingFile(filename=filename, format_=format_, max_bytes=6)
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 1'})
+        keep.close()
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 2'})  # e.g. by other `atexit` hook
+        keep.rotate()
+        keep.close()
+
+        # assert
+        assert keep.dropped_count == 1
+        assert sorted(os.listdir(tmp_path)) == ['md.log']
+        with open(filename) as stream:
+            assert stream.read() == 'log 1\n'
+
+    def test_keep_binary(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43)
+        message_list = [f'log {i}' for i in range(6)]
+
+        # act
+        keep = md.log.KeepRotatingFile(
+            filename=filename, format_=md.log.BinaryFormat(), max_bytes=64, compress=False, terminator=b''
+        )
+        for message in message_list:
+            keep.keep(record=md.log.Record(date=date, channel='app', level=psr.log.LEVEL_INFO, message=message))
+        keep.close()
+
+        # assert
+        part_list = []
+        for filename_ in [f'{filename}.{i}' for i in range(len(os.listdir(tmp_path)) - 1, 0, -1)] + [filename]:
+            with open(filename_, 'rb') as stream:  # each file defines its strings
+                part_list.append([record['message'] for record in md.log.BinaryReader(stream)])
+        assert len(part_list) > 2 and all(part_list)
+        assert sum(part_list, []) == message_list
+
+    def test_close(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep = md.log.KeepRotatingFile(filename=filename, format_=format_, compress=False)
+
+        # act
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 1'})
+        keep.rotate()
+        keep.close()
+        keep.close()
+
+        # assert
+        assert not keep._thread.is_alive()
+        with open(f'{filename}.1') as stream:
+            assert stream.read() == 'log 1\n'
+
+    def test_keep_collected(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep = md.log.KeepRotatingFile(filename=filename, format_=format_, compress=False)
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 1'})
+        keep.rotate()
+        keep_ref = weakref.ref(keep)
+        thread = keep._thread
+        del keep
+        gc.collect()
+        thread.join(timeout=5)
+
+        # assert
+        assert keep_ref() is None  # not kept alive by `atexit` and worker thread
+        assert not thread.is_alive()
+        with open(f'{filename}.1') as stream:  # rotated file is processed before worker stops
+            assert stream.read() == 'log 1\n'
+
+
+class TestKeepCompressedFile:
+    @pytest.mark.parametrize('codec, open_', [
+        (md.log.KeepCompressedFile.CODEC_GZIP, gzip.open),
+        (md.log.KeepCompressedFile.CODEC_LZMA, lzma.open),
+        (md.log.KeepCompressedFile.CODEC_BZ2, bz2.open),
+    ])
+    def test_keep(self, tmp_path: pathlib.Path, codec: str, open_: typing.Callable) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        message_list = [f'log {i}' for i in range(1000)]
+
+        # act
+        for message_sublist in [message_list[:500], message_list[500:]]:  # the second keep appends to file
+            keep = md.log.KeepCompressedFile(filename=filename, format_=format_, codec=codec, buffer_size=64)
+            for message in message_sublist:
+                keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+            keep.close()
+
+        # assert
+        with open_(filename, 'rt') as stream:
+            assert stream.read().splitlines() == message_list
+
+    def test_flush(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep = md.log.KeepCompressedFile(filename=filename, format_=format_, buffer_size=16, flush_interval=3600)
+
+        # act
+        for message in ['log 1', 'log 2', 'log 3']:
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        keep.flush()
+        for message in ['log 4', 'log 5', 'log 6', 'log 7', 'log 8']:  # compressed, but not flushed, e.g. crash
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        with open(filename, 'rb') as stream:
+            data = stream.read()
+        keep.close()
+
+        # assert
+        assert zlib.decompressobj(wbits=31).decompress(data) == b'log 1\nlog 2\nlog 3\n'  # member ended
+        with gzip.open(filename, 'rt') as stream:
+            assert stream.read() == 'log 1\nlog 2\nlog 3\nlog 4\nlog 5\nlog 6\nlog 7\nlog 8\n'
+
+    def test_flush_interval(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep = md.log.KeepCompressedFile(filename=filename, format_=format_, flush_interval=0.01)
+
+        # act
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 1'})
+        deadline = time.monotonic() + 5
+        while os.path.getsize(filename) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with gzip.open(filename, 'rt') as stream:
+            content = stream.read()
+        keep.close()
+
+        # assert
+        assert content == 'log 1\n'
+
+    def test_keep_write_error(self, tmp_path: pathlib.Path) -> None:  # white/negative
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep = md.log.KeepCompressedFile(filename=filename, format_=format_, buffer_size=1, queue_size=1)
+        stream_write = keep._stream.write
+        error_list = [OSError('No space left on device')]
+
+        def write(data: bytes) -> int:
+            if error_list:
+                raise error_list.pop()
+            return stream_write(data)
+
+        # act
+        with unittest.mock.patch.object(keep._stream, 'write', side_effect=write), \
+                unittest.mock.patch('traceback.print_exc') as print_exc_mock:
+            for i in range(200):  # queue is filled many times
+                keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': f'log {i}'})
+            keep.flush()
+            keep.close()
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log after close'})
+
+        # assert
+        print_exc_mock.assert_called_once()
+        assert keep.dropped_count == 1
+        with gzip.open(filename, 'rt') as stream:
+            line_list = stream.read().splitlines()
+        assert line_list == [f'log {i}' for i in range(200 - len(line_list), 200)]  # only failed member is lost
+        assert len(line_list) > 100
+
+    def test_keep_concurrent(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep = md.log.KeepCompressedFile(filename=filename, format_=format_, buffer_size=256, queue_size=1)
+
+        # act
+        def write(thread_index: int) -> None:
+            for i in range(500):
+                keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': f'log {thread_index} {i}'})
+
+        thread_list = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+        for thread in thread_list:
+            thread.start()
+        for thread in thread_list:
+            thread.join()
+        keep.close()
+
+        # assert
+        with gzip.open(filename, 'rt') as stream:
+            line_list = stream.read().splitlines()
+        assert sorted(line_list) == sorted(f'log {t} {i}' for t in range(4) for i in range(500))
+        for thread_index in range(4):
+            assert [line for line in line_list if line.startswith(f'log {thread_index} ')] == [
+                f'log {thread_index} {i}' for i in range(500)
+            ]
+
+    @pytest.mark.parametrize('format_, terminator', [
+        (md.log.SerializationFormat(serializer=md.log.JsonSerializer(binary=True)), b'\n'),
+        (md.log.BinaryFormat(), b''),
+    ])
+    def test_keep_binary(
+        self, tmp_path: pathlib.Path, format_: md.log.FormatInterface, terminator: bytes
+    ) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43)
+        message_list = [f'log {i}' for i in range(100)]
+
+        # act
+        keep = md.log.KeepCompressedFile(filename=filename, format_=format_, buffer_size=64, terminator=terminator)
+        for message in message_list:
+            keep.keep(record=md.log.Record(date=date, channel='app', level=psr.log.LEVEL_INFO, message=message))
+        keep.close()
+
+        # assert
+        assert keep.dropped_count == 0
+        with gzip.open(filename, 'rb') as stream:
+            if isinstance(format_, md.log.BinaryFormat):
+                assert [record['message'] for record in md.log.BinaryReader(stream)] == message_list
+            else:
+                assert [json.loads(line)['message'] for line in stream] == message_list
+
+
+class TestKeepMappedFile:
+    def test_keep(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep = md.log.KeepMappedFile(filename=filename, format_=format_, segment_size=43)
+        for message in ['log 1', 'log 2', 'log 3', 'a log larger than segment size']:
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log 4'})
+        keep.close()
+
+        # assert
+        assert sorted(os.listdir(tmp_path)) == ['md.log.000001', 'md.log.000002', 'md.log.000003']
+        assert os.path.getsize(f'{filename}.000001') == 43  # preallocated
+        assert os.path.getsize(f'{filename}.000002') == 16 + 4 + 30  # fits larger record
+        assert list(md.log.MappedFileReader(filename)) == [
+            'log 1', 'log 2', 'log 3', 'a log larger than segment size', 'log 4'
+        ]
+
+    def test_keep_multiline(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep = md.log.KeepMappedFile(filename=filename, format_=format_)
+        for message in ['line 1\nline 2', '', 'log 2\n']:  # e.g. rendered traceback
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        keep.close()
+
+        # assert
+        assert list(md.log.MappedFileReader(filename)) == ['line 1\nline 2', '', 'log 2\n']
+
+    def test_keep_continues_segment(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        for message in ['log 1', 'log 2']:
+            keep = md.log.KeepMappedFile(filename=filename, format_=format_)
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+            keep.close()
+
+        # assert
+        assert os.listdir(tmp_path) == ['md.log.000001']
+        assert list(md.log.MappedFileReader(filename)) == ['log 1', 'log 2']
+
+    def test_keep_segment_count(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep = md.log.KeepMappedFile(filename=filename, format_=format_, segment_size=25, segment_count=2)
+        for message in ['log 1', 'log 2', 'log 3', 'log 4']:
+            keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        keep.close()
+
+        # assert
+        assert sorted(os.listdir(tmp_path)) == ['md.log.000003', 'md.log.000004']
+        assert list(md.log.MappedFileReader(filename)) == ['log 3', 'log 4']
+
+    def test_read_follow(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+        keep = md.log.KeepMappedFile(filename=filename, format_=format_, segment_size=64)
+        message_list = [f'log {i}' for i in range(100)]
+        reader = md.log.MappedFileReader(filename, poll_interval=0.001).read(follow=True)
+
+        # act
+        def write() -> None:
+            for message in message_list:
+                keep.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        read_list = [next(reader) for _ in message_list]  # tails segments, while they're written
+        thread.join()
+        keep.close()
+
+        # assert
+        assert read_list == message_list
+        assert len(os.listdir(tmp_path)) > 1
+
+    def test_keep_binary(self, tmp_path: pathlib.Path) -> None:  # white/positive
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43)
+        message_list = [f'log {i}' for i in range(6)]
+
+        # act
+        keep = md.log.KeepMappedFile(filename=filename, format_=md.log.BinaryFormat(), segment_size=128)
+        for message in message_list:
+            keep.keep(record=md.log.Record(date=date, channel='app', level=psr.log.LEVEL_INFO, message=message))
+        keep.close()
+
+        # assert
+        def read() -> typing.List[str]:
+            data = b''.join(md.log.MappedFileReader(filename, binary=True))
+            return [record['message'] for record in md.log.BinaryReader(io.BytesIO(data))]
+
+        assert len(os.listdir(tmp_path)) > 1
+        assert read() == message_list
+        os.remove(f'{filename}.000001')  # e.g. by retention, each segment defines its strings
+        message_sublist = read()
+        assert message_sublist and message_sublist == message_list[-len(message_sublist):]
+
+
+def _keep_collector_worker(keep_collector: md.log.KeepCollector, message: str) -> None:
+    keep_collector.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+    keep_collector.close()
+
+
+class TestKeepCollector:
+    def test_keep(self, tmp_path: pathlib.Path) -> None:
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep_collector = md.log.KeepCollector(filename_list=[filename], format_=format_, batch_size=2)
+        worker = multiprocessing.get_context('fork').Process(
+            target=_keep_collector_worker,
+            args=(keep_collector, 'worker log act'),
+        )
+        worker.start()
+        worker.join()
+        for message in ['log act 1', 'log act 2', 'log act 3']:
+            keep_collector.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': message})
+        keep_collector.close()
+
+        # assert
+        with open(filename) as stream:
+            assert sorted(stream.read().splitlines()) == ['log act 1', 'log act 2', 'log act 3', 'worker log act']
+
+    def test_keep_closed(self, tmp_path: pathlib.Path) -> None:  # white/negative
+        # arrange
+        filename = str(tmp_path / 'md.log')
+        format_ = unittest.mock.Mock(spec=md.log.FormatInterface)
+        format_.format.side_effect = lambda record: record['message']
+
+        # act
+        keep_collector = md.log.KeepCollector(filename_list=[filename], format_=format_)
+        keep_collector.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log act'})
+        keep_collector.close()
+        for _ in range(5000):  # e.g. by other `atexit` hook, queue is never read, so its feeder would block exit
+            keep_collector.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'log act closed'})
+        keep_collector.close()
+
+        # assert
+        assert keep_collector.dropped_count == 5000
+        with open(filename) as stream:
+            assert stream.read() == 'log act\n'
+
+
+class TestKeepRateLimit:
+    def test_keep(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record_list = [
+            {'channel': 'app', 'level': psr.log.LEVEL_ERROR, 'message': 'Connection failed'} for _ in range(5)
+        ] + [{'channel': 'app', 'level': psr.log.LEVEL_INFO, 'message': 'Request handled'}]
+
+        # act
+        with unittest.mock.patch('time.monotonic') as monotonic_mock:
+            monotonic_mock.return_value = 100.0
+            keep_rate_limit = md.log.KeepRateLimit(keep_list=[keep], rate=1, burst=2, summary_interval=60)
+            for record in record_list:
+                keep_rate_limit.keep(record=record)
+            monotonic_mock.return_value = 101.0  # one token refilled
+            keep_rate_limit.keep(record=record_list[0])
+            keep_rate_limit.keep(record=record_list[0])
+            monotonic_mock.return_value = 160.0  # summary interval passed
+            keep_rate_limit.keep(record=record_list[-1])
+
+        # assert
+        kept_list = [call.kwargs['record'] for call in keep.keep.call_args_list]
+        assert kept_list[:4] == [record_list[0], record_list[0], record_list[-1], record_list[0]]
+        summary = kept_list[4]
+        assert (summary['channel'], summary['level']) == ('md.log', psr.log.LEVEL_WARNING)
+        assert summary['context']['suppressed_count'] == 4
+        assert summary['context']['suppressed'] == [
+            {'channel': 'app', 'level': psr.log.LEVEL_ERROR, 'message': 'Connection failed', 'count': 4},
+        ]
+        assert kept_list[5:] == [record_list[-1]]
+        assert keep_rate_limit.suppressed_count == 4
+
+    def test_flush(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = {'channel': 'app', 'level': psr.log.LEVEL_ERROR, 'message': 'Connection failed'}
+
+        # act
+        keep_rate_limit = md.log.KeepRateLimit(keep_list=[keep], rate=1, burst=1, summary_interval=None)
+        keep_rate_limit.keep(record=record)
+        keep_rate_limit.keep(record=record)
+        keep_rate_limit.flush()
+        keep_rate_limit.flush()  # nothing suppressed since last summary
+
+        # assert
+        assert keep.keep.call_count == 2
+        assert keep.keep.call_args.kwargs['record']['context']['suppressed_count'] == 1
+
+    def test_keep_summary_interval(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = {'channel': 'app', 'level': psr.log.LEVEL_ERROR, 'message': 'Connection failed'}
+
+        # act
+        keep_rate_limit = md.log.KeepRateLimit(keep_list=[keep], rate=1, burst=1, summary_interval=0.02)
+        keep_rate_limit.keep(record=record)
+        keep_rate_limit.keep(record=record)
+        deadline = time.monotonic() + 5
+        while keep.keep.call_count < 2 and time.monotonic() < deadline:  # summary is kept without next record
+            time.sleep(0.01)
+        keep_rate_limit.close()
+
+        # assert
+        assert keep.keep.call_count == 2
+        assert keep.keep.call_args.kwargs['record']['context']['suppressed_count'] == 1
+
+    def test_keep_at_exit(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = {'channel': 'app', 'level': psr.log.LEVEL_ERROR, 'message': 'Connection failed'}
+
+        # act
+        with unittest.mock.patch('atexit.register') as register_mock:
+            keep_rate_limit = md.log.KeepRateLimit(keep_list=[keep], rate=1, burst=1, summary_interval=60)
+        keep_rate_limit.keep(record=record)
+        keep_rate_limit.keep(record=record)
+        register_mock.call_args.args[0]()  # interpreter exits
+        keep_rate_limit_ref = weakref.ref(keep_rate_limit)
+        del keep_rate_limit
+        gc.collect()
+
+        # assert
+        assert keep.keep.call_count == 2
+        assert keep.keep.call_args.kwargs['record']['context']['suppressed_count'] == 1
+        assert keep_rate_limit_ref() is None  # neither atexit nor thread keeps it alive
+
+
+class TestKeepSample:
+    def test_keep(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        debug_record = {'channel': 'app', 'level': psr.log.LEVEL_DEBUG, 'message': 'Cache miss'}
+        error_record = {'channel': 'app', 'level': psr.log.LEVEL_ERROR, 'message': 'Connection failed'}
+
+        # act
+        keep_sample = md.log.KeepSample(keep_list=[keep], rate=0.3, summary_interval=None)
+        with unittest.mock.patch('random.random') as random_mock:
+            keep_sample._random = random_mock
+            random_mock.side_effect = [0.1, 0.5, 0.9]
+            for record in [debug_record, debug_record, debug_record, error_record]:
+                keep_sample.keep(record=record)
+        keep_sample.flush()
+
+        # assert
+        kept_list = [call.kwargs['record'] for call in keep.keep.call_args_list]
+        assert kept_list[:2] == [debug_record, error_record]  # error records are never suppressed
+        assert kept_list[2]['context']['suppressed_count'] == 2
+        assert keep_sample.suppressed_count == 2
+
+
+class TestKeepAggregate:
+    def test_keep(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43)
+
+        def make_record(second: int, message: str = 'Connection failed') -> dict:
+            return dict(
+                date=date + datetime.timedelta(seconds=second),
+                channel='app',
+                level=psr.log.LEVEL_ERROR,
+                message=message,
+                context={'attempt': second},
+                extra={'pid': 42},
+            )
+
+        # act
+        keep_aggregate = md.log.KeepAggregate(keep_list=[keep], window=10)
+        with unittest.mock.patch('time.monotonic') as monotonic_mock:
+            for second in [0, 1, 2, 3]:
+                monotonic_mock.return_value = second
+                keep_aggregate.keep(record=make_record(second))
+            monotonic_mock.return_value = 4
+            keep_aggregate.keep(record=make_record(4, message='Request handled'))
+            monotonic_mock.return_value = 10  # window of the first record is expired
+            keep_aggregate.keep(record=make_record(10))
+
+        # assert
+        kept_list = [call.kwargs['record'] for call in keep.keep.call_args_list]
+        assert kept_list[:2] == [make_record(0), make_record(4, message='Request handled')]
+        assert kept_list[2] == dict(
+            make_record(3),
+            extra={
+                'pid': 42,
+                'repeat_count': 3,
+                'repeat_first_date': '2023-01-18 16:45:44',
+                'repeat_last_date': '2023-01-18 16:45:46',
+            }
+        )
+        assert kept_list[3:] == [make_record(10)]
+
+    def test_keep_key_count(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        date = datetime.datetime(2023, 1, 18, 16, 45, 43)
+
+        # act
+        keep_aggregate = md.log.KeepAggregate(keep_list=[keep], key_count=2)
+        for message in ['a', 'a', 'b', 'c', 'a']:
+            keep_aggregate.keep(record=dict(
+                date=date, channel='app', level=psr.log.LEVEL_ERROR, message=message, context={}, extra={}
+            ))
+        keep_aggregate.flush()
+
+        # assert
+        kept_list = [
+            (call.kwargs['record']['message'], call.kwargs['record']['extra'].get('repeat_count'))
+            for call in keep.keep.call_args_list
+        ]
+        assert kept_list == [('a', None), ('b', None), ('a', 1), ('c', None), ('a', None)]
+
+    def test_keep_flush_interval(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = dict(
+            date=datetime.datetime.now(), channel='app', level=psr.log.LEVEL_ERROR, message='a', context={}, extra={}
+        )
+
+        # act
+        keep_aggregate = md.log.KeepAggregate(keep_list=[keep], window=0.05, flush_interval=0.01)
+        keep_aggregate.keep(record=record)
+        keep_aggregate.keep(record=record)
+        deadline = time.monotonic() + 5
+        while keep.keep.call_count < 2 and time.monotonic() < deadline:  # repeat is kept without next record
+            time.sleep(0.01)
+        keep_aggregate.close()
+
+        # assert
+        assert [call.kwargs['record']['extra'].get('repeat_count') for call in keep.keep.call_args_list] == [None, 1]
+
+    def test_keep_at_exit(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = dict(
+            date=datetime.datetime.now(), channel='app', level=psr.log.LEVEL_ERROR, message='a', context={}, extra={}
+        )
+
+        # act
+        with unittest.mock.patch('atexit.register') as register_mock:
+            keep_aggregate = md.log.KeepAggregate(keep_list=[keep], flush_interval=60)
+        keep_aggregate.keep(record=record)
+        keep_aggregate.keep(record=record)
+        register_mock.call_args.args[0]()  # interpreter exits
+        keep_aggregate_ref = weakref.ref(keep_aggregate)
+        del keep_aggregate
+        gc.collect()
+
+        # assert
+        assert [call.kwargs['record']['extra'].get('repeat_count') for call in keep.keep.call_args_list] == [None, 1]
+        assert keep_aggregate_ref() is None  # neither atexit nor thread keeps it alive
+
+
+class TestKeepRingBuffer:
+    def test_keep(self) -> None:  # white/positive
+        # arrange
+        kept_list = []
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep.keep.side_effect = lambda record: kept_list.append(record['message'])
+        keep_ring_buffer = md.log.KeepRingBuffer(keep_list=[keep], size=2, pass_level=psr.log.LEVEL_WARNING)
+
+        # act
+        for level, message in [
+            (psr.log.LEVEL_DEBUG, 'debug 1'),
+            (psr.log.LEVEL_DEBUG, 'debug 2'),
+            (psr.log.LEVEL_WARNING, 'warning'),
+            (psr.log.LEVEL_INFO, 'info 1'),
+            (psr.log.LEVEL_CRITICAL, 'critical'),
+            (psr.log.LEVEL_INFO, 'info 2'),
+        ]:
+            keep_ring_buffer.keep(record={'level': level, 'message': message})
+
+        # assert
+        assert kept_list == ['warning', 'debug 2', 'info 1', 'critical']  # `debug 1` is dropped, `info 2` is buffered
+
+    def test_keep_per_thread(self) -> None:  # white/positive
+        # arrange
+        kept_list = []
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep.keep.side_effect = lambda record: kept_list.append(record['message'])
+        keep_ring_buffer = md.log.KeepRingBuffer(keep_list=[keep], per_thread=True)
+
+        # act
+        keep_ring_buffer.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'main debug'})
+        thread = threading.Thread(target=lambda: [
+            keep_ring_buffer.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'worker debug'}),
+            keep_ring_buffer.keep(record={'level': psr.log.LEVEL_ERROR, 'message': 'worker error'}),
+        ])
+        thread.start()
+        thread.join()
+
+        # assert
+        assert kept_list == ['worker debug', 'worker error']
+
+    def test_clear(self) -> None:  # white/positive
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep_ring_buffer = md.log.KeepRingBuffer(keep_list=[keep])
+        keep_ring_buffer.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': 'debug'})
+
+        # act
+        keep_ring_buffer.clear()
+        keep_ring_buffer.dump()
+
+        # assert
+        keep.keep.assert_not_called()
+
+
+class TestKeepAsync:
+    def test_keep(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        thread_name_list = []
+        keep.keep.side_effect = lambda record: thread_name_list.append(threading.current_thread().name)
+        record_list = [{'level': psr.log.LEVEL_DEBUG, 'message': f'log act {i}'} for i in range(3)]
+
+        # act
+        async def main() -> None:
+            keep_async = md.log.KeepAsync(keep_list=[keep])
+            keep_async.keep(record=record_list[0])
+            await keep_async.akeep(record=record_list[1])
+            keep_async.keep(record=record_list[2])
+            await keep_async.aclose()
+
+        asyncio.run(main())
+
+        # assert
+        assert keep.keep.call_args_list == [unittest.mock.call(record=record) for record in record_list]
+        assert all(thread_name.startswith('md.log.KeepAsync') for thread_name in thread_name_list)
+
+    def test_keep_overflow(self) -> None:  # white/negative
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep_async = md.log.KeepAsync(keep_list=[keep], size=2)
+
+        # act
+        async def main() -> None:
+            for i in range(5):  # queue is not drained, until control returns into event loop
+                keep_async.keep(record={'level': psr.log.LEVEL_DEBUG, 'message': f'log act {i}'})
+            await keep_async.aclose()
+
+        asyncio.run(main())
+
+        # assert
+        assert keep.keep.call_count == 2
+        assert keep_async.dropped_count == 3
+
+    def test_keep_without_event_loop(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = {'level': psr.log.LEVEL_DEBUG, 'message': 'log act'}
+
+        # act
+        md.log.KeepAsync(keep_list=[keep]).keep(record=record)
+
+        # assert
+        keep.keep.assert_called_once_with(record=record)
+
+    def test_aflush(self) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        record = {'channel': 'app', 'level': psr.log.LEVEL_DEBUG, 'message': 'log act'}
+        keep_count_list = []
+
+        # act
+        async def main() -> None:
+            keep_async = md.log.KeepAsync(keep_list=[keep])
+            keep_rate_limit = md.log.KeepRateLimit(keep_list=[keep_async], summary_interval=None)
+            keep_rate_limit.keep(record=record)
+            keep_rate_limit.flush()  # wrapping keeps flush synchronously
+            await keep_async.aflush()
+            keep_count_list.append(keep.keep.call_count)
+            await keep_async.aclose()
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')  # e.g. coroutine was never awaited
+            asyncio.run(main())
+            gc.collect()
+
+        # assert
+        assert keep_count_list == [1]
+
+
+class TestAsyncLogger:
+    @pytest.mark.parametrize('method,level', [
+        ('aemergency', 'emergency'),
+        ('aalert', 'alert'),
+        ('acritical', 'critical'),
+        ('aerror', 'error'),
+        ('awarning', 'warning'),
+        ('anotice', 'notice'),
+        ('ainfo', 'info'),
+        ('adebug', 'debug'),
+        ('alog', 'custom-level'),
+    ])
+    def test_log(self, method: str, level: str) -> None:
+        # arrange
+        keep_1 = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep_2 = unittest.mock.Mock(spec=md.log.KeepInterface)
+        patch = unittest.mock.Mock(spec=md.log.PatchInterface)
+
+        # act
+        async def main() -> None:
+            logger = md.log.AsyncLogger(
+                name='request',
+                keep_list=[md.log.KeepAsync(keep_list=[keep_1]), keep_2],
+                patch_list=[patch],
+            )
+            kw = dict(message='log act', context={'foo': 'bar'})
+            if method == 'alog':
+                kw['level'] = level
+            await getattr(logger, method)(**kw)
+            await logger.aclose()
+
+        asyncio.run(main())
+
+        # assert
+        for keep in [keep_1, keep_2]:
+            keep.keep.assert_called_once()
+            record = keep.keep.call_args.kwargs['record']
+            assert (record['channel'], record['level'], record['message'], record['context']) == (
+                'request', level, 'log act', {'foo': 'bar'}
+            )
+        patch.patch.assert_called_once()
+
+
+class TestLogger:
+    @pytest.mark.parametrize('method,level', [
+        ('emergency', 'emergency'),
+        ('alert', 'alert'),
+        ('critical', 'critical'),
+        ('error', 'error'),
+        ('warning', 'warning'),
+        ('notice', 'notice'),
+        ('info', 'info'),
+        ('debug', 'debug'),
+        ('log', 'custom-level'),
+    ])
+    def test_log(self, method: str, level: str) -> None:
+        # arrange
+        channel = 'request'
+        context = {'foo': 'bar'}
+        message = 'log act'
+
+        def process_1(record: dict) -> None:
+            record['extra']['foo'] = 'bar'
+
+        patch_1 = unittest.mock.Mock(spec=md.log.PatchInterface)
+        patch_1.patch = process_1
+        patch_2 = unittest.mock.Mock(spec=md.log.PatchInterface)
+        patch_3 = unittest.mock.Mock(spec=md.log.PatchInterface)
+        keep_1 = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep_2 = unittest.mock.Mock(spec=md.log.KeepInterface)
+        keep_3 = unittest.mock.Mock(spec=md.log.KeepInterface)
+
+        patch_list = [patch_1, patch_2, patch_3]
+        keep_list = [keep_1, keep_2, keep_3]
+
+        now_datetime_scalar = '2023-01-18 16:45:43.481516'
+        now_datetime_mock = unittest.mock.Mock(spec=datetime.datetime)
+        now_datetime_mock.strftime.return_value = now_datetime_scalar
+
+        record = collections.OrderedDict(
+            date=now_datetime_mock,
+            channel=channel,
+            level=level,
+            message=message,
+            context=context,
+            extra=collections.OrderedDict(foo='bar'),
+        )
+
+        # act
+        logger = md.log.Logger(
+            name=channel,
+            keep_list=keep_list,
+            patch_list=patch_list,
+        )
+
+        assert hasattr(logger, method)
+        logging_method = getattr(logger, method)
+
+        kw = dict(message=message, context=context)
+        if method == 'log':
+            kw['level'] = level  # ... a lit bit dirty, but ok
+
+        with unittest.mock.patch('datetime.datetime') as datetime_datetime_mock:
+            datetime_datetime_mock.now.return_value = now_datetime_mock
+            logging_method(**kw)
+
+        # assert
+        for keep in keep_list:
             keep.keep.assert_called_once_with(record=record)
 
         for patch in [patch_2, patch_3]:
             patch.patch.assert_called_once_with(record=record)
+
+    @pytest.mark.parametrize('method,level,is_enabled', [
+        ('emergency', 'emergency', True),
+        ('warning', 'warning', True),
+        ('notice', 'notice', False),
+        ('info', 'info', False),
+        ('debug', 'debug', False),
+        ('log', 'debug', False),
+        ('log', 'custom-level', True),
+    ])
+    def test_log_level(self, method: str, level: str, is_enabled: bool) -> None:
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        patch = unittest.mock.Mock(spec=md.log.PatchInterface)
+
+        # act
+        logger = md.log.Logger(keep_list=[keep], patch_list=[patch], level=psr.log.LEVEL_WARNING)
+
+        kw = dict(message='log act')
+        if method == 'log':
+            kw['level'] = level
+
+        with unittest.mock.patch('datetime.datetime') as datetime_datetime_mock:
+            getattr(logger, method)(**kw)
+
+        # assert
+        assert logger.is_enabled(level) == is_enabled
+        assert keep.keep.called == is_enabled
+        assert patch.patch.called == is_enabled
+        assert datetime_datetime_mock.now.called == is_enabled
+
+    def test_child(self) -> None:  # white/positive
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        patch = unittest.mock.Mock(spec=md.log.PatchInterface)
+        logger = md.log.Logger(name='app', keep_list=[keep], patch_list=[patch], context={'request': 1})
+
+        # act
+        child_logger = logger.child('db', context={'table': 'user'})
+        child_logger.info('Query', context={'rows': 2})
+        logger.info('Request')
+
+        # assert
+        assert child_logger._keep_list is logger._keep_list  # pipeline is shared
+        assert child_logger._patch_list is logger._patch_list
+        assert [call.kwargs['record']['channel'] for call in keep.keep.call_args_list] == ['app.db', 'app']
+        assert [call.kwargs['record']['context'] for call in keep.keep.call_args_list] == [
+            {'request': 1, 'table': 'user', 'rows': 2},
+            {'request': 1},
+        ]
+        assert patch.patch.call_count == 2
+
+    def test_bind(self) -> None:  # white/positive
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        logger = md.log.Logger(name='app', keep_list=[keep])
+
+        # act
+        bound_logger = logger.bind({'request': 1}).bind({'user': 2})
+        bound_logger.info('First', context={'request': 3})
+        bound_logger.info('Second')
+        keep.keep.call_args_list[-1].kwargs['record']['context']['patched'] = True  # e.g. by patch
+
+        # assert
+        assert [call.kwargs['record']['channel'] for call in keep.keep.call_args_list] == ['app', 'app']
+        assert [call.kwargs['record']['context'] for call in keep.keep.call_args_list] == [
+            {'request': 3, 'user': 2},  # record context overrides bound one
+            {'request': 1, 'user': 2, 'patched': True},
+        ]
+        assert bound_logger._context == {'request': 1, 'user': 2}  # not modified by record changes
+        assert logger._context is None
+
+    @pytest.mark.parametrize('name,is_enabled', [
+        ('app', False),
+        ('app.http', False),
+        ('app.db', True),
+        ('app.db.pool', True),
+        ('app.db.pool.connection', False),
+        ('app.dbx', False),  # not a descendant of `app.db`
+    ])
+    def test_child_level_map(self, name: str, is_enabled: bool) -> None:  # white/positive
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        logger = md.log.Logger(
+            name='app',
+            keep_list=[keep],
+            level=psr.log.LEVEL_INFO,
+            level_map={'app.db': psr.log.LEVEL_DEBUG, 'app.db.pool.connection': psr.log.LEVEL_ERROR},
+        )
+
+        # act
+        child_logger = logger
+        for child_name in name.split('.')[1:]:
+            child_logger = child_logger.child(child_name)
+        child_logger.debug('Debug')
+
+        # assert
+        assert child_logger.is_enabled(psr.log.LEVEL_DEBUG) == is_enabled
+        assert keep.keep.called == is_enabled
+
+    def test_log_metrics(self) -> None:  # white/positive
+        # arrange
+        stream = io.StringIO()
+        keep_stream = md.log.KeepStream(stream_list=[stream], format_=md.log.Format(record_format='{message!s}'))
+        keep_queue = md.log.KeepQueue(keep_list=[unittest.mock.Mock(spec=md.log.KeepInterface)])
+        patch = unittest.mock.Mock(spec=md.log.PatchInterface)
+        metrics = md.log.Metrics()
+        logger = md.log.Logger(name='app', keep_list=[keep_stream, keep_queue], patch_list=[patch], metrics=metrics)
+
+        # act
+        logger.info('Request handled')
+        logger.child('db').error('Query failed')
+        keep_queue.close()
+        snapshot = metrics.snapshot()
+
+        # assert
+        assert stream.getvalue() == 'Request handled\nQuery failed\n'
+        assert snapshot['record_count'] == {'app': {'info': 1}, 'app.db': {'error': 1}}
+        assert sorted(snapshot['stage']) == ['format.Format', 'keep.0.KeepStream', 'keep.1.KeepQueue', 'patch.Mock']
+        assert all(stage['count'] == 2 for stage in snapshot['stage'].values())
+        assert snapshot['keep'] == {
+            'keep.0.KeepStream': {'bytes': len('Request handled') + len('Query failed'), 'dropped_count': 0},
+            'keep.1.KeepQueue': {'queue_size': 0, 'dropped_count': 0},
+        }
+
+    def test_log_metrics_emit(self) -> None:  # white/positive
+        # arrange
+        keep = unittest.mock.Mock(spec=md.log.KeepInterface)
+        metrics = md.log.Metrics(emit_interval=60)
+        logger = md.log.Logger(name='app', keep_list=[keep], metrics=metrics)
+
+        # act
+        with unittest.mock.patch('time.monotonic') as monotonic_mock:
+            monotonic_mock.return_value = 10 ** 6  # emit interval is passed
+            logger.info('Request handled')
+            logger.info('Request handled')  # emit interval is not passed since previous emit
+
+        # assert
+        record_list = [call.kwargs['record'] for call in keep.keep.call_args_list]
+        assert [(record['channel'], record['message']) for record in record_list] == [
+            ('app', 'Request handled'),
+            ('md.log', 'Logger metrics'),
+            ('app', 'Request handled'),
+        ]
+        assert record_list[1]['context']['record_count'] == {'app': {'info': 1}}